@@ -1,6 +1,5 @@
 import uuid
-from math import ceil
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain_core.prompts import ChatPromptTemplate
@@ -97,40 +96,62 @@ class CodeInsightAgent:
             ]
         )
 
-    async def run(self):
+    async def run(self, file_ids: Optional[List[uuid.UUID]] = None) -> List[uuid.UUID]:
         """
         Запуск агента для обработки всех файлов
+        :param file_ids: файлы для анализа (например, изменённые при синхронизации), все файлы если не заданы
+        :return: id созданных инсайтов
         """
 
-        total_files = await self.files_repo.get_files_count()
-        total_batches = ceil(total_files / self.batch_size)
+        created_ids: List[uuid.UUID] = []
 
-        for batch_num in range(total_batches):
-            await self._process_batch(batch_num, total_batches)
+        if file_ids is not None:
+            file_ids = list(file_ids)
 
-    async def _process_batch(self, batch_num: int, total_batches: int):
+            for i in range(0, len(file_ids), self.batch_size):
+                files = await self.files_repo.get_by_ids(file_ids[i:i + self.batch_size])
+                created_ids.extend(await self._process_files(list(files.values())))
+
+            return created_ids
+
+        cursor = None
+
+        while True:
+            page = await self.files_repo.list_page(limit=self.batch_size, cursor=cursor)
+            created_ids.extend(await self._process_files(page.items))
+
+            if page.next_cursor is None:
+                break
+
+            cursor = page.next_cursor
+
+        return created_ids
+
+    async def _process_files(self, files: List[git_file_dto.GitFileInDB]) -> List[uuid.UUID]:
         """
-        Обработка одного батча файлов
+        Анализ файлов и сохранение инсайтов
+        :return: id созданных инсайтов
         """
 
-        offset = batch_num * self.batch_size
-        files = await self.files_repo.list(
-            limit=self.batch_size,
-            offset=offset,
-        )
+        created_ids: List[uuid.UUID] = []
 
         for file in files:
-            related = await self._get_related_files(file.id)
+            related = await self._get_related_files(file)
             insights = await self._analyze_file(file, related)
 
             if insights:
-                await self.insights_repo.batch_create(insights)
+                created = await self.insights_repo.batch_create(insights)
+                created_ids.extend(insight.id for insight in created)
 
-    async def _get_related_files(self, file_id: uuid.UUID) -> List[Dict]:
+        return created_ids
+
+    async def _get_related_files(self, current_file: git_file_dto.GitFileInDB) -> List[Dict]:
         """
         Получение связанных файлов через репозиторий зависимостей и эмбеддинги
         """
 
+        file_id = current_file.id
+
         related_candidates = {}
         all_candidate_ids = set()
 
@@ -156,20 +177,26 @@ class CodeInsightAgent:
 
         print(f"  📊 Найдено зависимостей: {len(dependencies)} прямых, {len(dependents)} обратных")
 
-        current_file = await self.files_repo.get_by_id(file_id)
-
-        if current_file and current_file.content:
+        if current_file.content:
             similar_chunks = await self.vector_store.asimilarity_search_with_score(
                 current_file.content[:2000],
                 k=10
             )
 
-            file_scores = {}
+            sha_scores = {}
             for doc, score in similar_chunks:
-                similar_file_id = doc.metadata.get("file_id")
-                if similar_file_id and similar_file_id != file_id:
-                    if similar_file_id not in file_scores or score > file_scores[similar_file_id]:
-                        file_scores[similar_file_id] = score
+                blob_sha = doc.metadata.get("blob_sha")
+                if blob_sha and (blob_sha not in sha_scores or score > sha_scores[blob_sha]):
+                    sha_scores[blob_sha] = score
+
+            # одно содержимое может принадлежать нескольким файлам
+            files_by_sha = await self.files_repo.get_meta_by_shas(list(sha_scores))
+
+            file_scores = {}
+            for sha, score in sha_scores.items():
+                for similar_file in files_by_sha.get(sha, []):
+                    if similar_file.id != file_id:
+                        file_scores[similar_file.id] = score
 
             for sim_id, score in file_scores.items():
                 str_id = str(sim_id)
@@ -188,23 +215,29 @@ class CodeInsightAgent:
             return []
 
         candidate_ids_list = list(all_candidate_ids)
-        files_dict = await self.files_repo.get_by_ids(candidate_ids_list)
+        files_dict = await self.files_repo.get_meta_by_ids(candidate_ids_list)
 
         sorted_candidates = sorted(
             related_candidates.items(),
             key=lambda x: (x[1]["priority"], x[1]["score"]),
             reverse=True
+        )[:self.max_context_files]
+
+        # содержимое загружается только для выбранных файлов, один лишний символ - признак обрезки
+        contents = await self.files_repo.get_contents(
+            [uuid.UUID(rel_id_str) for rel_id_str, _ in sorted_candidates],
+            max_length=501,
         )
 
         related_files = []
-        for rel_id_str, info in sorted_candidates[:self.max_context_files]:
+        for rel_id_str, info in sorted_candidates:
             rel_id = uuid.UUID(rel_id_str)
             if rel_id in files_dict:
                 rel_file = files_dict[rel_id]
 
-                content = rel_file.content[:500] if rel_file.content else ""
-                if len(rel_file.content or "") > 500:
-                    content += "..."
+                content = contents.get(rel_id) or ""
+                if len(content) > 500:
+                    content = content[:500] + "..."
 
                 related_files.append({
                     "id": rel_id_str,
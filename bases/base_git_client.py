@@ -0,0 +1,104 @@
+import abc
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, Dict, List, Optional
+
+from dto import git_file_dto
+from utils import const, file_policy
+
+
+class BaseGitClient(abc.ABC):
+    """
+    Base repository files source
+    """
+
+    def __init__(self, policy: Optional[file_policy.FilePolicy] = None) -> None:
+        """
+        Init variables
+        :param policy: files ingestion policy
+        """
+
+        self.policy = policy or file_policy.FilePolicy()
+        self.skipped_files: List[git_file_dto.SkippedFile] = []
+
+    def _skip(
+        self,
+        path: str,
+        reason: const.SkipReason,
+        sha: Optional[str] = None,
+        size: Optional[float] = None,
+    ) -> None:
+        """
+        Record file skipped by policy
+        :param path: file path
+        :param reason: skip reason
+        :param sha: file hash
+        :param size: file size in bytes
+        """
+
+        self.skipped_files.append(
+            git_file_dto.SkippedFile(path=path, sha=sha, size=size, reason=reason)
+        )
+
+    @property
+    @abc.abstractmethod
+    def repo_name(self) -> str:
+        """
+        Get repository full name files are stored under
+        :return: repository name
+        """
+
+        raise NotImplementedError
+
+    @asynccontextmanager
+    @abc.abstractmethod
+    async def __call__(self):
+        """
+        Init client resources
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def list_files_metadata(self) -> List[Dict]:
+        """
+        Get metadata (path, sha, size) of all repository files without content
+        :return: files metadata
+        """
+
+        raise NotImplementedError
+
+    async def iter_files_metadata(self) -> AsyncGenerator[List[Dict], None]:
+        """
+        Get metadata of repository files by chunks as they are discovered
+        :return: files metadata chunks
+        """
+
+        yield await self.list_files_metadata()
+
+    @abc.abstractmethod
+    def get_files_by_metadata(
+        self,
+        items: List[Dict],
+        batch_size: int = 10,
+    ) -> AsyncGenerator[List[git_file_dto.GitFile], None]:
+        """
+        Load files content by batch
+        :param items: files metadata
+        :param batch_size: batch size
+        :return: files batch
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_files_batch(
+        self,
+        batch_size: int = 10,
+    ) -> AsyncGenerator[List[git_file_dto.GitFile], None]:
+        """
+        Get files from repository by batch
+        :param batch_size: batch size
+        :return: files batch
+        """
+
+        raise NotImplementedError
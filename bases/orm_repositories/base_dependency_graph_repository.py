@@ -1,8 +1,9 @@
 import abc
 import uuid
-from typing import List, Optional
+from typing import List, Optional, Dict, Set
 
-from dto import dependency_graph_node_dto
+from dto import dependency_graph_node_dto, page_dto, graph_diff_dto, graph_adjacency_dto
+from utils import const
 
 
 class BaseDependencyGraphRepository(abc.ABC):
@@ -16,9 +17,9 @@ class BaseDependencyGraphRepository(abc.ABC):
         nodes: List[dependency_graph_node_dto.DependencyGraphNode],
     ) -> List[dependency_graph_node_dto.PythonDependencyGraphNodeInDB]:
         """
-        Create multiple nodes in DB
+        Create multiple nodes in DB, nodes of already stored edges are skipped
         :param nodes: list of nodes to create
-        :return: nodes with corresponding ids
+        :return: created nodes with corresponding ids
         """
 
         raise NotImplementedError
@@ -38,6 +39,30 @@ class BaseDependencyGraphRepository(abc.ABC):
 
         raise NotImplementedError
 
+    @abc.abstractmethod
+    async def list_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+    ) -> page_dto.Page[dependency_graph_node_dto.PythonDependencyGraphNodeInDB]:
+        """
+        Get page of nodes ordered by id with keyset pagination
+        :param limit: number of nodes to return
+        :param cursor: cursor of the page, first page if not set
+        :return: nodes page
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get_adjacency(self) -> graph_adjacency_dto.GraphAdjacency:
+        """
+        Get whole graph in compressed sparse row form
+        :return: graph adjacency
+        """
+
+        raise NotImplementedError
+
     @abc.abstractmethod
     async def get_dependencies(self, file_id: uuid.UUID) -> set[uuid.UUID]:
         """
@@ -59,12 +84,83 @@ class BaseDependencyGraphRepository(abc.ABC):
         raise NotImplementedError
 
     @abc.abstractmethod
-    async def get_dependency_graph(self, file_id: uuid.UUID, depth: int = 2) -> dict:
+    async def get_dependencies_by_file_ids(
+        self,
+        file_ids: List[uuid.UUID],
+    ) -> Dict[uuid.UUID, Set[uuid.UUID]]:
+        """
+        Get direct dependencies of multiple files in a single query
+        :param file_ids: list of file ids
+        :return: dict of dependencies. Key - file id, value - dependency file ids, files without dependencies are omitted
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get_dependents_by_file_ids(
+        self,
+        file_ids: List[uuid.UUID],
+    ) -> Dict[uuid.UUID, Set[uuid.UUID]]:
         """
-        Get full dependency graph up to specified depth
+        Get dependents of multiple files in a single query
+        :param file_ids: list of file ids
+        :return: dict of dependents. Key - file id, value - dependent file ids, files without dependents are omitted
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get_dependency_graph(
+        self,
+        file_id: uuid.UUID,
+        depth: int = 2,
+        direction: const.GraphDirection = const.GraphDirection.DEPENDENCIES,
+    ) -> dict:
+        """
+        Get dependency graph up to specified depth. Every file is included once
+        at its shallowest depth, so cycles are cut
         :param file_id: starting file id
-        :param depth: max depth to traverse
-        :return: nested dict representing dependency tree
+        :param depth: max depth to traverse, files at the last level are listed with empty subtrees
+        :param direction: follow dependencies or dependents
+        :return: nested dict representing dependency tree. Key - file id, value - its subtree
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get_importers(self, paths: List[str]) -> Set[uuid.UUID]:
+        """
+        Get files importing any of module paths, whether the import is resolved or not
+        :param paths: module paths
+        :return: importing file ids
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def replace_dependencies(
+        self,
+        file_ids: List[uuid.UUID],
+        dependencies: Dict[uuid.UUID, Set[uuid.UUID]],
+        imports: Dict[uuid.UUID, Set[str]],
+    ) -> graph_diff_dto.GraphDiff:
+        """
+        Replace dependencies and imports of files in one transaction.
+        New edges are diffed against stored ones, only missing edges are inserted and
+        only outdated edges are deleted
+        :param file_ids: re-resolved files, files missing in dependencies lose all their dependencies
+        :param dependencies: new dependencies. Key - file id, value - dependency file ids
+        :param imports: imported module paths of existing files. Key - file id, value - paths
+        :return: applied changes
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def delete_by_file_ids(self, file_ids: List[uuid.UUID]) -> None:
+        """
+        Delete dependencies of files (nodes where files are children)
+        :param file_ids: list of file ids
         """
 
         raise NotImplementedError
@@ -1,8 +1,8 @@
 import abc
 import uuid
-from typing import Optional, List, Dict
+from typing import AsyncGenerator, Optional, List, Dict, Set
 
-from dto import git_file_dto
+from dto import git_file_dto, page_dto, upsert_result_dto, file_facets_dto, search_hit_dto
 from utils import const
 
 
@@ -24,26 +24,95 @@ class BaseFilesRepository(abc.ABC):
 
         raise NotImplementedError
 
+    @abc.abstractmethod
+    async def batch_upsert(
+        self,
+        files: List[git_file_dto.GitFile],
+    ) -> upsert_result_dto.UpsertResult:
+        """
+        Insert new files and update stored files by repository and path if their hash differs
+        :param files: list of files
+        :return: ids of inserted, updated and untouched files
+        """
+
+        raise NotImplementedError
+
     @abc.abstractmethod
     async def get_files_count(
         self,
         file_type: Optional[const.FileType] = None,
         extension: Optional[str] = None,
+        directory: Optional[str] = None,
     ) -> int:
         """
         Get number of files in DB
         :param file_type: file type
         :param extension: file extension
+        :param directory: directory path, nested directories included
         :return: files count
         """
 
         raise NotImplementedError
 
+    @abc.abstractmethod
+    async def get_facets(
+        self,
+        file_type: Optional[const.FileType] = None,
+        extension: Optional[str] = None,
+        directory: Optional[str] = None,
+    ) -> file_facets_dto.FileFacets:
+        """
+        Get files counts by extension, directory and type
+        :param file_type: file type
+        :param extension: file extension
+        :param directory: directory path, nested directories included
+        :return: files facets
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def search(
+        self,
+        query: str,
+        limit: int = 10,
+        file_type: Optional[const.FileType] = None,
+        extension: Optional[str] = None,
+        directory: Optional[str] = None,
+    ) -> List[search_hit_dto.SearchHit]:
+        """
+        Full-text search of files by content
+        :param query: search query
+        :param limit: number of files to return
+        :param file_type: file type
+        :param extension: file extension
+        :param directory: directory path, nested directories included
+        :return: files ordered by relevance, without content
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def search_chunks(
+        self,
+        query: str,
+        limit: int = 10,
+    ) -> List[search_hit_dto.SearchHit]:
+        """
+        Full-text search of embedded file chunks
+        :param query: search query
+        :param limit: number of chunks to return
+        :return: chunks ordered by relevance
+        """
+
+        raise NotImplementedError
+
     @abc.abstractmethod
     async def list(
         self,
         file_type: Optional[const.FileType] = None,
         extension: Optional[str] = None,
+        directory: Optional[str] = None,
         limit: Optional[int] = None,
         offset: Optional[int] = None,
     ) -> List[git_file_dto.GitFileInDB]:
@@ -51,6 +120,7 @@ class BaseFilesRepository(abc.ABC):
         Get list of files
         :param file_type: file type
         :param extension: file extension
+        :param directory: directory path, nested directories included
         :param limit: number of files to return
         :param offset: offset of files to return
         :return: files
@@ -58,6 +128,93 @@ class BaseFilesRepository(abc.ABC):
 
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def iter_files(
+        self,
+        file_type: Optional[const.FileType] = None,
+        extension: Optional[str] = None,
+        directory: Optional[str] = None,
+        batch_size: int = 1000,
+    ) -> AsyncGenerator[List[git_file_dto.GitFileInDB], None]:
+        """
+        Iterate over all files by batches from a single server-side cursor. The connection is held
+        until iteration ends, consumers waiting on remote calls should use list_page
+        :param file_type: file type
+        :param extension: file extension
+        :param directory: directory path, nested directories included
+        :param batch_size: number of files fetched from the cursor at once
+        :return: files batch
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def list_meta(
+        self,
+        file_type: Optional[const.FileType] = None,
+        extension: Optional[str] = None,
+        directory: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+    ) -> List[git_file_dto.GitFileMetaInDB]:
+        """
+        Get list of files metadata without content
+        :param file_type: file type
+        :param extension: file extension
+        :param directory: directory path, nested directories included
+        :param limit: number of files to return
+        :param offset: offset of files to return
+        :return: files metadata
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def list_meta_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        file_type: Optional[const.FileType] = None,
+        extension: Optional[str] = None,
+        directory: Optional[str] = None,
+        order: const.PageOrder = const.PageOrder.ID,
+    ) -> page_dto.Page[git_file_dto.GitFileMetaInDB]:
+        """
+        Get page of files metadata without content with keyset pagination
+        :param limit: number of files to return
+        :param cursor: cursor of the page, first page if not set
+        :param file_type: file type
+        :param extension: file extension
+        :param directory: directory path, nested directories included
+        :param order: files order
+        :return: files metadata page
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def list_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        file_type: Optional[const.FileType] = None,
+        extension: Optional[str] = None,
+        directory: Optional[str] = None,
+        order: const.PageOrder = const.PageOrder.ID,
+    ) -> page_dto.Page[git_file_dto.GitFileInDB]:
+        """
+        Get page of files with keyset pagination
+        :param limit: number of files to return
+        :param cursor: cursor of the page, first page if not set
+        :param file_type: file type
+        :param extension: file extension
+        :param directory: directory path, nested directories included
+        :param order: files order
+        :return: files page
+        """
+
+        raise NotImplementedError
+
     @abc.abstractmethod
     async def batch_update(self, objs_in: List[dict]) -> None:
         """
@@ -86,3 +243,94 @@ class BaseFilesRepository(abc.ABC):
         """
 
         raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get_meta_by_id(self, file_id: uuid.UUID) -> Optional[git_file_dto.GitFileMetaInDB]:
+        """
+        Get file metadata without content by id
+        :param file_id: file id
+        :return: file metadata if found, None otherwise
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get_meta_by_ids(
+        self,
+        file_ids: List[uuid.UUID],
+    ) -> Dict[uuid.UUID, git_file_dto.GitFileMetaInDB]:
+        """
+        Get metadata without content of multiple files in a single query
+        :param file_ids: list of file ids
+        :return: dict of files metadata. Key - id, value - metadata
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get_meta_by_shas(
+        self,
+        shas: List[str],
+    ) -> Dict[str, List[git_file_dto.GitFileMetaInDB]]:
+        """
+        Get metadata without content of files with given content hashes
+        :param shas: content hashes
+        :return: dict of files metadata. Key - hash, value - files with this content
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get_contents(
+        self,
+        file_ids: List[uuid.UUID],
+        max_length: Optional[int] = None,
+    ) -> Dict[uuid.UUID, str]:
+        """
+        Get content of multiple files
+        :param file_ids: list of file ids
+        :param max_length: number of leading characters to load, whole content if not set
+        :return: dict of contents. Key - id, value - content
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get_refs(self, repo: Optional[str] = None) -> Dict[str, git_file_dto.GitFileRef]:
+        """
+        Get stored versions of all files
+        :param repo: repository full name, files of all repositories if not set
+        :return: dict of file versions. Key - path, value - version
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def delete_by_ids(self, file_ids: List[uuid.UUID]) -> None:
+        """
+        Delete files with their dependency graph nodes.
+        Contents with their chunks are kept until delete_orphan_blobs
+        :param file_ids: list of file ids
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def delete_orphan_blobs(self) -> int:
+        """
+        Delete contents not referenced by any file, their embedded chunks are removed by cascade.
+        Maintenance step, safe to run alongside ingestion: contents being stored are skipped
+        :return: number of deleted contents
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get_embedded_shas(self, shas: List[str]) -> Set[str]:
+        """
+        Get content hashes which already have embedded chunks
+        :param shas: content hashes
+        :return: embedded content hashes
+        """
+
+        raise NotImplementedError
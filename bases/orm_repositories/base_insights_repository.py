@@ -1,7 +1,8 @@
 import abc
-from typing import Optional, List
+import uuid
+from typing import AsyncGenerator, Optional, List, Dict
 
-from dto import insight_dto
+from dto import insight_dto, page_dto, search_hit_dto
 
 
 class BaseInsightsRepository(abc.ABC):
@@ -24,6 +25,35 @@ class BaseInsightsRepository(abc.ABC):
 
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def iter_insights(
+        self,
+        batch_size: int = 1000,
+    ) -> AsyncGenerator[List[insight_dto.InsightInDB], None]:
+        """
+        Iterate over all insights by batches from a single server-side cursor. The connection is held
+        until iteration ends, consumers waiting on remote calls should use list_page
+        :param batch_size: number of insights fetched from the cursor at once
+        :return: insights batch
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def list_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+    ) -> page_dto.Page[insight_dto.InsightInDB]:
+        """
+        Get page of insights ordered by id with keyset pagination
+        :param limit: number of insights to return
+        :param cursor: cursor of the page, first page if not set
+        :return: insights page
+        """
+
+        raise NotImplementedError
+
     @abc.abstractmethod
     async def batch_create(
         self,
@@ -36,3 +66,38 @@ class BaseInsightsRepository(abc.ABC):
         """
 
         raise NotImplementedError
+
+    @abc.abstractmethod
+    async def delete_by_file_ids(self, file_ids: List[uuid.UUID]) -> int:
+        """
+        Delete insights referencing any of files, their embedded chunks are removed by cascade
+        :param file_ids: list of file ids
+        :return: number of deleted insights
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get_by_ids(self, insight_ids: List[uuid.UUID]) -> Dict[uuid.UUID, insight_dto.InsightInDB]:
+        """
+        Get multiple insights by their ids in a single query
+        :param insight_ids: list of insight ids
+        :return: dict of insights. Key - id, value - data
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def search(
+        self,
+        query: str,
+        limit: int = 10,
+    ) -> List[search_hit_dto.SearchHit]:
+        """
+        Full-text search of insights
+        :param query: search query
+        :param limit: number of insights to return
+        :return: insights ordered by relevance
+        """
+
+        raise NotImplementedError
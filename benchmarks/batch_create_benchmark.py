@@ -0,0 +1,136 @@
+"""
+Compare COPY based batch_create of the files repository with the ORM
+add_all / flush / refresh path it replaced.
+
+Usage: python -m benchmarks.batch_create_benchmark [--sizes 1000 10000 100000]
+
+Rows are written to the database from PostgresConfig (or --database-url)
+and removed after each run, the schema must already exist.
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from typing import List
+
+from sqlalchemy import delete
+
+from config import pg_config
+from db_clients import alchemy_pg_client
+from dto import git_file_dto
+from orm.models import file_orm, blob_orm
+from orm.repositories import files_repository
+from utils import const
+
+BENCHMARK_DIR = "benchmark/"
+
+
+def make_files(count: int) -> List[git_file_dto.GitFile]:
+    """
+    Generate files
+    :param count: number of files
+    :return: files
+    """
+
+    return [
+        git_file_dto.GitFile(
+            path=f"{BENCHMARK_DIR}{uuid.uuid4().hex}.py",
+            sha=uuid.uuid4().hex,
+            size=512,
+            type=const.FileType.CODE,
+            content="import os\n" * 50,
+        )
+        for _ in range(count)
+    ]
+
+
+async def orm_batch_create(
+    pg_client: alchemy_pg_client.AlchemyPGClient,
+    files: List[git_file_dto.GitFile],
+) -> None:
+    """
+    Previous batch_create implementation
+    :param pg_client: Postgres alchemy client
+    :param files: files to create
+    """
+
+    db_objs = [
+        file_orm.FileORM(
+            path=obj.path,
+            sha=obj.sha,
+            size_bytes=obj.size,
+            type=obj.type,
+            blob=blob_orm.BlobORM(sha=obj.sha, content=obj.content),
+        )
+        for obj in files
+    ]
+
+    async with pg_client.session() as session:
+        session.add_all(db_objs)
+
+        await session.flush()
+
+        for db_obj in db_objs:
+            await session.refresh(db_obj)
+
+        await session.commit()
+
+
+async def cleanup(pg_client: alchemy_pg_client.AlchemyPGClient) -> None:
+    """
+    Remove benchmark rows
+    :param pg_client: Postgres alchemy client
+    """
+
+    async with pg_client.session() as session:
+        await session.execute(
+            delete(file_orm.FileORM).where(file_orm.FileORM.path.startswith(BENCHMARK_DIR))
+        )
+        await session.commit()
+
+    await files_repository.FilesRepository(pg_client).delete_orphan_blobs()
+
+
+async def main(database_url: str, sizes: List[int]) -> None:
+    """
+    Run benchmark
+    :param database_url: database url
+    :param sizes: batch sizes
+    """
+
+    pg_client = alchemy_pg_client.AlchemyPGClient(database_url)
+    await pg_client.connect()
+    files_repo = files_repository.FilesRepository(pg_client)
+
+    print(f"{'rows':>8} {'orm, s':>10} {'copy, s':>10} {'speedup':>8}")
+
+    try:
+        for size in sizes:
+            files = make_files(size)
+
+            start = time.perf_counter()
+            await orm_batch_create(pg_client, files)
+            orm_elapsed = time.perf_counter() - start
+            await cleanup(pg_client)
+
+            start = time.perf_counter()
+            await files_repo.batch_create(files)
+            copy_elapsed = time.perf_counter() - start
+            await cleanup(pg_client)
+
+            print(
+                f"{size:>8} {orm_elapsed:>10.2f} {copy_elapsed:>10.2f} "
+                f"{orm_elapsed / copy_elapsed:>7.1f}x"
+            )
+    finally:
+        await pg_client.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="batch_create benchmark")
+    parser.add_argument("--database-url", default=str(pg_config.PostgresConfig().postgres_dsn))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    asyncio.run(main(args.database_url, args.sizes))
@@ -0,0 +1,171 @@
+"""
+Compare stored size and read throughput of plain file contents with
+zstd-compressed contents, with and without a per-repository dictionary.
+
+Usage: python -m benchmarks.content_compression_benchmark [--source .] [--files 20000]
+
+Contents are sampled from text files under --source, each copy gets a unique
+trailer so every file is stored as its own blob. Small sources are repeated
+and favour the dictionary, point --source to a real checkout for fair ratios. Rows are written to the
+database from PostgresConfig (or --database-url) and removed after each run,
+the schema must already exist.
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from pathlib import Path
+from typing import List
+
+from sqlalchemy import delete, select
+from sqlalchemy.sql.functions import func
+
+from config import pg_config
+from db_clients import alchemy_pg_client
+from dto import git_file_dto
+from orm.models import file_orm, blob_orm, compression_dictionary_orm
+from orm.repositories import files_repository
+from utils import const
+
+BENCHMARK_REPO = "benchmark/content-compression"
+BENCHMARK_DIR = "benchmark-compression"
+SOURCE_SUFFIXES = {".py", ".md", ".txt", ".toml", ".ini", ".yaml", ".yml", ".json"}
+
+
+def make_files(source: Path, count: int) -> List[git_file_dto.GitFile]:
+    """
+    Generate files from source tree contents
+    :param source: directory with sample files
+    :param count: number of files
+    :return: files
+    """
+
+    samples = [
+        path.read_text(errors="replace")
+        for path in sorted(source.rglob("*"))
+        if path.is_file() and path.suffix in SOURCE_SUFFIXES and ".git" not in path.parts
+    ]
+    samples = [sample for sample in samples if sample.strip()]
+
+    files = []
+
+    for i in range(count):
+        content = f"{samples[i % len(samples)]}\n# copy {i}\n"
+        files.append(
+            git_file_dto.GitFile(
+                repo=BENCHMARK_REPO,
+                path=f"{BENCHMARK_DIR}/{i}.py",
+                sha=uuid.uuid4().hex,
+                size=len(content),
+                type=const.FileType.CODE,
+                content=content,
+            )
+        )
+
+    return files
+
+
+async def cleanup(pg_client: alchemy_pg_client.AlchemyPGClient) -> None:
+    """
+    Remove benchmark rows
+    :param pg_client: Postgres alchemy client
+    """
+
+    async with pg_client.session() as session:
+        await session.execute(delete(file_orm.FileORM).where(file_orm.FileORM.repo == BENCHMARK_REPO))
+        await session.commit()
+
+    await files_repository.FilesRepository(pg_client).delete_orphan_blobs()
+
+    async with pg_client.session() as session:
+        await session.execute(
+            delete(compression_dictionary_orm.CompressionDictionaryORM).where(
+                compression_dictionary_orm.CompressionDictionaryORM.repo == BENCHMARK_REPO
+            )
+        )
+        await session.commit()
+
+
+async def stored_bytes(pg_client: alchemy_pg_client.AlchemyPGClient) -> int:
+    """
+    Get stored size of benchmark contents, TOAST compression included
+    :param pg_client: Postgres alchemy client
+    :return: size in bytes
+    """
+
+    async with pg_client.session() as session:
+        query = select(
+            func.sum(
+                func.coalesce(func.pg_column_size(blob_orm.BlobORM.content), 0)
+                + func.coalesce(func.pg_column_size(blob_orm.BlobORM.content_zstd), 0)
+            )
+        ).join(
+            file_orm.FileORM, file_orm.FileORM.sha == blob_orm.BlobORM.sha
+        ).where(
+            file_orm.FileORM.repo == BENCHMARK_REPO
+        )
+
+        return (await session.execute(query)).scalar() or 0
+
+
+async def main(database_url: str, source: Path, count: int) -> None:
+    """
+    Run benchmark
+    :param database_url: database url
+    :param source: directory with sample files
+    :param count: number of files
+    """
+
+    pg_client = alchemy_pg_client.AlchemyPGClient(database_url)
+    await pg_client.connect()
+
+    files = make_files(source, count)
+    raw_bytes = sum(len(file.content.encode()) for file in files)
+
+    modes = [
+        ("plain", {"compress": False}),
+        # dictionary is never trained with unreachable samples threshold
+        ("zstd", {"compress": True, "dictionary_min_samples": count + 1}),
+        ("zstd + dictionary", {"compress": True}),
+    ]
+
+    print(f"{count} files, {raw_bytes / 2 ** 20:.1f} MiB of content")
+    print(f"{'mode':<18} {'stored, MiB':>12} {'ratio':>7} {'write, s':>9} {'read, MiB/s':>12}")
+
+    try:
+        for name, options in modes:
+            await cleanup(pg_client)
+
+            start = time.perf_counter()
+            await files_repository.FilesRepository(pg_client, **options).batch_create(files)
+            write_elapsed = time.perf_counter() - start
+
+            size = await stored_bytes(pg_client)
+
+            # new repository instance loads dictionaries on the first read
+            reader = files_repository.FilesRepository(pg_client)
+            read = 0
+
+            start = time.perf_counter()
+            async for batch in reader.iter_files(directory=BENCHMARK_DIR):
+                read += sum(len(file.content.encode()) for file in batch)
+            read_elapsed = time.perf_counter() - start
+
+            print(
+                f"{name:<18} {size / 2 ** 20:>12.2f} {raw_bytes / size:>6.1f}x "
+                f"{write_elapsed:>9.2f} {read / 2 ** 20 / read_elapsed:>12.1f}"
+            )
+    finally:
+        await cleanup(pg_client)
+        await pg_client.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="content compression benchmark")
+    parser.add_argument("--database-url", default=str(pg_config.PostgresConfig().postgres_dsn))
+    parser.add_argument("--source", type=Path, default=Path("."))
+    parser.add_argument("--files", type=int, default=20_000)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.database_url, args.source, args.files))
@@ -0,0 +1,197 @@
+"""
+Compare dependency graph lookups without indexes with lookups served by the
+(file_id, parent_id) and (parent_id, file_id) indexes.
+
+Usage: python -m benchmarks.dependency_graph_lookup_benchmark [--files 100000] [--edges 1000000]
+
+Rows are written to the database from PostgresConfig (or --database-url)
+and removed after the run, the schema must already exist. Lookups without
+indexes run in a transaction dropping them, which is rolled back.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from typing import List
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import pg_config
+from db_clients import alchemy_pg_client
+from orm.models import file_orm, python_dependency_graph_orm
+from orm.repositories import files_repository
+
+BENCHMARK_REPO = "benchmark/dependency-graph"
+RUNS = 20
+BATCH_SIZE = 100
+
+
+async def populate(pg_client: alchemy_pg_client.AlchemyPGClient, files: int, edges: int) -> List[uuid.UUID]:
+    """
+    Generate files with edges spread evenly over them
+    :param pg_client: Postgres alchemy client
+    :param files: number of files
+    :param edges: number of edges
+    :return: file ids
+    """
+
+    async with pg_client.session() as session:
+        await session.execute(
+            text(
+                """
+                INSERT INTO blobs (sha, content)
+                SELECT md5(i::text), 'import os'
+                FROM generate_series(1, :files) AS i
+                ON CONFLICT DO NOTHING
+                """
+            ),
+            {"files": files},
+        )
+        await session.execute(
+            text(
+                """
+                INSERT INTO files (id, repo, path, sha, size_bytes, type)
+                SELECT gen_random_uuid(), :repo, 'm' || (i % 100) || '/f' || i || '.py', md5(i::text), 9, 'code'
+                FROM generate_series(1, :files) AS i
+                """
+            ),
+            {"repo": BENCHMARK_REPO, "files": files},
+        )
+        # edge i links file i % n with a distinct parent for every round i / n
+        await session.execute(
+            text(
+                """
+                WITH numbered AS (
+                    SELECT id, row_number() OVER (ORDER BY id) - 1 AS position
+                    FROM files
+                    WHERE repo = :repo
+                )
+                INSERT INTO python_dependency_graph (id, file_id, parent_id)
+                SELECT gen_random_uuid(), child.id, parent.id
+                FROM generate_series(0, :edges - 1) AS i
+                JOIN numbered AS child ON child.position = i % :files
+                JOIN numbered AS parent ON parent.position = (i % :files + 1 + i / :files * 37) % :files
+                ON CONFLICT DO NOTHING
+                """
+            ),
+            {"repo": BENCHMARK_REPO, "files": files, "edges": edges},
+        )
+        await session.execute(text("ANALYZE files"))
+        await session.execute(text("ANALYZE python_dependency_graph"))
+        await session.commit()
+
+        result = await session.execute(select(file_orm.FileORM.id).where(file_orm.FileORM.repo == BENCHMARK_REPO))
+
+        return list(result.scalars())
+
+
+async def measure(session: AsyncSession, query_factory) -> float:
+    """
+    Get median query time
+    :param session: DB session
+    :param query_factory: query factory
+    :return: median time in milliseconds
+    """
+
+    timings = []
+
+    for _ in range(RUNS):
+        query = query_factory()
+        start = time.perf_counter()
+        (await session.execute(query)).all()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return statistics.median(timings)
+
+
+async def measure_lookups(session: AsyncSession, file_ids: List[uuid.UUID]) -> List[float]:
+    """
+    Measure lookups issued by the dependency graph repository
+    :param session: DB session
+    :param file_ids: file ids to look up
+    :return: median times of dependencies, dependents and batched lookups in milliseconds
+    """
+
+    graph_orm = python_dependency_graph_orm.PythonDependencyGraphORM
+
+    return [
+        await measure(
+            session,
+            lambda: select(graph_orm.file_id, graph_orm.parent_id).where(
+                graph_orm.file_id.in_([random.choice(file_ids)])
+            ),
+        ),
+        await measure(
+            session,
+            lambda: select(graph_orm.parent_id, graph_orm.file_id).where(
+                graph_orm.parent_id.in_([random.choice(file_ids)])
+            ),
+        ),
+        await measure(
+            session,
+            lambda: select(graph_orm.file_id, graph_orm.parent_id).where(
+                graph_orm.file_id.in_(random.sample(file_ids, BATCH_SIZE))
+            ),
+        ),
+    ]
+
+
+async def main(database_url: str, files: int, edges: int) -> None:
+    """
+    Run benchmark
+    :param database_url: database url
+    :param files: number of files
+    :param edges: number of edges
+    """
+
+    pg_client = alchemy_pg_client.AlchemyPGClient(database_url)
+    await pg_client.connect()
+
+    try:
+        start = time.perf_counter()
+        file_ids = await populate(pg_client, files, edges)
+        print(f"populated {files} files and {edges} edges in {time.perf_counter() - start:.1f}s")
+
+        async with pg_client.session() as session:
+            indexed = await measure_lookups(session, file_ids)
+
+        async with pg_client.session() as session:
+            await session.execute(text("DROP INDEX idx_python_dependency_graph_file_id_parent_id"))
+            await session.execute(text("DROP INDEX idx_python_dependency_graph_parent_id_file_id"))
+            plain = await measure_lookups(session, file_ids)
+            await session.rollback()
+
+        print(f"{'lookup':<28} {'no index, ms':>13} {'indexed, ms':>12}")
+
+        for name, plain_elapsed, indexed_elapsed in zip(
+            ["dependencies of a file", "dependents of a file", f"dependencies of {BATCH_SIZE} files"],
+            plain,
+            indexed,
+        ):
+            print(f"{name:<28} {plain_elapsed:>13.2f} {indexed_elapsed:>12.2f}")
+    finally:
+        graph_orm = python_dependency_graph_orm.PythonDependencyGraphORM
+        benchmark_ids = select(file_orm.FileORM.id).where(file_orm.FileORM.repo == BENCHMARK_REPO)
+
+        async with pg_client.session() as session:
+            await session.execute(delete(graph_orm).where(graph_orm.file_id.in_(benchmark_ids)))
+            await session.execute(delete(file_orm.FileORM).where(file_orm.FileORM.repo == BENCHMARK_REPO))
+            await session.commit()
+
+        await files_repository.FilesRepository(pg_client).delete_orphan_blobs()
+
+        await pg_client.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="dependency graph lookups benchmark")
+    parser.add_argument("--database-url", default=str(pg_config.PostgresConfig().postgres_dsn))
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--edges", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.database_url, args.files, args.edges))
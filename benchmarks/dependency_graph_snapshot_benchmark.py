@@ -0,0 +1,113 @@
+"""
+Compare dependency graph lookups of the DB repository with the in-memory
+CSR snapshot.
+
+Usage: python -m benchmarks.dependency_graph_snapshot_benchmark [--files 100000] [--edges 1000000]
+
+Rows are written to the database from PostgresConfig (or --database-url)
+and removed after the run, the schema must already exist.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from typing import Awaitable, Callable, List
+
+from sqlalchemy import delete, select
+
+from benchmarks import dependency_graph_lookup_benchmark
+from config import pg_config
+from db_clients import alchemy_pg_client
+from orm.models import file_orm, python_dependency_graph_orm
+from orm.repositories import dependency_graph_repository, files_repository, snapshot_dependency_graph_repository
+from utils import const
+
+LOOKUPS = 200
+
+
+async def measure(lookup: Callable[[uuid.UUID], Awaitable], file_ids: List[uuid.UUID]) -> float:
+    """
+    Get mean lookup time over sequential lookups
+    :param lookup: lookup by file id
+    :param file_ids: files to look up
+    :return: mean time in microseconds
+    """
+
+    start = time.perf_counter()
+
+    for file_id in file_ids:
+        await lookup(file_id)
+
+    return (time.perf_counter() - start) / len(file_ids) * 1_000_000
+
+
+async def main(database_url: str, files: int, edges: int) -> None:
+    """
+    Run benchmark
+    :param database_url: database url
+    :param files: number of files
+    :param edges: number of edges
+    """
+
+    pg_client = alchemy_pg_client.AlchemyPGClient(database_url)
+    await pg_client.connect()
+    deps_repo = dependency_graph_repository.DependencyGraphRepository(pg_client)
+    snapshot_repo = snapshot_dependency_graph_repository.SnapshotDependencyGraphRepository(deps_repo)
+
+    try:
+        start = time.perf_counter()
+        file_ids = await dependency_graph_lookup_benchmark.populate(pg_client, files, edges)
+        print(f"populated {files} files and {edges} edges in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        await snapshot_repo.get_dependencies(file_ids[0])
+        print(f"snapshot loaded in {time.perf_counter() - start:.2f}s")
+
+        sample = random.sample(file_ids, LOOKUPS)
+        cases = [
+            ("dependencies of a file", lambda repo: repo.get_dependencies),
+            ("dependents of a file", lambda repo: repo.get_dependents),
+            (
+                "dependents graph, depth 2",
+                lambda repo: lambda file_id: repo.get_dependency_graph(
+                    file_id, 2, const.GraphDirection.DEPENDENTS
+                ),
+            ),
+        ]
+
+        print(f"{'lookup':<28} {'db, us':>10} {'snapshot, us':>13}")
+
+        for name, lookup in cases:
+            db_elapsed = await measure(lookup(deps_repo), sample)
+            snapshot_elapsed = await measure(lookup(snapshot_repo), sample)
+            print(f"{name:<28} {db_elapsed:>10.1f} {snapshot_elapsed:>13.1f}")
+    finally:
+        graph_orm = python_dependency_graph_orm.PythonDependencyGraphORM
+        benchmark_ids = select(file_orm.FileORM.id).where(
+            file_orm.FileORM.repo == dependency_graph_lookup_benchmark.BENCHMARK_REPO
+        )
+
+        async with pg_client.session() as session:
+            await session.execute(delete(graph_orm).where(graph_orm.file_id.in_(benchmark_ids)))
+            await session.execute(
+                delete(file_orm.FileORM).where(
+                    file_orm.FileORM.repo == dependency_graph_lookup_benchmark.BENCHMARK_REPO
+                )
+            )
+            await session.commit()
+
+        await files_repository.FilesRepository(pg_client).delete_orphan_blobs()
+
+        await pg_client.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="dependency graph snapshot benchmark")
+    parser.add_argument("--database-url", default=str(pg_config.PostgresConfig().postgres_dsn))
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--edges", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.database_url, args.files, args.edges))
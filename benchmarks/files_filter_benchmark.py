@@ -0,0 +1,150 @@
+"""
+Compare path ILIKE filtering with indexed extension and directory columns.
+
+Usage: python -m benchmarks.files_filter_benchmark [--rows 1000000]
+
+Rows are written to the database from PostgresConfig (or --database-url)
+and removed after the run, the schema must already exist.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.sql.functions import func
+
+from config import pg_config
+from db_clients import alchemy_pg_client
+from orm.models import file_orm
+from orm.repositories import files_repository
+
+BENCHMARK_REPO = "benchmark/files-filter"
+RUNS = 5
+
+
+async def populate(pg_client: alchemy_pg_client.AlchemyPGClient, rows: int) -> None:
+    """
+    Generate files spread over directories and extensions
+    :param pg_client: Postgres alchemy client
+    :param rows: number of files
+    """
+
+    async with pg_client.session() as session:
+        await session.execute(
+            text(
+                """
+                INSERT INTO blobs (sha, content)
+                SELECT md5(i::text), repeat(md5(i::text), 64)
+                FROM generate_series(1, :rows) AS i
+                ON CONFLICT DO NOTHING
+                """
+            ),
+            {"rows": rows},
+        )
+        await session.execute(
+            text(
+                """
+                INSERT INTO files (id, repo, path, sha, size_bytes, type)
+                SELECT
+                    gen_random_uuid(),
+                    :repo,
+                    (ARRAY['services/api', 'services/core', 'web/app', 'web/lib', 'docs', 'tools'])[1 + i % 6]
+                        || '/m' || (i % 100) || '/f' || i || '.'
+                        || (ARRAY['py', 'js', 'md', 'txt', 'json', 'ts', 'yaml'])[1 + i % 7],
+                    md5(i::text),
+                    2048,
+                    CASE WHEN i % 7 IN (0, 1, 5) THEN 'code'::filetype ELSE 'doc'::filetype END
+                FROM generate_series(1, :rows) AS i
+                """
+            ),
+            {"repo": BENCHMARK_REPO, "rows": rows},
+        )
+        await session.execute(text("ANALYZE files"))
+        await session.commit()
+
+
+async def measure(query: Callable[[], Awaitable]) -> float:
+    """
+    Get median query time
+    :param query: query coroutine factory
+    :return: median time in milliseconds
+    """
+
+    timings = []
+
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        await query()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return statistics.median(timings)
+
+
+async def main(database_url: str, rows: int) -> None:
+    """
+    Run benchmark
+    :param database_url: database url
+    :param rows: number of files
+    """
+
+    pg_client = alchemy_pg_client.AlchemyPGClient(database_url)
+    await pg_client.connect()
+    files_repo = files_repository.FilesRepository(pg_client)
+
+    async def scalar(query) -> int:
+        async with pg_client.session() as session:
+            return (await session.execute(query)).scalar()
+
+    path = file_orm.FileORM.path
+    count = select(func.count(file_orm.FileORM.id))
+
+    cases = [
+        (
+            "*.py",
+            lambda: scalar(count.filter(path.ilike("%.py"))),
+            lambda: files_repo.get_files_count(extension="py"),
+        ),
+        (
+            "*.py under services/",
+            lambda: scalar(count.filter(path.ilike("%.py"), path.like("services/%"))),
+            lambda: files_repo.get_files_count(extension="py", directory="services"),
+        ),
+        (
+            "*.md under docs/m7/",
+            lambda: scalar(count.filter(path.ilike("%.md"), path.like("docs/m7/%"))),
+            lambda: files_repo.get_files_count(extension="md", directory="docs/m7"),
+        ),
+    ]
+
+    try:
+        start = time.perf_counter()
+        await populate(pg_client, rows)
+        print(f"populated {rows} rows in {time.perf_counter() - start:.1f}s")
+
+        print(f"{'query':<24} {'ilike, ms':>10} {'indexed, ms':>12}")
+
+        for name, legacy, indexed in cases:
+            print(f"{name:<24} {await measure(legacy):>10.1f} {await measure(indexed):>12.1f}")
+
+        facets_elapsed = await measure(lambda: files_repo.get_facets(directory="services/api"))
+        print(f"{'facets of services/api':<24} {'':>10} {facets_elapsed:>12.1f}")
+    finally:
+        async with pg_client.session() as session:
+            await session.execute(delete(file_orm.FileORM).where(file_orm.FileORM.repo == BENCHMARK_REPO))
+            await session.commit()
+
+        await files_repo.delete_orphan_blobs()
+
+        await pg_client.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="files filters benchmark")
+    parser.add_argument("--database-url", default=str(pg_config.PostgresConfig().postgres_dsn))
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.database_url, args.rows))
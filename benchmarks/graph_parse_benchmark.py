@@ -0,0 +1,118 @@
+"""
+Compare import resolution of python files on the event loop thread with
+parsing in a process pool.
+
+Usage: python -m benchmarks.graph_parse_benchmark [--files 30000] [--workers 1 2 4 8]
+
+Files are generated in memory from python sources under --source, no
+database is needed.
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from pathlib import Path
+from typing import AsyncGenerator, List
+
+from dto import git_file_dto
+from graph_builders import python_files_graph_builder
+from utils import const
+
+
+def make_files(source: Path, count: int) -> List[git_file_dto.GitFileInDB]:
+    """
+    Generate python files importing each other
+    :param source: directory with sample python files
+    :param count: number of files
+    :return: files
+    """
+
+    samples = [path.read_text(errors="replace") for path in sorted(source.rglob("*.py"))]
+    samples = [sample for sample in samples if sample.strip()]
+
+    files = []
+
+    for i in range(count):
+        content = (
+            f"import pkg{(i + 1) % 100}.module{(i + 1) % count}\n"
+            f"from pkg{(i + 7) % 100}.module{(i + 7) % count} import *\n"
+            f"{samples[i % len(samples)]}"
+        )
+        files.append(
+            git_file_dto.GitFileInDB(
+                id=uuid.uuid4(),
+                path=f"pkg{i % 100}/module{i}.py",
+                sha=uuid.uuid4().hex,
+                size=len(content),
+                type=const.FileType.CODE,
+                content=content,
+            )
+        )
+
+    return files
+
+
+async def iter_sources(
+    files: List[git_file_dto.GitFileInDB],
+    batch_size: int,
+) -> AsyncGenerator[python_files_graph_builder.FilesSource, None]:
+    """
+    Iterate over files like the files repository does
+    :param files: files
+    :param batch_size: files in one batch
+    :return: files batch with contents
+    """
+
+    for start in range(0, len(files), batch_size):
+        batch = files[start:start + batch_size]
+
+        yield batch, {file.id: file.content for file in batch}
+
+
+async def main(source: Path, count: int, workers: List[int], chunk_size: int) -> None:
+    """
+    Run benchmark
+    :param source: directory with sample python files
+    :param count: number of files
+    :param workers: numbers of processes to compare
+    :param chunk_size: files in one work unit
+    """
+
+    files = make_files(source, count)
+
+    start = time.perf_counter()
+    expected = python_files_graph_builder._find_imports_batch(
+        files, {file.id: file.content for file in files}
+    )
+    sequential = time.perf_counter() - start
+
+    edges = python_files_graph_builder._resolve_dependencies(expected, files)
+    print(f"{count} files, {sum(len(deps) for deps in edges.values())} edges")
+    print(f"{'mode':<16} {'s':>8} {'files/s':>10} {'speedup':>8}")
+    print(f"{'event loop':<16} {sequential:>8.2f} {count / sequential:>10.0f} {1:>7.1f}x")
+
+    for worker_count in workers:
+        start = time.perf_counter()
+        imports = await python_files_graph_builder._process_files_parallel(
+            iter_sources(files, 1000), worker_count, chunk_size
+        )
+        elapsed = time.perf_counter() - start
+
+        assert imports == expected, "parallel parsing differs from sequential"
+
+        print(
+            f"{f'{worker_count} processes':<16} {elapsed:>8.2f} {count / elapsed:>10.0f} "
+            f"{sequential / elapsed:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="python imports parsing benchmark")
+    parser.add_argument("--source", type=Path, default=Path("."))
+    parser.add_argument("--files", type=int, default=30_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--chunk-size", type=int, default=256)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.source, args.files, args.workers, args.chunk_size))
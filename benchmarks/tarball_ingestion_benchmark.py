@@ -0,0 +1,276 @@
+"""
+Check GitHubClient tarball mode against tree mode on a generated repository
+and compare their download times.
+
+Usage: python -m benchmarks.tarball_ingestion_benchmark [--files 2000] [--batch-size 10]
+
+The repository is served by httpx.MockTransport: commit and tree responses,
+raw file contents and a gzipped tarball with the GitHub "{owner}-{repo}-{sha}/"
+root, streamed in uneven chunks behind a redirect. No network or token is
+needed. Both modes must yield the same files in batches of batch_size (the
+last one may be shorter) and skip the same files.
+"""
+
+import argparse
+import asyncio
+import io
+import random
+import tarfile
+import time
+from typing import AsyncIterator, Dict, List, Tuple
+
+import httpx
+
+from dto import git_file_dto
+from git_clients import github_client
+from utils import const, file_policy, git_utils
+
+OWNER = "benchmark"
+REPO = "tarball"
+COMMIT_SHA = "c" * 40
+TREE_SHA = "t" * 40
+ARCHIVE_URL = f"https://codeload.github.com/{OWNER}/{REPO}/legacy.tar.gz/{COMMIT_SHA}"
+
+
+def make_files(count: int, max_size: int) -> Dict[str, bytes]:
+    """
+    Generate repository files, including files skipped by policy and paths needing long name headers
+    :param count: number of text files
+    :param max_size: policy max file size
+    :return: files. Key - path, value - content
+    """
+
+    rng = random.Random(count)
+    files = {}
+
+    for i in range(count):
+        directory = "/".join(f"dir{rng.randrange(10)}" for _ in range(rng.randrange(4)))
+        path = f"{directory}/module_{i}.py" if directory else f"module_{i}.py"
+        files[path] = "".join(f"value_{i}_{j} = {j}\n" for j in range(rng.randrange(200))).encode()
+
+    files[f"{'nested_directory/' * 8}long_name_{'x' * 60}.py"] = b"long = True\n"
+    files["docs/unicode_éè.md"] = "# été\n".encode()
+    files["empty.py"] = b""
+    files["assets/image.png"] = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 4
+    files["data/huge.txt"] = b"a" * (max_size + 1)
+    files["poetry.lock"] = b"[[package]]\n"
+
+    return files
+
+
+def make_tarball(files: Dict[str, bytes]) -> bytes:
+    """
+    Pack files as GitHub tarball with directory and symlink members
+    :param files: files. Key - path, value - content
+    :return: gzipped archive
+    """
+
+    buffer = io.BytesIO()
+    root = f"{OWNER}-{REPO}-{COMMIT_SHA[:7]}"
+
+    with tarfile.open(fileobj=buffer, mode="w:gz", format=tarfile.PAX_FORMAT) as archive:
+        archive.addfile(_directory(root))
+
+        for path, data in files.items():
+            info = tarfile.TarInfo(f"{root}/{path}")
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+        link = tarfile.TarInfo(f"{root}/link.py")
+        link.type = tarfile.SYMTYPE
+        link.linkname = "empty.py"
+        archive.addfile(link)
+
+    return buffer.getvalue()
+
+
+def _directory(path: str) -> tarfile.TarInfo:
+    """
+    Build directory member
+    :param path: directory path
+    :return: member info
+    """
+
+    info = tarfile.TarInfo(path)
+    info.type = tarfile.DIRTYPE
+    info.mode = 0o755
+
+    return info
+
+
+def make_transport(files: Dict[str, bytes], archive: bytes) -> httpx.MockTransport:
+    """
+    Serve GitHub API endpoints used by tree and tarball modes
+    :param files: files. Key - path, value - content
+    :param archive: gzipped archive
+    :return: mock transport
+    """
+
+    tree = [
+        {
+            "type": "blob",
+            "mode": "100644",
+            "path": path,
+            "sha": git_utils.git_blob_sha(data),
+            "size": len(data),
+        }
+        for path, data in files.items()
+    ]
+    tree.append({"type": "blob", "mode": "120000", "path": "link.py", "sha": "l" * 40, "size": 8})
+    raw_prefix = f"/{OWNER}/{REPO}/{COMMIT_SHA}/"
+
+    async def stream_archive() -> AsyncIterator[bytes]:
+        rng = random.Random(len(archive))
+        position = 0
+
+        while position < len(archive):
+            size = rng.choice([1, 7, 511, 512, 513, 4096, 65536])
+            yield archive[position:position + size]
+            position += size
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        url = request.url
+
+        if url.host == "api.github.com":
+            if url.path == f"/repos/{OWNER}/{REPO}/commits/HEAD":
+                return httpx.Response(200, json={"sha": COMMIT_SHA, "commit": {"tree": {"sha": TREE_SHA}}})
+
+            if url.path == f"/repos/{OWNER}/{REPO}/git/trees/{TREE_SHA}":
+                return httpx.Response(200, json={"sha": TREE_SHA, "tree": tree, "truncated": False})
+
+            if url.path == f"/repos/{OWNER}/{REPO}/tarball":
+                return httpx.Response(302, headers={"Location": ARCHIVE_URL})
+
+        if url.host == "raw.githubusercontent.com" and url.path.startswith(raw_prefix):
+            data = files.get(url.path[len(raw_prefix):])
+
+            if data is not None:
+                return httpx.Response(200, content=data)
+
+        if str(url) == ARCHIVE_URL:
+            return httpx.Response(200, content=stream_archive())
+
+        return httpx.Response(404)
+
+    return httpx.MockTransport(handler)
+
+
+def check(condition: bool, message: str) -> None:
+    """
+    Fail check
+    :param condition: checked condition
+    :param message: failure message
+    """
+
+    if not condition:
+        raise AssertionError(message)
+
+
+def check_batches(batches: List[List[git_file_dto.GitFile]], batch_size: int, mode: str) -> None:
+    """
+    Check batches are full except the last one
+    :param batches: yielded batches
+    :param batch_size: batch size
+    :param mode: mode name for messages
+    """
+
+    sizes = [len(batch) for batch in batches]
+
+    check(all(size == batch_size for size in sizes[:-1]), f"{mode}: not full batch before the last one {sizes}")
+    check(bool(sizes) and 0 < sizes[-1] <= batch_size, f"{mode}: bad last batch {sizes[-1:]}")
+
+
+def to_records(batches: List[List[git_file_dto.GitFile]]) -> Dict[str, Tuple]:
+    """
+    Get files by path
+    :param batches: yielded batches
+    :return: files. Key - path, value - compared fields
+    """
+
+    records = {}
+
+    for batch in batches:
+        for file in batch:
+            check(file.path not in records, f"duplicate file {file.path}")
+            records[file.path] = (file.repo, file.sha, file.size, file.type, file.content)
+
+    return records
+
+
+async def collect(batches: AsyncIterator[List[git_file_dto.GitFile]]) -> Tuple[List[List[git_file_dto.GitFile]], float]:
+    """
+    Collect batches
+    :param batches: batches generator
+    :return: batches and elapsed time in seconds
+    """
+
+    start = time.perf_counter()
+    result = [batch async for batch in batches]
+
+    return result, time.perf_counter() - start
+
+
+async def main(files_count: int, batch_size: int) -> None:
+    """
+    Run benchmark
+    :param files_count: number of generated text files
+    :param batch_size: batch size
+    """
+
+    policy = file_policy.FilePolicy(max_size=64 * 1024)
+    files = make_files(files_count, policy.max_size)
+    archive = make_tarball(files)
+    print(f"generated {len(files)} files, archive {len(archive) / 1024:.0f} KiB")
+
+    async with httpx.AsyncClient(transport=make_transport(files, archive)) as http_client:
+        tree_client = github_client.GitHubClient(
+            REPO, OWNER, token="", policy=policy, http_client=http_client, use_cache=False
+        )
+        archive_client = github_client.GitHubClient(
+            REPO, OWNER, token="", policy=policy, http_client=http_client, use_cache=False
+        )
+
+        async with tree_client():
+            tree_batches, tree_elapsed = await collect(
+                tree_client.get_files_batch(batch_size, const.ListingMode.TREES)
+            )
+
+        async with archive_client():
+            archive_batches, archive_elapsed = await collect(archive_client.get_archive_files_batch(batch_size))
+
+    check_batches(tree_batches, batch_size, "trees")
+    check_batches(archive_batches, batch_size, "tarball")
+
+    tree_files = to_records(tree_batches)
+    archive_files = to_records(archive_batches)
+    expected = to_records([
+        [
+            git_utils.build_git_file(path, data, f"{OWNER}/{REPO}")
+            for path, data in files.items()
+            if policy.check(path, len(data)) is None and policy.check_head(data) is None
+        ]
+    ])
+
+    for mode, mode_files in (("tarball", archive_files), ("trees", tree_files)):
+        differ = sorted(path for path in set(mode_files) | set(expected) if mode_files.get(path) != expected.get(path))
+        check(not differ, f"{mode}: files differ {differ[:5]}")
+
+    skipped = {(file.path, file.reason) for file in archive_client.skipped_files}
+    check(
+        skipped == {(file.path, file.reason) for file in tree_client.skipped_files},
+        f"skipped files differ {skipped}",
+    )
+
+    print(f"files yielded by both modes match, {len(expected)} files, {len(skipped)} skipped")
+    print(f"{'mode':<10} {'batches':>8} {'elapsed, s':>11}")
+    print(f"{'trees':<10} {len(tree_batches):>8} {tree_elapsed:>11.2f}")
+    print(f"{'tarball':<10} {len(archive_batches):>8} {archive_elapsed:>11.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="tarball ingestion benchmark")
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=10)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.files, args.batch_size))
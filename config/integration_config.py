@@ -1,3 +1,5 @@
+from typing import List, Optional
+
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
@@ -15,7 +17,23 @@ class IntegrationConfig(BaseSettings):
         description="Repository owner name",
         default="owner",
     )
+    repositories: List[str] = Field(
+        description="Repositories to ingest in parallel as owner/repo or owner/repo@branch",
+        default_factory=list,
+    )
+    max_parallel_repos: int = Field(
+        description="Max repositories ingested at the same time",
+        default=8,
+    )
     token: str = Field(
         description="Git token",
         default="token",
     )
+    cache_path: Optional[str] = Field(
+        description="GitHub responses cache file, cache is disabled if not set",
+        default=None,
+    )
+    cache_max_bytes: int = Field(
+        description="GitHub responses cache size limit in bytes",
+        default=512 * 1024 * 1024,
+    )
@@ -0,0 +1,29 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+
+class StorageConfig(BaseSettings):
+    """
+    Content storage settings
+    """
+
+    compress_content: bool = Field(
+        description=(
+            "Store new file contents zstd-compressed. Inserts send plain content along with "
+            "compressed one, the search vector is built from it by Postgres, so compression "
+            "saves storage, not write traffic"
+        ),
+        default=False,
+    )
+    compression_level: int = Field(
+        description="zstd compression level",
+        default=3,
+    )
+    dictionary_size: int = Field(
+        description="Max size of per-repository zstd dictionary in bytes",
+        default=64 * 1024,
+    )
+    dictionary_min_samples: int = Field(
+        description="Min number of contents to train repository dictionary on",
+        default=16,
+    )
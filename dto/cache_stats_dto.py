@@ -0,0 +1,23 @@
+from pydantic import BaseModel, Field
+
+
+class CacheStats(BaseModel):
+    """
+    Cache counters
+    """
+
+    hits: int = Field(default=0, title="Lookups served from cache")
+    misses: int = Field(default=0, title="Lookups loaded from storage")
+    evictions: int = Field(default=0, title="Entries evicted by size limit")
+    invalidations: int = Field(default=0, title="Entries dropped as changed or deleted")
+
+    @property
+    def hit_ratio(self) -> float:
+        """
+        Get share of lookups served from cache
+        :return: hit ratio
+        """
+
+        lookups = self.hits + self.misses
+
+        return self.hits / lookups if lookups else 0.0
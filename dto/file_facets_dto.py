@@ -0,0 +1,23 @@
+from pydantic import BaseModel, Field
+
+from utils import const
+
+
+class FileFacets(BaseModel):
+    """
+    Files counts by facets
+    """
+
+    total: int = Field(default=0, title="Number of matched files")
+    extensions: dict[str, int] = Field(
+        default_factory=dict,
+        title="Files count by extension, empty key for files without extension",
+    )
+    directories: dict[str, int] = Field(
+        default_factory=dict,
+        title="Files count by parent directory, empty key for repository root",
+    )
+    types: dict[const.FileType, int] = Field(
+        default_factory=dict,
+        title="Files count by type",
+    )
@@ -1,4 +1,5 @@
 import uuid
+from typing import Optional
 
 from pydantic import BaseModel, Field
 
@@ -10,6 +11,7 @@ class GitFile(BaseModel):
     Git file metadata
     """
 
+    repo: str = Field(default="", title="Repository full name")
     path: str = Field(title="File path")
     sha: str = Field(title="File hash")
     size: float = Field(title="Size in bytes")
@@ -23,3 +25,37 @@ class GitFileInDB(GitFile):
     """
 
     id: uuid.UUID = Field(title="Id in DB")
+
+
+class GitFileMetaInDB(BaseModel):
+    """
+    Git file metadata as DB object without content
+    """
+
+    id: uuid.UUID = Field(title="Id in DB")
+    repo: str = Field(default="", title="Repository full name")
+    path: str = Field(title="File path")
+    sha: str = Field(title="File hash")
+    size: float = Field(title="Size in bytes")
+    type: const.FileType = Field(title="File type")
+
+
+class GitFileRef(BaseModel):
+    """
+    Stored file version
+    """
+
+    id: uuid.UUID = Field(title="Id in DB")
+    path: str = Field(title="File path")
+    sha: str = Field(title="File hash")
+
+
+class SkippedFile(BaseModel):
+    """
+    File skipped by ingestion policy
+    """
+
+    path: str = Field(title="File path")
+    sha: Optional[str] = Field(default=None, title="File hash")
+    size: Optional[float] = Field(default=None, title="Size in bytes")
+    reason: const.SkipReason = Field(title="Skip reason")
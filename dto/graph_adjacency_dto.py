@@ -0,0 +1,16 @@
+import uuid
+
+from pydantic import BaseModel, Field
+
+
+class GraphAdjacency(BaseModel):
+    """
+    Dependency graph in compressed sparse row form. Nodes are numbered by position in node_ids,
+    neighbours of each node are stored consecutively in ascending order
+    """
+
+    node_ids: list[uuid.UUID] = Field(default_factory=list, title="Ids of files with edges in ascending order")
+    forward_degrees: list[int] = Field(default_factory=list, title="Number of dependencies of each node")
+    forward_indices: list[int] = Field(default_factory=list, title="Dependency node numbers grouped by node")
+    reverse_degrees: list[int] = Field(default_factory=list, title="Number of dependents of each node")
+    reverse_indices: list[int] = Field(default_factory=list, title="Dependent node numbers grouped by node")
@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+
+
+class GraphDiff(BaseModel):
+    """
+    Applied dependency graph changes
+    """
+
+    resolved_count: int = Field(default=0, title="Number of re-resolved files")
+    inserted_count: int = Field(default=0, title="Number of inserted edges")
+    deleted_count: int = Field(default=0, title="Number of deleted edges")
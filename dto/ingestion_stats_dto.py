@@ -0,0 +1,27 @@
+import uuid
+
+from pydantic import BaseModel, Field
+
+
+class IngestionStats(BaseModel):
+    """
+    Ingestion pipeline counters
+    """
+
+    discovered: int = Field(default=0, title="Files found in repository tree")
+    downloaded: int = Field(default=0, title="Files with loaded content")
+    written: int = Field(default=0, title="Files inserted or updated in DB")
+    unchanged: int = Field(default=0, title="Files stored with the same hash")
+    skipped: int = Field(default=0, title="Files skipped by ingestion policy")
+    elapsed: float = Field(default=0.0, title="Pipeline wall time in seconds")
+    created_ids: list[uuid.UUID] = Field(default_factory=list, title="Ids of new files")
+    updated_ids: list[uuid.UUID] = Field(default_factory=list, title="Ids of files with changed content")
+
+    @property
+    def changed_ids(self) -> set[uuid.UUID]:
+        """
+        Get ids of new and updated files
+        :return: file ids
+        """
+
+        return set(self.created_ids) | set(self.updated_ids)
@@ -0,0 +1,17 @@
+from typing import Generic, Optional, TypeVar
+
+from pydantic import BaseModel, Field
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """
+    Page of keyset pagination
+    """
+
+    items: list[T] = Field(title="Page items")
+    next_cursor: Optional[str] = Field(
+        default=None,
+        title="Cursor of the next page, None for the last page",
+    )
@@ -0,0 +1,58 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from dto import ingestion_stats_dto
+from utils import const
+
+
+class RepoSpec(BaseModel):
+    """
+    Repository to ingest
+    """
+
+    owner: str = Field(title="Repository owner name")
+    name: str = Field(title="Repository name")
+    branch: Optional[str] = Field(default=None, title="Repository branch")
+
+    @classmethod
+    def parse(cls, value: str) -> "RepoSpec":
+        """
+        Parse repository from owner/repo or owner/repo@branch notation
+        :param value: repository string
+        :return: repository
+        """
+
+        value, _, branch = value.partition("@")
+        owner, _, name = value.partition("/")
+
+        if not owner or not name:
+            raise ValueError(f"Invalid repository: {value}")
+
+        return cls(owner=owner, name=name, branch=branch or None)
+
+    @property
+    def full_name(self) -> str:
+        """
+        Get owner/repo name
+        :return: full name
+        """
+
+        return f"{self.owner}/{self.name}"
+
+
+class RepoIngestionProgress(BaseModel):
+    """
+    Repository ingestion progress
+    """
+
+    repo: RepoSpec = Field(title="Repository")
+    status: const.IngestionStatus = Field(
+        default=const.IngestionStatus.PENDING,
+        title="Ingestion status",
+    )
+    stats: ingestion_stats_dto.IngestionStats = Field(
+        default_factory=ingestion_stats_dto.IngestionStats,
+        title="Pipeline counters, updated while ingestion is running",
+    )
+    error: Optional[str] = Field(default=None, title="Error if ingestion failed")
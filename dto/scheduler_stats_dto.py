@@ -0,0 +1,37 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class SchedulerStats(BaseModel):
+    """
+    Request scheduler counters
+    """
+
+    requests: int = Field(default=0, title="Sent requests including retries")
+    succeeded: int = Field(default=0, title="Successful responses")
+    failed: int = Field(default=0, title="Requests failed after all retries")
+    retries: int = Field(default=0, title="Retried requests")
+    throttled: int = Field(default=0, title="Rate limited responses")
+    bytes_received: int = Field(default=0, title="Received body bytes")
+    elapsed: float = Field(default=0.0, title="Seconds since the first request")
+    concurrency: int = Field(default=0, title="Current in-flight requests limit")
+    rate_limit_remaining: Optional[int] = Field(default=None, title="Last known remaining API quota")
+
+    @property
+    def requests_per_second(self) -> float:
+        """
+        Get request throughput
+        :return: requests per second
+        """
+
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        """
+        Get download throughput
+        :return: bytes per second
+        """
+
+        return self.bytes_received / self.elapsed if self.elapsed else 0.0
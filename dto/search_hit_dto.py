@@ -0,0 +1,19 @@
+import uuid
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class SearchHit(BaseModel):
+    """
+    Search result
+    """
+
+    id: uuid.UUID = Field(title="Id of file, chunk or insight")
+    content: Optional[str] = Field(
+        default=None,
+        title="Content of chunk or insight, not loaded for files",
+    )
+    score: float = Field(default=0.0, title="Relevance score, higher is better")
+    text_rank: Optional[int] = Field(default=None, title="Position in full-text results, starting from 1")
+    vector_rank: Optional[int] = Field(default=None, title="Position in vector results, starting from 1")
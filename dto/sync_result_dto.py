@@ -0,0 +1,50 @@
+import uuid
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from dto import graph_diff_dto
+
+
+class SyncResult(BaseModel):
+    """
+    Repository sync result
+    """
+
+    created_ids: list[uuid.UUID] = Field(
+        default_factory=list,
+        title="Ids of new files",
+    )
+    updated_ids: list[uuid.UUID] = Field(
+        default_factory=list,
+        title="Ids of files with changed content",
+    )
+    deleted_ids: list[uuid.UUID] = Field(
+        default_factory=list,
+        title="Ids of files removed from repository",
+    )
+    deleted_paths: list[str] = Field(
+        default_factory=list,
+        title="Paths of files removed from repository",
+    )
+    unchanged_count: int = Field(
+        default=0,
+        title="Number of files with the same hash",
+    )
+    deleted_insights_count: int = Field(
+        default=0,
+        title="Number of insights of changed and deleted files removed",
+    )
+    graph_diff: Optional[graph_diff_dto.GraphDiff] = Field(
+        default=None,
+        title="Applied dependency graph changes, not set if graph was not updated",
+    )
+
+    @property
+    def changed_ids(self) -> set[uuid.UUID]:
+        """
+        Get ids of new and updated files
+        :return: file ids
+        """
+
+        return set(self.created_ids) | set(self.updated_ids)
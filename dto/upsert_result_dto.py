@@ -0,0 +1,31 @@
+import uuid
+
+from pydantic import BaseModel, Field
+
+
+class UpsertResult(BaseModel):
+    """
+    Files upsert result
+    """
+
+    inserted_ids: list[uuid.UUID] = Field(
+        default_factory=list,
+        title="Ids of new files",
+    )
+    updated_ids: list[uuid.UUID] = Field(
+        default_factory=list,
+        title="Ids of files with changed hash",
+    )
+    untouched_ids: list[uuid.UUID] = Field(
+        default_factory=list,
+        title="Ids of files stored with the same hash",
+    )
+
+    @property
+    def changed_ids(self) -> set[uuid.UUID]:
+        """
+        Get ids of inserted and updated files
+        :return: file ids
+        """
+
+        return set(self.inserted_ids) | set(self.updated_ids)
@@ -1,4 +1,5 @@
-from typing import List
+import uuid
+from typing import List, Optional
 
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter, Language
@@ -57,7 +58,7 @@ class FilesEmbedder(base_embedder.BaseEmbedder):
             doc = Document(
                 page_content=chunk,
                 metadata={
-                    "file_id": str(file.id),
+                    "blob_sha": file.sha,
                     "chunk_index": i,
                 }
             )
@@ -98,49 +99,74 @@ class FilesEmbedder(base_embedder.BaseEmbedder):
 
         return language
 
+    async def _embed_files(
+        self,
+        files_repo: base_files_repository.BaseFilesRepository,
+        files: List[git_file_dto.GitFileInDB],
+        commit_interval: int,
+    ) -> None:
+        """
+        Embed batch of files. Every content is embedded once, files with already embedded content are skipped
+        :param files_repo: repository for files
+        :param files: files batch
+        :param commit_interval: commit interval
+        """
+
+        unique_files = {file.sha: file for file in files}
+        embedded = await files_repo.get_embedded_shas(list(unique_files))
+        files = [file for sha, file in unique_files.items() if sha not in embedded]
+
+        documents_batch = []
+
+        for file in files:
+            try:
+                docs = self._create_chunks(file)
+                documents_batch.extend(docs)
+
+                if len(documents_batch) >= commit_interval:
+                    await self.vector_store.aadd_documents(documents_batch)
+                    documents_batch = []
+            except Exception as e:
+                print(f"\nError processing {file.path}: {e}")
+
+                continue
+
+        if documents_batch:
+            await self.vector_store.aadd_documents(documents_batch)
+
     async def embed(
         self,
         files_repo: base_files_repository.BaseFilesRepository,
         batch_size: int = 100,
-        commit_interval: int = 50
+        commit_interval: int = 50,
+        file_ids: Optional[List[uuid.UUID]] = None,
     ) -> None:
         """
         Embed files
         :param files_repo: repository for files
         :param batch_size: batch size
         :param commit_interval: commit interval
+        :param file_ids: files to embed (e.g. changed by sync), all files if not set
         """
 
-        offset = 0
-        documents_batch = []
-
-        while True:
-            files_batch = await files_repo.list(
-                limit=batch_size,
-                offset=offset,
-            )
-
-            if not files_batch:
-                break
+        if file_ids is not None:
+            file_ids = list(file_ids)
 
-            for file in files_batch:
-                try:
-                    docs = self._create_chunks(file)
-                    documents_batch.extend(docs)
+            for i in range(0, len(file_ids), batch_size):
+                files_batch = await files_repo.get_by_ids(file_ids[i:i + batch_size])
+                await self._embed_files(files_repo, list(files_batch.values()), commit_interval)
 
-                    if len(documents_batch) >= commit_interval:
-                        await self.vector_store.aadd_documents(documents_batch)
-                        documents_batch = []
-                except Exception as e:
-                    print(f"\nError processing {file.path}: {e}")
+            return
 
-                    continue
+        # pages are read by separate queries, a streaming cursor would hold a connection
+        # and a transaction open during embedding calls
+        cursor = None
 
-                if documents_batch:
-                    await self.vector_store.aadd_documents(documents_batch)
-                    documents_batch = []
+        while True:
+            page = await files_repo.list_page(limit=batch_size, cursor=cursor)
+            await self._embed_files(files_repo, page.items, commit_interval)
 
-                offset += batch_size
+            if page.next_cursor is None:
+                break
 
-        if documents_batch:
-            await self.vector_store.aadd_documents(documents_batch)
+            cursor = page.next_cursor
@@ -1,4 +1,5 @@
-from typing import List
+import uuid
+from typing import List, Optional
 
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
@@ -39,6 +40,7 @@ class InsightsEmbedder(base_embedder.BaseEmbedder):
             doc = Document(
                 page_content=chunk,
                 metadata={
+                    "insight_id": insight.id,
                     "file_ids": insight.file_ids,
                     "insight_type": insight.insight_type,
                     "severity": insight.severity,
@@ -50,49 +52,68 @@ class InsightsEmbedder(base_embedder.BaseEmbedder):
 
         return documents
 
+    async def _embed_insights(
+        self,
+        insights: List[insight_dto.InsightInDB],
+        commit_interval: int,
+    ) -> None:
+        """
+        Embed batch of insights
+        :param insights: insights batch
+        :param commit_interval: commit interval
+        """
+
+        documents_batch = []
+
+        for insight in insights:
+            try:
+                docs = self._create_chunks(insight)
+                documents_batch.extend(docs)
+
+                if len(documents_batch) >= commit_interval:
+                    await self.vector_store.aadd_documents(documents_batch)
+                    documents_batch = []
+            except Exception as e:
+                print(f"\nError processing {insight.content[:200]}...: {e}")
+
+                continue
+
+        if documents_batch:
+            await self.vector_store.aadd_documents(documents_batch)
+
     async def embed(
         self,
         insights_repo: base_insights_repository.BaseInsightsRepository,
         batch_size: int = 100,
-        commit_interval: int = 50
+        commit_interval: int = 50,
+        insight_ids: Optional[List[uuid.UUID]] = None,
     ) -> None:
         """
         Embed insights
         :param insights_repo: repository for insights
         :param batch_size: batch size
         :param commit_interval: commit interval
+        :param insight_ids: insights to embed (e.g. created by incremental run), all insights if not set
         """
 
-        offset = 0
-        documents_batch = []
-
-        while True:
-            insights_batch = await insights_repo.list(
-                limit=batch_size,
-                offset=offset,
-            )
-
-            if not insights_batch:
-                break
+        if insight_ids is not None:
+            insight_ids = list(insight_ids)
 
-            for insight in insights_batch:
-                try:
-                    docs = self._create_chunks(insight)
-                    documents_batch.extend(docs)
+            for i in range(0, len(insight_ids), batch_size):
+                insights_batch = await insights_repo.get_by_ids(insight_ids[i:i + batch_size])
+                await self._embed_insights(list(insights_batch.values()), commit_interval)
 
-                    if len(documents_batch) >= commit_interval:
-                        await self.vector_store.aadd_documents(documents_batch)
-                        documents_batch = []
-                except Exception as e:
-                    print(f"\nError processing {insight.content[:200]}...: {e}")
+            return
 
-                    continue
+        # pages are read by separate queries, a streaming cursor would hold a connection
+        # and a transaction open during embedding calls
+        cursor = None
 
-                if documents_batch:
-                    await self.vector_store.aadd_documents(documents_batch)
-                    documents_batch = []
+        while True:
+            page = await insights_repo.list_page(limit=batch_size, cursor=cursor)
+            await self._embed_insights(page.items, commit_interval)
 
-                offset += batch_size
+            if page.next_cursor is None:
+                break
 
-        if documents_batch:
-            await self.vector_store.aadd_documents(documents_batch)
+            cursor = page.next_cursor
@@ -32,7 +32,7 @@ async def create_file_vector_store(
         content_column="content",
         embedding_column="embedding",
         metadata_columns=[
-            "file_id",
+            "blob_sha",
             "chunk_index",
         ],
     )
@@ -65,6 +65,7 @@ async def create_insight_vector_store(
         content_column="content",
         embedding_column="embedding",
         metadata_columns=[
+            "insight_id",
             "chunk_index",
         ],
     )
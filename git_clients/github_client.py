@@ -1,19 +1,43 @@
 import asyncio
-from contextlib import asynccontextmanager
-from pathlib import Path
+import json
+from contextlib import asynccontextmanager, contextmanager
 from typing import AsyncGenerator, List, Optional, Dict, Any
+from urllib.parse import quote
 
 import httpx
 
+from bases import base_git_client
 from config import integration_config
-from dto import git_file_dto
-from utils import const
+from dto import git_file_dto, scheduler_stats_dto
+from git_clients import http_cache, request_scheduler, tar_stream_reader
+from utils import const, file_policy, git_utils
 
 integration_config_ = integration_config.IntegrationConfig()
 http_client_error = RuntimeError("Http client is not initialized")
 
 
-class GitHubClient:
+def create_http_client(token: str, max_connections: int = 100) -> httpx.AsyncClient:
+    """
+    Create http client for GitHub API, may be shared between GitHub clients
+    :param token: github token
+    :param max_connections: connections pool size
+    :return: http client
+    """
+
+    headers = {
+        "Accept": "application/vnd.github.v3+json",
+        "User-Agent": "GitHub-Client/1.0",
+        "Authorization": f"token {token}"
+    }
+
+    return httpx.AsyncClient(
+        headers=headers,
+        timeout=30.0,
+        limits=httpx.Limits(max_connections=max_connections),
+    )
+
+
+class GitHubClient(base_git_client.BaseGitClient):
     """
     GitHub client
     """
@@ -24,63 +48,188 @@ class GitHubClient:
         repo_owner: str = integration_config_.owner_name,
         token: str = integration_config_.token,
         branch: Optional[str] = None,
+        tree_concurrency: int = 8,
+        scheduler: Optional[request_scheduler.AdaptiveRequestScheduler] = None,
+        cache: Optional[http_cache.HttpResponseCache] = None,
+        policy: Optional[file_policy.FilePolicy] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        use_cache: bool = True,
     ) -> None:
         """
         Init variables
         :param repo: repo name
+        :param repo_owner: repo owner name
         :param token: github token
         :param branch: repo branch
+        :param tree_concurrency: max parallel requests while walking truncated trees
+        :param scheduler: requests scheduler, may be shared between clients of one token
+        :param cache: shared responses and contents cache, opened from config for the session if not set
+        :param policy: files ingestion policy
+        :param http_client: shared http client, it is not closed by this client
+        :param use_cache: cache responses and contents, requests are sent without cache if False
         """
 
+        super().__init__(policy)
+
         self.repo = repo
+        self.repo_owner = repo_owner
         self.branch = branch
         self.token = token
-        self.url = f"https://api.github.com/repos/{repo_owner}/{repo}/contents"
+        self.api_url = f"https://api.github.com/repos/{repo_owner}/{repo}"
+        self.url = f"{self.api_url}/contents"
+        self.raw_url = f"https://raw.githubusercontent.com/{repo_owner}/{repo}"
+        self.tree_concurrency = tree_concurrency
+        self.scheduler = scheduler or request_scheduler.AdaptiveRequestScheduler()
+        self.use_cache = use_cache
+        self.cache = cache if use_cache else None
         self._client: Optional[httpx.AsyncClient] = None
+        self._shared_client = http_client
+
+    @property
+    def repo_name(self) -> str:
+        """
+        Get repository full name files are stored under
+        :return: owner/repo
+        """
+
+        return f"{self.repo_owner}/{self.repo}"
+
+    @property
+    def stats(self) -> scheduler_stats_dto.SchedulerStats:
+        """
+        Get requests throughput and throttling counters
+        :return: counters
+        """
+
+        return self.scheduler.stats
 
     @asynccontextmanager
     async def __call__(self):
         """
-        Init http client
+        Init http client and cache
         """
 
-        headers = {
-            "Accept": "application/vnd.github.v3+json",
-            "User-Agent": "GitHub-Client/1.0",
-            "Authorization": f"token {self.token}"
-        }
+        with self._open_cache():
+            if self._shared_client is not None:
+                self._client = self._shared_client
+                yield self
+                self._client = None
 
-        async with httpx.AsyncClient(headers=headers, timeout=30.0) as client:
-            self._client = client
-            yield self
-            self._client = None
+                return
+
+            async with create_http_client(self.token) as client:
+                self._client = client
+                yield self
+                self._client = None
+
+    @contextmanager
+    def _open_cache(self):
+        """
+        Open cache from config for the session if caching is enabled and no cache was passed
+        """
+
+        if self.cache is not None or not self.use_cache or not integration_config_.cache_path:
+            yield
+
+            return
+
+        self.cache = http_cache.HttpResponseCache(
+            integration_config_.cache_path,
+            integration_config_.cache_max_bytes,
+        )
+
+        try:
+            yield
+        finally:
+            self.cache.close()
+            self.cache = None
 
     async def _get(self, url: str, params: Optional[Dict] = None) -> Any:
         if not self._client:
             raise http_client_error
 
-        response = await self._client.get(url, params=params)
+        cached = None
+        headers = {}
+
+        if self.cache is not None:
+            key = str(httpx.URL(url, params=params))
+            cached = await self.cache.get_response(key)
+
+            if cached is not None:
+                headers["If-None-Match"] = cached[0]
+
+        response = await self.scheduler.request(
+            self._client, "GET", url, params=params, headers=headers
+        )
+
+        # not modified responses are served from cache and do not count against the quota
+        if response.status_code == 304 and cached is not None:
+            return json.loads(cached[1])
+
         response.raise_for_status()
 
+        etag = response.headers.get("ETag")
+
+        if self.cache is not None and etag:
+            await self.cache.put_response(key, etag, response.content)
+
         return response.json()
 
-    async def _download_content(self, url: str) -> Optional[str]:
+    async def _download_content(self, file_info: Dict) -> Optional[bytes]:
         """
-        Download file content
-        :param url: file url
-        :return: file content
+        Stream file content. Download stops as soon as content turns out
+        to be binary or larger than the policy allows
+        :param file_info: file data
+        :return: file content, None if failed or skipped
         """
 
         if not self._client:
             raise http_client_error
 
+        url = file_info["download_url"]
+
         try:
-            response = await self._client.get(url)
+            response = await self.scheduler.request(self._client, "GET", url, stream=True)
 
-            if response.status_code == 200:
-                return response.text
+            try:
+                if response.status_code != 200:
+                    return None
 
-            return None
+                chunks: List[bytes] = []
+                received = 0
+                sniffed = False
+
+                async for chunk in response.aiter_bytes():
+                    chunks.append(chunk)
+                    received += len(chunk)
+
+                    if received > self.policy.max_size:
+                        self._skip(file_info["path"], const.SkipReason.TOO_LARGE, file_info["sha"], received)
+
+                        return None
+
+                    if not sniffed and received >= self.policy.sniff_size:
+                        sniffed = True
+                        reason = self.policy.check_head(b"".join(chunks))
+
+                        if reason is not None:
+                            self._skip(file_info["path"], reason, file_info["sha"], file_info.get("size"))
+
+                            return None
+
+                data = b"".join(chunks)
+            finally:
+                await response.aclose()
+
+            if not sniffed:
+                reason = self.policy.check_head(data)
+
+                if reason is not None:
+                    self._skip(file_info["path"], reason, file_info["sha"], len(data))
+
+                    return None
+
+            return data
         except Exception as e:
             print(f"Error while downloading content from {url}: {e}")
 
@@ -98,29 +247,36 @@ class GitHubClient:
                 return None
 
             path = file_info["path"]
-            ext = Path(path).suffix.lower()
+            file_type = git_utils.detect_file_type(path)
+
+            reason = self.policy.check(path, file_info.get("size"))
+
+            if reason is not None:
+                self._skip(path, reason, file_info["sha"], file_info.get("size"))
+
+                return None
+
+            data = None
 
-            file_type = (
-                const.FileType.CODE
-                if ext.lower() in const.code_extensions
-                else const.FileType.DOC
-            ) if ext else const.FileType.UNKNOWN
+            if self.cache is not None:
+                data = await self.cache.get_blob(file_info["sha"])
 
-            content = None
-            download_url = file_info.get("download_url")
+            if data is None and file_info.get("download_url"):
+                data = await self._download_content(file_info)
 
-            if download_url:
-                content = await self._download_content(download_url)
+                if data is not None and self.cache is not None:
+                    await self.cache.put_blob(file_info["sha"], data)
 
-            if content is None:
+            if data is None:
                 return None
 
             return git_file_dto.GitFile(
+                repo=self.repo_name,
                 path=path,
                 sha=file_info["sha"],
                 size=file_info.get("size", 0),
                 type=file_type,
-                content=content,
+                content=data.decode("utf-8", "replace"),
             )
 
         except Exception as e:
@@ -156,34 +312,345 @@ class GitHubClient:
 
         return result
 
+    async def _resolve_commit(self) -> Dict:
+        """
+        Get commit of the configured branch (or default branch)
+        :return: commit data
+        """
+
+        ref = quote(self.branch, safe="") if self.branch else "HEAD"
+
+        return await self._get(f"{self.api_url}/commits/{ref}")
+
+    async def _get_tree(self, tree_sha: str, recursive: bool) -> Dict:
+        """
+        Get git tree
+        :param tree_sha: tree hash
+        :param recursive: list nested trees in the same response
+        :return: tree data
+        """
+
+        params = {"recursive": "1"} if recursive else None
+
+        return await self._get(f"{self.api_url}/git/trees/{tree_sha}", params)
+
+    def _tree_blobs_to_metadata(
+        self,
+        items: List[Dict],
+        prefix: str,
+        commit_sha: str,
+    ) -> List[Dict]:
+        """
+        Convert tree entries to files metadata in contents API format
+        :param items: tree entries
+        :param prefix: path of the tree relative to repository root
+        :param commit_sha: commit hash used for download urls
+        :return: files metadata
+        """
+
+        result: List[Dict] = []
+
+        for item in items:
+            # symlinks (120000) and submodules are skipped like in contents API
+            if item["type"] != "blob" or item.get("mode") == "120000":
+                continue
+
+            path = f"{prefix}{item['path']}"
+            result.append(
+                {
+                    "type": "file",
+                    "path": path,
+                    "sha": item["sha"],
+                    "size": item.get("size", 0),
+                    "download_url": f"{self.raw_url}/{commit_sha}/{quote(path)}",
+                }
+            )
+
+        return result
+
+    async def _walk_tree(
+        self,
+        items: List[Dict],
+        prefix: str,
+        commit_sha: str,
+        semaphore: asyncio.Semaphore,
+        queue: asyncio.Queue,
+    ) -> None:
+        """
+        Put files metadata of non-recursive tree entries to the queue, nested trees are walked concurrently
+        :param items: tree entries
+        :param prefix: path of the tree relative to repository root
+        :param commit_sha: commit hash used for download urls
+        :param semaphore: limit of parallel requests
+        :param queue: queue for files metadata chunks
+        """
+
+        await queue.put(self._tree_blobs_to_metadata(items, prefix, commit_sha))
+
+        subtrees = [item for item in items if item["type"] == "tree"]
+        await asyncio.gather(
+            *[
+                self._walk_subtree(item, f"{prefix}{item['path']}/", commit_sha, semaphore, queue)
+                for item in subtrees
+            ]
+        )
+
+    async def _walk_subtree(
+        self,
+        item: Dict,
+        prefix: str,
+        commit_sha: str,
+        semaphore: asyncio.Semaphore,
+        queue: asyncio.Queue,
+    ) -> None:
+        """
+        Put files metadata of a subtree to the queue. Recursive listing is tried first,
+        truncated subtrees are walked level by level
+        :param item: subtree entry
+        :param prefix: path of the subtree relative to repository root
+        :param commit_sha: commit hash used for download urls
+        :param semaphore: limit of parallel requests
+        :param queue: queue for files metadata chunks
+        """
+
+        try:
+            async with semaphore:
+                tree = await self._get_tree(item["sha"], recursive=True)
+
+            if not tree.get("truncated"):
+                await queue.put(self._tree_blobs_to_metadata(tree["tree"], prefix, commit_sha))
+
+                return
+
+            async with semaphore:
+                tree = await self._get_tree(item["sha"], recursive=False)
+
+            await self._walk_tree(tree["tree"], prefix, commit_sha, semaphore, queue)
+
+        except Exception as e:
+            print(f"Error while traversing tree {prefix}: {e}")
+
+    async def _iter_tree_metadata(self) -> AsyncGenerator[List[Dict], None]:
+        """
+        Get files metadata with Git Trees API. Whole repository is listed by one request,
+        truncated trees fall back to concurrent walk over subtrees yielding each subtree when listed
+        :return: files metadata chunks
+        """
+
+        commit = await self._resolve_commit()
+        commit_sha = commit["sha"]
+        tree_sha = commit["commit"]["tree"]["sha"]
+
+        tree = await self._get_tree(tree_sha, recursive=True)
+
+        if not tree.get("truncated"):
+            yield self._tree_blobs_to_metadata(tree["tree"], "", commit_sha)
+
+            return
+
+        root = await self._get_tree(tree_sha, recursive=False)
+        semaphore = asyncio.Semaphore(self.tree_concurrency)
+        queue: asyncio.Queue = asyncio.Queue()
+
+        walker = asyncio.create_task(
+            self._walk_tree(root["tree"], "", commit_sha, semaphore, queue)
+        )
+        walker.add_done_callback(lambda _: queue.put_nowait(None))
+
+        try:
+            while (chunk := await queue.get()) is not None:
+                if chunk:
+                    yield chunk
+
+            await walker
+        finally:
+            walker.cancel()
+
+    async def _collect_contents_metadata(self) -> List[Dict]:
+        """
+        Get files metadata with contents API, directory by directory
+        :return: files metadata
+        """
+
+        params = {"ref": self.branch} if self.branch else None
+        items = await self._get(self.url, params)
+
+        if not isinstance(items, list):
+            items = [items]
+
+        return await self._collect_files_metadata(items)
+
+    async def iter_files_metadata(
+        self,
+        listing_mode: const.ListingMode = const.ListingMode.TREES,
+    ) -> AsyncGenerator[List[Dict], None]:
+        """
+        Get metadata of repository files by chunks as they are discovered
+        :param listing_mode: files metadata listing mode
+        :return: files metadata chunks
+        """
+
+        if listing_mode == const.ListingMode.TREES:
+            async for chunk in self._iter_tree_metadata():
+                yield chunk
+        else:
+            yield await self._collect_contents_metadata()
+
+    async def list_files_metadata(
+        self,
+        listing_mode: const.ListingMode = const.ListingMode.TREES,
+    ) -> List[Dict]:
+        """
+        Get metadata of all repository files without content
+        :param listing_mode: files metadata listing mode
+        :return: files metadata
+        """
+
+        result: List[Dict] = []
+
+        async for chunk in self.iter_files_metadata(listing_mode):
+            result.extend(chunk)
+
+        return result
+
+    async def get_files_by_metadata(
+        self,
+        items: List[Dict],
+        batch_size: int = 10,
+    ) -> AsyncGenerator[List[git_file_dto.GitFile], None]:
+        """
+        Download files content by batch. Downloads are kept in flight while batches are consumed,
+        request rate is controlled by the scheduler
+        :param items: files metadata
+        :param batch_size: batch size
+        :return: files batch
+        """
+
+        window = max(batch_size, self.scheduler.max_concurrency) * 2
+        items_iter = iter(items)
+        pending: set[asyncio.Task] = set()
+        ready: List[git_file_dto.GitFile] = []
+
+        def fill_window() -> None:
+            for file_info in items_iter:
+                pending.add(asyncio.create_task(self._process_file(file_info)))
+
+                if len(pending) >= window:
+                    break
+
+        try:
+            fill_window()
+
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                pending.difference_update(done)
+
+                ready.extend(task.result() for task in done if task.result() is not None)
+                fill_window()
+
+                while len(ready) >= batch_size:
+                    yield ready[:batch_size]
+                    ready = ready[batch_size:]
+
+            if ready:
+                yield ready
+        finally:
+            for task in pending:
+                task.cancel()
+
     async def get_files_batch(
         self,
         batch_size: int = 10,
+        listing_mode: const.ListingMode = const.ListingMode.TREES,
     ) -> AsyncGenerator[List[git_file_dto.GitFile], None]:
         """
         Get files from repository by batch
         :param batch_size: batch size
+        :param listing_mode: files metadata listing mode
         :return: files batch
         """
 
-        params = {"ref": self.branch} if self.branch else None
-        items = await self._get(self.url, params)
+        all_files = await self.list_files_metadata(listing_mode)
 
-        if not isinstance(items, list):
-            items = [items]
+        async for batch in self.get_files_by_metadata(all_files, batch_size):
+            yield batch
+
+    def _archive_member_to_file(
+        self,
+        path: str,
+        data: Optional[bytes],
+    ) -> Optional[git_file_dto.GitFile]:
+        """
+        Convert archive member to file according to policy
+        :param path: file path
+        :param data: file content, None if member exceeded size limit
+        :return: file, None if skipped
+        """
+
+        reason = (
+            const.SkipReason.TOO_LARGE if data is None
+            else self.policy.check(path, len(data)) or self.policy.check_head(data)
+        )
+
+        if reason is not None:
+            self._skip(path, reason, size=len(data) if data is not None else None)
+
+            return None
+
+        return git_utils.build_git_file(path, data, self.repo_name)
+
+    async def get_archive_files_batch(
+        self,
+        batch_size: int = 10,
+        archive_url: Optional[str] = None,
+    ) -> AsyncGenerator[List[git_file_dto.GitFile], None]:
+        """
+        Get files from repository tarball by batch.
+        The archive is downloaded by one request and unpacked while streaming
+        :param batch_size: batch size
+        :param archive_url: tarball url, repository tarball of the branch by default
+        :return: files batch
+        """
+
+        if not self._client:
+            raise http_client_error
+
+        if archive_url is None:
+            archive_url = f"{self.api_url}/tarball"
+
+            if self.branch:
+                archive_url = f"{archive_url}/{quote(self.branch, safe='')}"
+
+        # GitHub tarballs have a single "{owner}-{repo}-{sha}/" root directory
+        reader = tar_stream_reader.TarStreamReader(
+            strip_components=1,
+            max_member_size=self.policy.max_size,
+        )
+        batch: List[git_file_dto.GitFile] = []
+
+        async with self._client.stream("GET", archive_url, follow_redirects=True) as response:
+            response.raise_for_status()
+
+            async for chunk in response.aiter_bytes():
+                for path, data in reader.feed(chunk):
+                    file = self._archive_member_to_file(path, data)
 
-        all_files = await self._collect_files_metadata(items)
+                    if file is not None:
+                        batch.append(file)
 
-        for i in range(0, len(all_files), batch_size):
-            batch = all_files[i:i + batch_size]
+                    if len(batch) >= batch_size:
+                        yield batch
+                        batch = []
 
-            tasks = [self._process_file(file_info) for file_info in batch]
-            results = await asyncio.gather(*tasks)
+        for path, data in reader.close():
+            file = self._archive_member_to_file(path, data)
 
-            valid_files = [r for r in results if r is not None]
+            if file is not None:
+                batch.append(file)
 
-            if valid_files:
-                yield valid_files
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
 
-            if i + batch_size < len(all_files):
-                await asyncio.sleep(0.5)
+        if batch:
+            yield batch
@@ -0,0 +1,219 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+
+class HttpResponseCache:
+    """
+    On-disk LRU cache of GitHub API responses and file contents.
+    Responses are stored with ETags to send conditional requests,
+    contents are keyed by blob hash and shared between refs
+    """
+
+    def __init__(self, path: str, max_bytes: int = 512 * 1024 * 1024) -> None:
+        """
+        Init variables
+        :param path: cache database file path
+        :param max_bytes: max total size of stored bodies
+        """
+
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+
+        self._connection: Optional[sqlite3.Connection] = None
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Open cache database
+        :return: connection
+        """
+
+        if self._connection is not None:
+            return self._connection
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                etag TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                accessed REAL NOT NULL
+            )
+            """
+        )
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS blobs (
+                sha TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                accessed REAL NOT NULL
+            )
+            """
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed)")
+        connection.execute("CREATE INDEX IF NOT EXISTS idx_blobs_accessed ON blobs (accessed)")
+        connection.commit()
+
+        self._total_bytes = connection.execute(
+            "SELECT COALESCE((SELECT SUM(size) FROM responses), 0)"
+            " + COALESCE((SELECT SUM(size) FROM blobs), 0)"
+        ).fetchone()[0]
+        self._connection = connection
+
+        return connection
+
+    def close(self) -> None:
+        """
+        Close cache database
+        """
+
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    async def get_response(self, key: str) -> Optional[Tuple[str, bytes]]:
+        """
+        Get cached response
+        :param key: request key (url with params)
+        :return: etag and body if cached
+        """
+
+        return await asyncio.to_thread(self._get, "responses", "key", key, "etag, body")
+
+    async def put_response(self, key: str, etag: str, body: bytes) -> None:
+        """
+        Store response
+        :param key: request key (url with params)
+        :param etag: response ETag
+        :param body: response body
+        """
+
+        await asyncio.to_thread(
+            self._put,
+            "INSERT OR REPLACE INTO responses (key, etag, body, size, accessed) VALUES (?, ?, ?, ?, ?)",
+            "responses", "key", key, (key, etag, body, len(body), time.time()),
+        )
+
+    async def get_blob(self, sha: str) -> Optional[bytes]:
+        """
+        Get cached file content
+        :param sha: blob hash
+        :return: content if cached
+        """
+
+        row = await asyncio.to_thread(self._get, "blobs", "sha", sha, "body")
+
+        return row[0] if row is not None else None
+
+    async def put_blob(self, sha: str, body: bytes) -> None:
+        """
+        Store file content
+        :param sha: blob hash
+        :param body: content
+        """
+
+        await asyncio.to_thread(
+            self._put,
+            "INSERT OR REPLACE INTO blobs (sha, body, size, accessed) VALUES (?, ?, ?, ?)",
+            "blobs", "sha", sha, (sha, body, len(body), time.time()),
+        )
+
+    def _get(self, table: str, key_column: str, key: str, columns: str) -> Optional[tuple]:
+        """
+        Get row and mark it as recently used
+        :param table: table name
+        :param key_column: key column name
+        :param key: key value
+        :param columns: columns to return
+        :return: row if found
+        """
+
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                f"SELECT {columns} FROM {table} WHERE {key_column} = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+
+                return None
+
+            self.hits += 1
+            connection.execute(
+                f"UPDATE {table} SET accessed = ? WHERE {key_column} = ?", (time.time(), key)
+            )
+            connection.commit()
+
+            return row
+
+    def _put(self, statement: str, table: str, key_column: str, key: str, values: tuple) -> None:
+        """
+        Insert row and evict least recently used rows over the size limit
+        :param statement: insert statement
+        :param table: table name
+        :param key_column: key column name
+        :param key: key value
+        :param values: statement values
+        """
+
+        size = values[-2]
+
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            connection = self._connect()
+            previous = connection.execute(
+                f"SELECT size FROM {table} WHERE {key_column} = ?", (key,)
+            ).fetchone()
+
+            connection.execute(statement, values)
+            self._total_bytes += size - (previous[0] if previous else 0)
+
+            self._evict(connection)
+            connection.commit()
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        """
+        Delete least recently used rows until total size fits the limit
+        :param connection: cache database connection
+        """
+
+        while self._total_bytes > self.max_bytes:
+            rows = connection.execute(
+                """
+                SELECT 'responses', key, size, accessed FROM responses
+                UNION ALL
+                SELECT 'blobs', sha, size, accessed FROM blobs
+                ORDER BY accessed
+                LIMIT 100
+                """
+            ).fetchall()
+
+            if not rows:
+                self._total_bytes = 0
+                break
+
+            for table, key, size, _ in rows:
+                key_column = "key" if table == "responses" else "sha"
+                connection.execute(f"DELETE FROM {table} WHERE {key_column} = ?", (key,))
+                self._total_bytes -= size
+
+                if self._total_bytes <= self.max_bytes:
+                    break
@@ -0,0 +1,387 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncGenerator, Dict, List, Optional
+
+from bases import base_git_client
+from dto import git_file_dto
+from utils import const, file_policy, git_utils
+
+executor_error = RuntimeError("Local repository client is not initialized")
+
+
+class LocalRepoClient(base_git_client.BaseGitClient):
+    """
+    Local repository client. Reads a working tree from disk or
+    a bare repository object database through git plumbing commands
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ref: str = "HEAD",
+        bare: Optional[bool] = None,
+        max_workers: int = 8,
+        policy: Optional[file_policy.FilePolicy] = None,
+    ) -> None:
+        """
+        Init variables
+        :param path: working tree or bare repository path
+        :param ref: ref to read from bare repository
+        :param bare: read object database instead of working tree, detected by path if not set
+        :param max_workers: threads for file reads
+        :param policy: files ingestion policy
+        """
+
+        super().__init__(policy)
+
+        self.path = Path(path).resolve()
+        self.ref = ref
+        self.bare = self._is_bare(self.path) if bare is None else bare
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def repo_name(self) -> str:
+        """
+        Get repository full name files are stored under
+        :return: repository directory name
+        """
+
+        return self.path.name.removesuffix(".git")
+
+    @staticmethod
+    def _is_bare(path: Path) -> bool:
+        """
+        Check if path is a bare repository
+        :param path: repository path
+        :return: True for bare repository
+        """
+
+        return (
+            not (path / ".git").exists()
+            and (path / "objects").is_dir()
+            and (path / "HEAD").is_file()
+        )
+
+    @asynccontextmanager
+    async def __call__(self):
+        """
+        Init thread pool
+        """
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            self._executor = executor
+            yield self
+            self._executor = None
+
+    async def _run_in_executor(self, func, *args):
+        """
+        Run blocking function in thread pool
+        :param func: function
+        :param args: function arguments
+        :return: function result
+        """
+
+        if not self._executor:
+            raise executor_error
+
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def list_files_metadata(self) -> List[Dict]:
+        """
+        Get metadata (path, sha, size) of all repository files without content.
+        Working tree files are hashed by chunks, files skipped by policy are not read and have no sha
+        :return: files metadata
+        """
+
+        if self.bare:
+            return await self._list_object_db()
+
+        paths = await self._list_working_tree()
+
+        return list(
+            await asyncio.gather(*[self._run_in_executor(self._hash_file, path) for path in paths])
+        )
+
+    async def iter_files_metadata(self) -> AsyncGenerator[List[Dict], None]:
+        """
+        Get metadata of repository files by chunks as they are discovered.
+        Working tree files are not hashed, their content is read once when loaded
+        :return: files metadata chunks
+        """
+
+        if self.bare:
+            yield await self._list_object_db()
+
+            return
+
+        paths = await self._list_working_tree()
+
+        yield list(
+            await asyncio.gather(*[self._run_in_executor(self._stat_file, path) for path in paths])
+        )
+
+    async def _list_working_tree(self) -> List[str]:
+        """
+        Get relative paths of regular files in working tree: tracked files and untracked files
+        not excluded by .gitignore. Symlinks, submodules and deleted tracked files are skipped
+        :return: file paths
+        """
+
+        output = await self._git("ls-files", "-z", "--cached", "--others", "--exclude-standard")
+        # unmerged files are listed once per stage
+        paths = dict.fromkeys(path for path in output.decode().split("\0") if path)
+
+        return [
+            path
+            for path in paths
+            if os.path.isfile(self.path / path) and not os.path.islink(self.path / path)
+        ]
+
+    def _stat_file(self, path: str) -> Dict:
+        """
+        Get working tree file metadata without hash
+        :param path: relative file path
+        :return: file metadata
+        """
+
+        return {
+            "type": "file",
+            "path": path,
+            "sha": None,
+            "size": (self.path / path).stat().st_size,
+        }
+
+    def _hash_file(self, path: str) -> Dict:
+        """
+        Get working tree file metadata
+        :param path: relative file path
+        :return: file metadata, sha is not set for files skipped by policy
+        """
+
+        file_info = self._stat_file(path)
+
+        if self.policy.check(path, file_info["size"]) is None:
+            file_info["sha"] = git_utils.git_file_blob_sha(self.path / path)
+
+        return file_info
+
+    def _load_file(self, path: str) -> Optional[git_file_dto.GitFile]:
+        """
+        Load working tree file according to policy
+        :param path: relative file path
+        :return: file, None if it is skipped or can not be read
+        """
+
+        try:
+            size = (self.path / path).stat().st_size
+            reason = self.policy.check(path, size)
+
+            if reason is None:
+                with open(self.path / path, "rb") as f:
+                    head = f.read(self.policy.sniff_size)
+                    reason = self.policy.check_head(head)
+
+                    if reason is None:
+                        return git_utils.build_git_file(path, head + f.read(), self.repo_name)
+
+            self._skip(path, reason, size=size)
+
+            return None
+        except OSError as e:
+            print(f"Error while reading file {path}: {e}")
+
+            return None
+
+    async def _git(self, *args: str) -> bytes:
+        """
+        Run git command on the repository or working tree
+        :param args: command arguments
+        :return: command output
+        """
+
+        location = [f"--git-dir={self.path}"] if self.bare else ["-C", str(self.path)]
+        process = await asyncio.create_subprocess_exec(
+            "git", *location, *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, stderr = await process.communicate()
+
+        if process.returncode != 0:
+            raise RuntimeError(f"git {' '.join(args)} failed: {stderr.decode().strip()}")
+
+        return stdout
+
+    async def _list_object_db(self) -> List[Dict]:
+        """
+        Get files metadata of the ref tree from object database
+        :return: files metadata
+        """
+
+        output = await self._git("ls-tree", "-r", "-z", "--long", self.ref)
+        result: List[Dict] = []
+
+        for entry in output.split(b"\0"):
+            if not entry:
+                continue
+
+            info, path = entry.split(b"\t", 1)
+            mode, object_type, sha, size = info.split()
+
+            # symlinks and submodules are skipped like in GitHubClient
+            if object_type != b"blob" or mode == b"120000":
+                continue
+
+            result.append(
+                {
+                    "type": "file",
+                    "path": path.decode("utf-8", "replace"),
+                    "sha": sha.decode(),
+                    "size": int(size),
+                }
+            )
+
+        return result
+
+    async def _read_blobs(
+        self,
+        items: List[Dict],
+        batch_size: int,
+    ) -> AsyncGenerator[List[git_file_dto.GitFile], None]:
+        """
+        Read blobs from object database with a single git cat-file process
+        :param items: files metadata
+        :param batch_size: batch size
+        :return: files batch
+        """
+
+        allowed: List[Dict] = []
+
+        for file_info in items:
+            reason = self.policy.check(file_info["path"], file_info.get("size"))
+
+            if reason is None:
+                allowed.append(file_info)
+            else:
+                self._skip(file_info["path"], reason, file_info["sha"], file_info.get("size"))
+
+        items = allowed
+
+        process = await asyncio.create_subprocess_exec(
+            "git", f"--git-dir={self.path}", "cat-file", "--batch",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+        )
+
+        async def write_requests() -> None:
+            for file_info in items:
+                process.stdin.write(f"{file_info['sha']}\n".encode())
+                await process.stdin.drain()
+
+            process.stdin.close()
+
+        writer = asyncio.create_task(write_requests())
+        batch: List[git_file_dto.GitFile] = []
+
+        try:
+            for file_info in items:
+                header = (await process.stdout.readline()).split()
+
+                if len(header) < 3 or header[1] != b"blob":
+                    print(f"Error while reading blob {file_info['path']}: {header}")
+                    continue
+
+                data = await process.stdout.readexactly(int(header[2]))
+                await process.stdout.readexactly(1)
+
+                reason = self.policy.check_head(data)
+
+                if reason is not None:
+                    self._skip(file_info["path"], reason, file_info["sha"], len(data))
+                    continue
+
+                batch.append(git_utils.build_git_file(file_info["path"], data, self.repo_name))
+
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+
+            if batch:
+                yield batch
+
+            await writer
+        finally:
+            writer.cancel()
+
+            if process.returncode is None:
+                process.kill()
+
+            await process.wait()
+
+    async def get_files_by_metadata(
+        self,
+        items: List[Dict],
+        batch_size: int = 10,
+    ) -> AsyncGenerator[List[git_file_dto.GitFile], None]:
+        """
+        Load files content by batch. Next batch is read by the thread pool
+        while the current one is consumed
+        :param items: files metadata
+        :param batch_size: batch size
+        :return: files batch
+        """
+
+        if self.bare:
+            async for batch in self._read_blobs(items, batch_size):
+                yield batch
+
+            return
+
+        def schedule(start: int) -> asyncio.Future:
+            return asyncio.gather(
+                *[
+                    self._run_in_executor(self._load_file, file_info["path"])
+                    for file_info in items[start:start + batch_size]
+                ]
+            )
+
+        if not items:
+            return
+
+        next_batch = schedule(0)
+
+        for i in range(0, len(items), batch_size):
+            results = await next_batch
+
+            if i + batch_size < len(items):
+                next_batch = schedule(i + batch_size)
+
+            valid_files = [r for r in results if r is not None]
+
+            if valid_files:
+                yield valid_files
+
+    async def get_files_batch(
+        self,
+        batch_size: int = 10,
+    ) -> AsyncGenerator[List[git_file_dto.GitFile], None]:
+        """
+        Get files from repository by batch
+        :param batch_size: batch size
+        :return: files batch
+        """
+
+        if self.bare:
+            items = await self._list_object_db()
+        else:
+            items = [
+                {"type": "file", "path": path}
+                for path in await self._list_working_tree()
+            ]
+
+        async for batch in self.get_files_by_metadata(items, batch_size):
+            yield batch
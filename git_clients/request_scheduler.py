@@ -0,0 +1,299 @@
+import asyncio
+import random
+import time
+from typing import Optional
+
+import httpx
+
+from dto import scheduler_stats_dto
+
+RETRY_STATUSES = {500, 502, 503, 504}
+THROTTLE_STATUSES = {403, 429}
+
+
+class AdaptiveRequestScheduler:
+    """
+    Request scheduler with bounded concurrency adapting to GitHub rate limit headers.
+    In-flight limit grows additively while quota is healthy, shrinks multiplicatively
+    when quota runs low or responses are throttled. Throttled and failed requests are
+    retried with jittered exponential backoff
+    """
+
+    def __init__(
+        self,
+        initial_concurrency: int = 8,
+        min_concurrency: int = 1,
+        max_concurrency: int = 32,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        low_remaining_threshold: int = 100,
+    ) -> None:
+        """
+        Init variables
+        :param initial_concurrency: initial in-flight requests limit
+        :param min_concurrency: lower bound of in-flight requests limit
+        :param max_concurrency: upper bound of in-flight requests limit
+        :param max_retries: max retries of a single request
+        :param backoff_base: first retry delay in seconds
+        :param backoff_max: max retry delay in seconds
+        :param low_remaining_threshold: remaining quota below which concurrency is reduced
+        """
+
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.low_remaining_threshold = low_remaining_threshold
+
+        self._limit = float(initial_concurrency)
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+        self._paused_until = 0.0
+        self._started_at: Optional[float] = None
+
+        self.stats = scheduler_stats_dto.SchedulerStats(concurrency=self.concurrency)
+
+    @property
+    def concurrency(self) -> int:
+        """
+        Get current in-flight requests limit
+        :return: limit
+        """
+
+        return max(self.min_concurrency, min(self.max_concurrency, int(self._limit)))
+
+    async def request(
+        self,
+        client: httpx.AsyncClient,
+        method: str,
+        url: str,
+        stream: bool = False,
+        **kwargs,
+    ) -> httpx.Response:
+        """
+        Send request within concurrency limit, retry throttled and failed requests
+        :param client: http client
+        :param method: http method
+        :param url: request url
+        :param stream: do not read response body, caller must close the response
+        :param kwargs: request arguments
+        :return: response (last one if retries are exhausted)
+        """
+
+        for attempt in range(self.max_retries + 1):
+            await self._acquire()
+
+            error: Optional[Exception] = None
+            response: Optional[httpx.Response] = None
+
+            try:
+                response = await client.send(
+                    client.build_request(method, url, **kwargs),
+                    stream=stream,
+                )
+            except httpx.TransportError as e:
+                error = e
+            finally:
+                await self._release()
+
+            self._count_request(response)
+
+            if response is not None and not self._should_retry(response):
+                self._adapt(response)
+
+                if response.is_success or response.status_code == 304:
+                    self.stats.succeeded += 1
+
+                return response
+
+            if attempt == self.max_retries:
+                self.stats.failed += 1
+
+                if response is not None:
+                    return response
+
+                raise error
+
+            delay = self._backoff(attempt)
+
+            if response is not None and self._is_throttled(response):
+                delay = self._throttle(response, delay)
+
+            if response is not None:
+                await response.aclose()
+
+            self.stats.retries += 1
+            await asyncio.sleep(delay)
+
+        raise RuntimeError("Unreachable")
+
+    async def _acquire(self) -> None:
+        """
+        Wait for a free in-flight slot
+        """
+
+        loop = asyncio.get_running_loop()
+
+        if self._started_at is None:
+            self._started_at = loop.time()
+
+        while True:
+            pause = self._paused_until - loop.time()
+
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+
+            async with self._condition:
+                if self._in_flight < self.concurrency:
+                    self._in_flight += 1
+
+                    return
+
+                await self._condition.wait()
+
+    async def _release(self) -> None:
+        """
+        Free in-flight slot
+        """
+
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def _count_request(self, response: Optional[httpx.Response]) -> None:
+        """
+        Update counters after request
+        :param response: response if received
+        """
+
+        self.stats.requests += 1
+        self.stats.elapsed = asyncio.get_running_loop().time() - self._started_at
+
+        if response is None:
+            return
+
+        if response.is_stream_consumed:
+            self.stats.bytes_received += len(response.content)
+        else:
+            content_length = response.headers.get("Content-Length", "")
+
+            if content_length.isdigit():
+                self.stats.bytes_received += int(content_length)
+
+    def _should_retry(self, response: httpx.Response) -> bool:
+        """
+        Check if response should be retried
+        :param response: response
+        :return: True if server error or rate limited
+        """
+
+        return response.status_code in RETRY_STATUSES or self._is_throttled(response)
+
+    @staticmethod
+    def _is_throttled(response: httpx.Response) -> bool:
+        """
+        Check primary and secondary rate limit responses
+        :param response: response
+        :return: True if rate limited
+        """
+
+        if response.status_code not in THROTTLE_STATUSES:
+            return False
+
+        if response.status_code == 429:
+            return True
+
+        if "Retry-After" in response.headers:
+            return True
+
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            return True
+
+        try:
+            return "rate limit" in response.text.lower()
+        except httpx.ResponseNotRead:
+            return False
+
+    def _throttle(self, response: httpx.Response, default_delay: float) -> float:
+        """
+        Halve concurrency and pause all requests until rate limit is lifted
+        :param response: rate limited response
+        :param default_delay: delay if response has no hints
+        :return: delay in seconds
+        """
+
+        self.stats.throttled += 1
+        self._limit = max(float(self.min_concurrency), self._limit / 2)
+        self.stats.concurrency = self.concurrency
+
+        delay = self._retry_after(response)
+
+        if delay is None:
+            delay = default_delay
+
+        loop = asyncio.get_running_loop()
+        self._paused_until = max(self._paused_until, loop.time() + delay)
+
+        return delay
+
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> Optional[float]:
+        """
+        Get delay from Retry-After or X-RateLimit-Reset headers
+        :param response: response
+        :return: delay in seconds if present
+        """
+
+        retry_after = response.headers.get("Retry-After")
+
+        if retry_after is not None:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                return None
+
+        reset = response.headers.get("X-RateLimit-Reset")
+
+        if response.headers.get("X-RateLimit-Remaining") == "0" and reset and reset.isdigit():
+            return max(0.0, int(reset) - time.time()) + 1.0
+
+        return None
+
+    def _adapt(self, response: httpx.Response) -> None:
+        """
+        Adapt concurrency to remaining quota
+        :param response: not throttled response
+        """
+
+        remaining = response.headers.get("X-RateLimit-Remaining")
+
+        if remaining is None or not remaining.isdigit():
+            self._limit = min(float(self.max_concurrency), self._limit + 1 / self._limit)
+        else:
+            remaining = int(remaining)
+            self.stats.rate_limit_remaining = remaining
+
+            if remaining == 0:
+                delay = self._retry_after(response)
+
+                if delay:
+                    loop = asyncio.get_running_loop()
+                    self._paused_until = max(self._paused_until, loop.time() + delay)
+            elif remaining < self.low_remaining_threshold:
+                self._limit = max(float(self.min_concurrency), self._limit * 0.75)
+            else:
+                self._limit = min(float(self.max_concurrency), self._limit + 1 / self._limit)
+
+        self.stats.concurrency = self.concurrency
+
+    def _backoff(self, attempt: int) -> float:
+        """
+        Get jittered exponential backoff delay
+        :param attempt: attempt number
+        :return: delay in seconds
+        """
+
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
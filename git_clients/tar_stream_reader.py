@@ -0,0 +1,239 @@
+import zlib
+from typing import List, Optional, Tuple
+
+BLOCK_SIZE = 512
+
+REGULAR_TYPES = {b"0", b"\0", b"7"}
+PAX_HEADER_TYPE = b"x"
+PAX_GLOBAL_HEADER_TYPE = b"g"
+GNU_LONGNAME_TYPE = b"L"
+
+
+class TarStreamReader:
+    """
+    Incremental reader of gzipped tar archives.
+    Compressed chunks are fed as they arrive, only the current member is kept in memory
+    """
+
+    def __init__(
+        self,
+        strip_components: int = 0,
+        max_member_size: Optional[int] = None,
+    ) -> None:
+        """
+        Init variables
+        :param strip_components: number of leading path components to remove from members
+        :param max_member_size: content of larger files is discarded without buffering
+        """
+
+        self.strip_components = strip_components
+        self.max_member_size = max_member_size
+
+        self._decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+        self._buffer = bytearray()
+        self._finished = False
+
+        self._member_type: Optional[bytes] = None
+        self._member_path: Optional[str] = None
+        self._member_chunks: List[bytes] = []
+        self._member_oversized = False
+        self._remaining = 0
+        self._padding = 0
+        self._next_path: Optional[str] = None
+
+    def feed(self, chunk: bytes) -> List[Tuple[str, Optional[bytes]]]:
+        """
+        Feed compressed archive chunk
+        :param chunk: compressed bytes
+        :return: completed regular files as (path, content), content of oversized files is None
+        """
+
+        if self._finished:
+            return []
+
+        return self._consume(self._decompressor.decompress(chunk))
+
+    def close(self) -> List[Tuple[str, Optional[bytes]]]:
+        """
+        Flush decompressor and check archive completeness
+        :return: completed regular files as (path, content), content of oversized files is None
+        """
+
+        members = [] if self._finished else self._consume(self._decompressor.flush())
+
+        if self._remaining or self._member_type is not None:
+            raise RuntimeError("Unexpected end of archive")
+
+        return members
+
+    def _consume(self, data: bytes) -> List[Tuple[str, Optional[bytes]]]:
+        """
+        Parse decompressed bytes
+        :param data: decompressed bytes
+        :return: completed regular files as (path, content), content of oversized files is None
+        """
+
+        self._buffer += data
+        members: List[Tuple[str, Optional[bytes]]] = []
+
+        while not self._finished:
+            if self._member_type is not None:
+                take = min(self._remaining, len(self._buffer))
+
+                if take:
+                    if not self._member_oversized:
+                        self._member_chunks.append(bytes(self._buffer[:take]))
+
+                    del self._buffer[:take]
+                    self._remaining -= take
+
+                if self._remaining:
+                    break
+
+                member = self._finish_member()
+
+                if member is not None:
+                    members.append(member)
+
+            elif self._padding:
+                skip = min(self._padding, len(self._buffer))
+                del self._buffer[:skip]
+                self._padding -= skip
+
+                if self._padding:
+                    break
+
+            else:
+                if len(self._buffer) < BLOCK_SIZE:
+                    break
+
+                header = bytes(self._buffer[:BLOCK_SIZE])
+                del self._buffer[:BLOCK_SIZE]
+
+                if header == b"\0" * BLOCK_SIZE:
+                    self._finished = True
+                    self._buffer.clear()
+                    break
+
+                self._start_member(header)
+
+        return members
+
+    def _start_member(self, header: bytes) -> None:
+        """
+        Parse member header
+        :param header: header block
+        """
+
+        name = header[0:100].split(b"\0", 1)[0].decode("utf-8", "replace")
+        prefix = header[345:500].split(b"\0", 1)[0].decode("utf-8", "replace")
+
+        if header[257:262] == b"ustar" and prefix:
+            name = f"{prefix}/{name}"
+
+        size = self._parse_size(header[124:136])
+
+        self._member_type = header[156:157]
+        self._member_path = name
+        self._member_chunks = []
+        self._member_oversized = (
+            self._member_type in REGULAR_TYPES
+            and self.max_member_size is not None
+            and size > self.max_member_size
+        )
+        self._remaining = size
+        self._padding = -size % BLOCK_SIZE
+
+    def _finish_member(self) -> Optional[Tuple[str, Optional[bytes]]]:
+        """
+        Complete current member
+        :return: regular file as (path, content), None for other member types
+        """
+
+        member_type = self._member_type
+        oversized = self._member_oversized
+        data = b"".join(self._member_chunks)
+        path = self._next_path or self._member_path
+
+        self._member_type = None
+        self._member_path = None
+        self._member_chunks = []
+
+        if member_type == PAX_HEADER_TYPE:
+            self._next_path = self._parse_pax_path(data)
+
+            return None
+
+        if member_type == GNU_LONGNAME_TYPE:
+            self._next_path = data.split(b"\0", 1)[0].decode("utf-8", "replace")
+
+            return None
+
+        if member_type == PAX_GLOBAL_HEADER_TYPE:
+            return None
+
+        self._next_path = None
+
+        if member_type not in REGULAR_TYPES:
+            return None
+
+        path = self._strip_path(path)
+
+        if not path:
+            return None
+
+        return path, None if oversized else data
+
+    def _strip_path(self, path: str) -> str:
+        """
+        Remove leading path components
+        :param path: member path
+        :return: stripped path
+        """
+
+        parts = [part for part in path.split("/") if part]
+
+        return "/".join(parts[self.strip_components:])
+
+    @staticmethod
+    def _parse_size(field: bytes) -> int:
+        """
+        Parse member size in octal or base-256 notation
+        :param field: size field
+        :return: size in bytes
+        """
+
+        if field[0] & 0x80:
+            return int.from_bytes(bytes([field[0] & 0x7F]) + field[1:], "big")
+
+        field = field.split(b"\0", 1)[0].strip()
+
+        return int(field, 8) if field else 0
+
+    @staticmethod
+    def _parse_pax_path(data: bytes) -> Optional[str]:
+        """
+        Get path from pax extended header records
+        :param data: pax header content
+        :return: path if present
+        """
+
+        path = None
+        pos = 0
+
+        while pos < len(data):
+            space = data.find(b" ", pos)
+
+            if space == -1:
+                break
+
+            length = int(data[pos:space])
+            record = data[space + 1:pos + length - 1]
+            key, _, value = record.partition(b"=")
+
+            if key == b"path":
+                path = value.decode("utf-8", "replace")
+
+            pos += length
+
+        return path
@@ -1,176 +1,283 @@
 import ast
+import asyncio
+import multiprocessing
 import uuid
 from collections import defaultdict
-from math import ceil
-from typing import Dict, Set, List
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncGenerator, AsyncIterator, Dict, Set, List, Optional, Tuple, Union
 
 from bases.orm_repositories import base_files_repository, base_dependency_graph_repository
-from dto import git_file_dto, dependency_graph_node_dto
+from dto import git_file_dto, graph_diff_dto
 from utils import const
 
+# files batch with their contents. Key - id, value - content
+FilesSource = Tuple[List[Union[git_file_dto.GitFileMetaInDB, git_file_dto.GitFileInDB]], Dict[uuid.UUID, str]]
+
 
 async def update_python_dependencies(
     files_repo: base_files_repository.BaseFilesRepository,
     python_deps_repo: base_dependency_graph_repository.BaseDependencyGraphRepository,
-    batch_size: int = 10
-) -> None:
+    batch_size: int = 10,
+    file_ids: Optional[Set[uuid.UUID]] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = 256,
+) -> graph_diff_dto.GraphDiff:
     """
-    Update python files dependencies
+    Update python files dependencies. Changed files are re-resolved together with files
+    importing their paths and files depending on them, so imports of appeared, moved
+    and deleted paths resolve again. Stored edges are replaced by diff
     :param files_repo: repository for files
     :param python_deps_repo: repository for python dependencies graph
     :param batch_size: files to traverse by one iteration
+    :param file_ids: changed or deleted files, all files if not set
+    :param workers: processes parsing files in parallel, parsing on the event loop thread if not set
+    :param chunk_size: files in one work unit of a parsing process
+    :return: applied graph changes
     """
 
-    all_files = await _get_all_python_files(files_repo, batch_size)
+    all_files = await files_repo.list_meta(
+        file_type=const.FileType.CODE,
+        extension=".py",
+    )
+    if file_ids is None:
+        affected_ids = {f.id for f in all_files}
+    else:
+        affected_ids = await _find_affected_files(python_deps_repo, all_files, file_ids)
 
-    if not all_files:
-        return
+    sources = _iter_sources(files_repo, all_files, batch_size, None if file_ids is None else affected_ids)
 
-    global_path_map = {f.path: f.id for f in all_files}
-    all_dependencies = defaultdict(set)
+    if workers is None:
+        all_imports = {}
+
+        async for batch_files, contents in sources:
+            all_imports.update(_find_imports_batch(batch_files, contents))
+    else:
+        all_imports = await _process_files_parallel(sources, workers, chunk_size)
+
+    # deleted files are kept to drop their edges
+    if file_ids is not None:
+        affected_ids.update(file_ids)
+
+    return await python_deps_repo.replace_dependencies(
+        list(affected_ids),
+        _resolve_dependencies(all_imports, all_files),
+        all_imports,
+    )
 
-    total_batches = ceil(len(all_files) / batch_size)
 
-    for batch_num in range(total_batches):
-        start_idx = batch_num * batch_size
-        end_idx = min(start_idx + batch_size, len(all_files))
+async def _find_affected_files(
+    python_deps_repo: base_dependency_graph_repository.BaseDependencyGraphRepository,
+    all_files: List[git_file_dto.GitFileMetaInDB],
+    file_ids: Set[uuid.UUID],
+) -> Set[uuid.UUID]:
+    """
+    Find existing files whose dependencies may change with changed files
+    :param python_deps_repo: repository for python dependencies graph
+    :param all_files: metadata of all python files
+    :param file_ids: changed or deleted files
+    :return: changed files, files importing their current paths and files depending on them
+    """
 
-        batch_files = all_files[start_idx:end_idx]
-        batch_deps = _process_files_batch(batch_files, global_path_map)
+    changed_files = [f for f in all_files if f.id in file_ids]
+    existing_ids = {f.id for f in all_files}
 
-        for file_id, deps in batch_deps.items():
-            all_dependencies[file_id].update(deps)
+    affected_ids = {f.id for f in changed_files}
+    affected_ids.update(await python_deps_repo.get_importers([f.path for f in changed_files]))
 
-    await _create_dependency_graph_nodes(all_dependencies, python_deps_repo)
+    for dependent_ids in (await python_deps_repo.get_dependents_by_file_ids(list(file_ids))).values():
+        affected_ids.update(dependent_ids)
 
+    return affected_ids & existing_ids
 
-async def _get_all_python_files(
+
+async def _iter_sources(
     files_repo: base_files_repository.BaseFilesRepository,
-    batch_size: int
-) -> List[git_file_dto.GitFileInDB]:
+    all_files: List[git_file_dto.GitFileMetaInDB],
+    batch_size: int,
+    file_ids: Optional[Set[uuid.UUID]] = None,
+) -> AsyncGenerator[FilesSource, None]:
     """
-    Get all Python files from database using pagination
+    Iterate over files to resolve with their contents
     :param files_repo: repository for files
-    :param batch_size: size of batches for pagination
-    :return: list of all Python files
+    :param all_files: metadata of all python files
+    :param batch_size: files to load by one iteration
+    :param file_ids: changed files, all files if not set
+    :return: files batch and their contents. Key - id, value - content
     """
 
-    total = await files_repo.get_files_count(
-        file_type=const.FileType.CODE,
-        extension=".py"
-    )
+    if file_ids is None:
+        async for batch_files in files_repo.iter_files(
+            file_type=const.FileType.CODE,
+            extension=".py",
+            batch_size=batch_size,
+        ):
+            yield batch_files, {f.id: f.content for f in batch_files}
 
-    if total == 0:
-        return []
+        return
 
-    all_files = []
-    total_batches = ceil(total / batch_size)
+    files_to_process = [f for f in all_files if f.id in file_ids]
 
-    for batch_num in range(total_batches):
-        files = await files_repo.list(
-            file_type=const.FileType.CODE,
-            extension=".py",
-            limit=batch_size,
-            offset=batch_num * batch_size
-        )
-        all_files.extend(files)
+    for start_idx in range(0, len(files_to_process), batch_size):
+        batch_files = files_to_process[start_idx:start_idx + batch_size]
 
-    return all_files
+        yield batch_files, await files_repo.get_contents([f.id for f in batch_files])
 
 
-def _process_files_batch(
-    files: List[git_file_dto.GitFileInDB],
-    global_path_map: Dict[str, uuid.UUID]
-) -> Dict[uuid.UUID, Set[uuid.UUID]]:
+async def _process_files_parallel(
+    sources: AsyncIterator[FilesSource],
+    workers: int,
+    chunk_size: int,
+) -> Dict[uuid.UUID, Set[str]]:
     """
-    Process a batch of files to find dependencies between them using global path map
+    Parse files in a process pool by chunks. Workers get only ids, paths and contents
+    and return imported paths by file id
+    :param sources: files batches with contents
+    :param workers: number of processes
+    :param chunk_size: files in one work unit
+    :return: dictionary mapping file IDs to sets of imported paths
+    """
+
+    loop = asyncio.get_running_loop()
+    all_imports = {}
+    in_flight = set()
+
+    def collect(done) -> None:
+        for future in done:
+            for file_id, import_paths in future.result():
+                all_imports[file_id] = set(import_paths)
+
+    # spawned workers don't inherit event loop threads and DB connections
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        chunk = []
+
+        async for batch_files, contents in sources:
+            chunk.extend((f.id, f.path, contents[f.id]) for f in batch_files if f.id in contents)
+
+            while len(chunk) >= chunk_size:
+                # bounded queue keeps contents of at most two units per worker in memory
+                if len(in_flight) >= workers * 2:
+                    done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    collect(done)
+
+                in_flight.add(loop.run_in_executor(executor, _find_imports_chunk, chunk[:chunk_size]))
+                chunk = chunk[chunk_size:]
+
+        if chunk:
+            in_flight.add(loop.run_in_executor(executor, _find_imports_chunk, chunk))
+
+        if in_flight:
+            done, _ = await asyncio.wait(in_flight)
+            collect(done)
+
+    return all_imports
+
+
+def _find_imports_batch(
+    files: List[Union[git_file_dto.GitFileMetaInDB, git_file_dto.GitFileInDB]],
+    contents: Dict[uuid.UUID, str],
+) -> Dict[uuid.UUID, Set[str]]:
+    """
+    Find imported paths of a batch of files
     :param files: list of files to process
-    :param global_path_map: global mapping from file paths to IDs for ALL files
-    :return: dictionary mapping file IDs to sets of dependency file IDs
+    :param contents: content of files to process. Key - id, value - content
+    :return: dictionary mapping file IDs to sets of imported paths, files without imports are omitted
     """
 
-    batch_deps = defaultdict(set)
+    batch_imports = {}
 
     for file in files:
-        file_deps = _find_file_dependencies(file, global_path_map)
-        if file_deps:
-            batch_deps[file.id] = file_deps
+        if file.id not in contents:
+            continue
 
-    return batch_deps
+        import_paths = _find_import_paths(file.path, contents[file.id])
+        if import_paths:
+            batch_imports[file.id] = import_paths
 
+    return batch_imports
 
-def _find_file_dependencies(
-    file: git_file_dto.GitFileInDB,
-    global_path_map: Dict[str, uuid.UUID]
-) -> Set[uuid.UUID]:
+
+def _resolve_dependencies(
+    all_imports: Dict[uuid.UUID, Set[str]],
+    all_files: List[Union[git_file_dto.GitFileMetaInDB, git_file_dto.GitFileInDB]],
+) -> Dict[uuid.UUID, Set[uuid.UUID]]:
+    """
+    Resolve imported paths to files of the importing file repository
+    :param all_imports: dictionary mapping file IDs to sets of imported paths
+    :param all_files: ALL python files of all repositories
+    :return: dictionary mapping file IDs to sets of dependency file IDs
+    """
+
+    # repositories may share paths, so imports are resolved within the repository only
+    global_path_map = {(f.repo, f.path): f.id for f in all_files}
+    file_repos = {f.id: f.repo for f in all_files}
+    all_dependencies = defaultdict(set)
+
+    for file_id, import_paths in all_imports.items():
+        repo = file_repos[file_id]
+
+        for dep_path in import_paths:
+            dep_id = global_path_map.get((repo, dep_path))
+
+            if dep_id is not None and dep_id != file_id:
+                all_dependencies[file_id].add(dep_id)
+
+    return all_dependencies
+
+
+def _find_imports_chunk(
+    files: List[Tuple[uuid.UUID, str, str]],
+) -> List[Tuple[uuid.UUID, List[str]]]:
+    """
+    Find imported paths of files, runs in worker processes
+    :param files: ids, paths and contents of files
+    :return: ids with imported paths, files without imports are omitted
     """
-    Find all dependencies for a single file by parsing its AST using global path map
-    :param file: file to analyze
-    :param global_path_map: global mapping from file paths to IDs for ALL files
-    :return: set of dependency file IDs
+
+    result = []
+
+    for file_id, path, content in files:
+        import_paths = _find_import_paths(path, content)
+
+        if import_paths:
+            result.append((file_id, sorted(import_paths)))
+
+    return result
+
+
+def _find_import_paths(path: str, content: str) -> Set[str]:
+    """
+    Find paths of modules imported by a file by parsing its AST
+    :param path: file path
+    :param content: file content
+    :return: set of candidate module paths
     """
 
-    dependencies = set()
+    import_paths = set()
 
     try:
-        tree = ast.parse(file.content)
+        tree = ast.parse(content)
 
         for node in ast.walk(tree):
             if isinstance(node, ast.Import):
                 for alias in node.names:
                     module_path = alias.name.replace(".", "/")
-                    dep_path = f"{module_path}.py"
-
-                    if dep_path in global_path_map and global_path_map[dep_path] != file.id:
-                        dependencies.add(global_path_map[dep_path])
+                    import_paths.add(f"{module_path}.py")
 
             elif isinstance(node, ast.ImportFrom) and node.module:
                 if node.level > 0:
-                    path_parts = file.path.split("/")
+                    path_parts = path.split("/")
 
                     if len(path_parts) > node.level:
                         base = "/".join(path_parts[:-node.level])
 
                         if node.module:
                             module_path = node.module.replace(".", "/")
-                            dep_path = f"{base}/{module_path}.py"
+                            import_paths.add(f"{base}/{module_path}.py")
                         else:
-                            dep_path = f"{base}/__init__.py"
-
-                        if dep_path in global_path_map:
-                            dependencies.add(global_path_map[dep_path])
+                            import_paths.add(f"{base}/__init__.py")
                 else:
-                    dep_path = f"{node.module.replace('.', '/')}.py"
-                    if dep_path in global_path_map:
-                        dependencies.add(global_path_map[dep_path])
+                    import_paths.add(f"{node.module.replace('.', '/')}.py")
     except Exception as e:
         print(f"Error while dependency resolving: {e}")
 
-    return dependencies
-
-
-async def _create_dependency_graph_nodes(
-    all_dependencies: Dict[uuid.UUID, Set[uuid.UUID]],
-    python_deps_repo
-) -> None:
-    """
-    Create nodes in python_dependency_graph table for all dependencies
-    :param all_dependencies: dictionary mapping file IDs to sets of dependency file IDs
-    :param python_deps_repo: repository for python dependencies graph
-    """
-
-    nodes_to_create: List[
-        dependency_graph_node_dto.DependencyGraphNode
-    ] = []
-
-    for file_id, deps in all_dependencies.items():
-        for dep_id in deps:
-            nodes_to_create.append(
-                dependency_graph_node_dto.DependencyGraphNode(
-                    file_id=file_id,
-                    parent_id=dep_id,
-                )
-            )
-
-    if nodes_to_create:
-        await python_deps_repo.batch_create(nodes_to_create)
+    return import_paths
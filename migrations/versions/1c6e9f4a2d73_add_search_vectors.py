@@ -0,0 +1,83 @@
+"""generate insights and chunks search vectors, link chunks to insights
+
+Revision ID: 1c6e9f4a2d73
+Revises: f2b8d3a6c914
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from config import ai_config
+
+# revision identifiers, used by Alembic.
+revision: str = '1c6e9f4a2d73'
+down_revision: Union[str, Sequence[str], None] = 'f2b8d3a6c914'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+language = ai_config.AIConfig().language.value
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # search vector of insights was never filled, replace it with a generated one
+    op.drop_index('idx_insights_search_vector', table_name='insights', postgresql_using='gin')
+    op.drop_column('insights', 'search_vector')
+    op.add_column(
+        'insights',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(f"to_tsvector('{language}', content)", persisted=True),
+            nullable=True,
+            comment='Full-text search vector',
+        ),
+    )
+    op.create_index(
+        'idx_insights_search_vector', 'insights', ['search_vector'], unique=False, postgresql_using='gin'
+    )
+
+    op.add_column(
+        'embed_chunks',
+        sa.Column('insight_id', sa.UUID(), nullable=True, comment='Id of embedded insight'),
+    )
+    op.create_foreign_key(
+        'embed_chunks_insight_id_fkey', 'embed_chunks', 'insights', ['insight_id'], ['id'], ondelete='CASCADE'
+    )
+    op.create_index('idx_embed_chunks_insight_id', 'embed_chunks', ['insight_id'], unique=False)
+    op.add_column(
+        'embed_chunks',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(f"to_tsvector('{language}', content)", persisted=True),
+            nullable=True,
+            comment='Full-text search vector',
+        ),
+    )
+    op.create_index(
+        'idx_embed_chunks_search_vector', 'embed_chunks', ['search_vector'], unique=False, postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_embed_chunks_search_vector', table_name='embed_chunks', postgresql_using='gin')
+    op.drop_column('embed_chunks', 'search_vector')
+    op.drop_index('idx_embed_chunks_insight_id', table_name='embed_chunks')
+    op.drop_constraint('embed_chunks_insight_id_fkey', 'embed_chunks', type_='foreignkey')
+    op.drop_column('embed_chunks', 'insight_id')
+
+    op.drop_index('idx_insights_search_vector', table_name='insights', postgresql_using='gin')
+    op.drop_column('insights', 'search_vector')
+    op.add_column(
+        'insights',
+        sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True, comment='Full-text search vector'),
+    )
+    op.create_index(
+        'idx_insights_search_vector', 'insights', ['search_vector'], unique=False, postgresql_using='gin'
+    )
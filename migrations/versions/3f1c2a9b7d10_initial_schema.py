@@ -0,0 +1,105 @@
+"""initial schema
+
+Revision ID: 3f1c2a9b7d10
+Revises: 
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import pgvector.sqlalchemy
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2a9b7d10'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    op.create_table(
+        'files',
+        sa.Column('id', sa.UUID(), nullable=False, comment='Id'),
+        sa.Column('path', sa.String(length=200), nullable=True, comment='Relative file path'),
+        sa.Column('sha', sa.String(length=200), nullable=False, comment='File hash'),
+        sa.Column('size_bytes', sa.Float(), nullable=False, comment='File size in bytes'),
+        sa.Column(
+            'type',
+            sa.Enum('code', 'doc', 'unknown', name='filetype'),
+            nullable=False,
+            comment='File type',
+        ),
+        sa.Column('content', sa.Text(), nullable=False, comment='File content'),
+        sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True, comment='Full-text search vector'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('idx_files_search_vector', 'files', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_table(
+        'insights',
+        sa.Column('id', sa.UUID(), nullable=False, comment='Id'),
+        sa.Column('file_ids', sa.JSON(), nullable=False, comment='List of related file'),
+        sa.Column('content', sa.Text(), nullable=False, comment='Insight text'),
+        sa.Column(
+            'insight_type',
+            sa.Enum(
+                'code_explanation',
+                'potential_problem',
+                'architecture',
+                'security',
+                'performance',
+                name='insighttype',
+            ),
+            nullable=False,
+            comment='Insight type',
+        ),
+        sa.Column(
+            'severity',
+            sa.Enum('info', 'warning', 'critical', 'suggestion', name='insightseverity'),
+            nullable=False,
+            comment='Insight severity',
+        ),
+        sa.Column('confidence', sa.Float(), nullable=True, comment='Confidence score [0-1]'),
+        sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True, comment='Full-text search vector'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('idx_insights_search_vector', 'insights', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_table(
+        'embed_chunks',
+        sa.Column('id', sa.UUID(), nullable=False, comment='Id'),
+        sa.Column('file_id', sa.UUID(), nullable=True, comment='File id'),
+        sa.Column('chunk_index', sa.Integer(), nullable=False, comment='Index of chunk'),
+        sa.Column('content', sa.Text(), nullable=False, comment='Content of chunk'),
+        sa.Column('embedding', pgvector.sqlalchemy.Vector(dim=1024), nullable=False, comment='Embedding of chunk'),
+        sa.ForeignKeyConstraint(['file_id'], ['files.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('idx_file_chunks_embedding', 'embed_chunks', ['embedding'], unique=False, postgresql_using='ivfflat')
+    op.create_table(
+        'python_dependency_graph',
+        sa.Column('id', sa.UUID(), nullable=False, comment='Id'),
+        sa.Column('file_id', sa.UUID(), nullable=False, comment='Child file id'),
+        sa.Column('parent_id', sa.UUID(), nullable=False, comment='Parent file id'),
+        sa.ForeignKeyConstraint(['file_id'], ['files.id']),
+        sa.ForeignKeyConstraint(['parent_id'], ['files.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('python_dependency_graph')
+    op.drop_index('idx_file_chunks_embedding', table_name='embed_chunks', postgresql_using='ivfflat')
+    op.drop_table('embed_chunks')
+    op.drop_index('idx_insights_search_vector', table_name='insights', postgresql_using='gin')
+    op.drop_table('insights')
+    op.drop_index('idx_files_search_vector', table_name='files', postgresql_using='gin')
+    op.drop_table('files')
+    sa.Enum(name='insightseverity').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='insighttype').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='filetype').drop(op.get_bind(), checkfirst=True)
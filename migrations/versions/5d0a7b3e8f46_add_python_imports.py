@@ -0,0 +1,36 @@
+"""add python imports for incremental dependency graph updates
+
+Revision ID: 5d0a7b3e8f46
+Revises: 1c6e9f4a2d73
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '5d0a7b3e8f46'
+down_revision: Union[str, Sequence[str], None] = '1c6e9f4a2d73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # filled by the next full dependency graph update
+    op.create_table(
+        'python_imports',
+        sa.Column('file_id', sa.UUID(), nullable=False, comment='Importing file id'),
+        sa.Column('path', sa.Text(), nullable=False, comment='Candidate path of imported module'),
+        sa.ForeignKeyConstraint(['file_id'], ['files.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('file_id', 'path'),
+    )
+    op.create_index('idx_python_imports_path', 'python_imports', ['path'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_python_imports_path', table_name='python_imports')
+    op.drop_table('python_imports')
@@ -0,0 +1,81 @@
+"""add repository to files
+
+Revision ID: 8a4e6c1d2b57
+Revises: 3f1c2a9b7d10
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from config import integration_config
+
+# revision identifiers, used by Alembic.
+revision: str = '8a4e6c1d2b57'
+down_revision: Union[str, Sequence[str], None] = '3f1c2a9b7d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # legacy rows come from the single configured repository, override with -x repo=owner/repo
+    integration_config_ = integration_config.IntegrationConfig()
+    repo = context.get_x_argument(as_dictionary=True).get(
+        'repo',
+        f"{integration_config_.owner_name}/{integration_config_.repo_name}",
+    )
+
+    op.add_column(
+        'files',
+        sa.Column('repo', sa.String(length=200), server_default='', nullable=False, comment='Repository full name'),
+    )
+    op.execute(sa.text("UPDATE files SET repo = :repo").bindparams(repo=repo))
+    # previous ingestion runs inserted duplicates. Rows carry no creation time and the next sync
+    # replaces outdated content by hash, so the row with most embedded chunks is kept
+    op.execute(
+        """
+        CREATE TEMPORARY TABLE duplicate_files ON COMMIT DROP AS
+        SELECT id, survivor_id FROM (
+            SELECT
+                id,
+                first_value(id) OVER ranking AS survivor_id,
+                row_number() OVER ranking AS position
+            FROM (
+                SELECT files.id, files.repo, files.path, count(embed_chunks.id) AS chunks_count
+                FROM files
+                LEFT JOIN embed_chunks ON embed_chunks.file_id = files.id
+                GROUP BY files.id
+            ) AS counted
+            WINDOW ranking AS (PARTITION BY repo, path ORDER BY chunks_count DESC, id)
+        ) AS ranked
+        WHERE position > 1
+        """
+    )
+    op.execute(
+        """
+        UPDATE python_dependency_graph
+        SET file_id = duplicate_files.survivor_id
+        FROM duplicate_files
+        WHERE python_dependency_graph.file_id = duplicate_files.id
+        """
+    )
+    op.execute(
+        """
+        UPDATE python_dependency_graph
+        SET parent_id = duplicate_files.survivor_id
+        FROM duplicate_files
+        WHERE python_dependency_graph.parent_id = duplicate_files.id
+        """
+    )
+    op.execute("DELETE FROM python_dependency_graph WHERE file_id = parent_id")
+    op.execute("DELETE FROM files WHERE id IN (SELECT id FROM duplicate_files)")
+    op.create_index('idx_files_repo_path', 'files', ['repo', 'path'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_files_repo_path', table_name='files')
+    op.drop_column('files', 'repo')
@@ -0,0 +1,52 @@
+"""deduplicate dependency graph edges, index both lookup directions
+
+Revision ID: b7e2c4f1a085
+Revises: 5d0a7b3e8f46
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2c4f1a085'
+down_revision: Union[str, Sequence[str], None] = '5d0a7b3e8f46'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # every full graph update appended all edges again, keep one row per edge
+    op.execute(
+        """
+        DELETE FROM python_dependency_graph
+        WHERE id IN (
+            SELECT id
+            FROM (
+                SELECT id, row_number() OVER (PARTITION BY file_id, parent_id ORDER BY id) AS position
+                FROM python_dependency_graph
+            ) AS edges
+            WHERE position > 1
+        )
+        """
+    )
+    op.create_index(
+        'idx_python_dependency_graph_file_id_parent_id',
+        'python_dependency_graph',
+        ['file_id', 'parent_id'],
+        unique=True,
+    )
+    op.create_index(
+        'idx_python_dependency_graph_parent_id_file_id',
+        'python_dependency_graph',
+        ['parent_id', 'file_id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_python_dependency_graph_parent_id_file_id', table_name='python_dependency_graph')
+    op.drop_index('idx_python_dependency_graph_file_id_parent_id', table_name='python_dependency_graph')
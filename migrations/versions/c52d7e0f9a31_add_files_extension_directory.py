@@ -0,0 +1,64 @@
+"""add generated extension and directory to files
+
+Revision ID: c52d7e0f9a31
+Revises: 8a4e6c1d2b57
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c52d7e0f9a31'
+down_revision: Union[str, Sequence[str], None] = '8a4e6c1d2b57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'files',
+        sa.Column(
+            'extension',
+            sa.String(length=200),
+            sa.Computed("lower(substring(path from '\\.([^./]+)$'))", persisted=True),
+            nullable=True,
+            comment='Lowercase file extension without dot',
+        ),
+    )
+    op.add_column(
+        'files',
+        sa.Column(
+            'directory',
+            sa.String(length=200),
+            sa.Computed("regexp_replace(path, '/?[^/]*$', '')", persisted=True),
+            nullable=True,
+            comment='Parent directory path, empty for repository root',
+        ),
+    )
+    op.create_index(
+        'idx_files_extension_directory',
+        'files',
+        ['extension', 'directory'],
+        unique=False,
+        postgresql_ops={'directory': 'text_pattern_ops'},
+    )
+    op.create_index(
+        'idx_files_directory',
+        'files',
+        ['directory'],
+        unique=False,
+        postgresql_ops={'directory': 'text_pattern_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_files_directory', table_name='files')
+    op.drop_index('idx_files_extension_directory', table_name='files')
+    op.drop_column('files', 'directory')
+    op.drop_column('files', 'extension')
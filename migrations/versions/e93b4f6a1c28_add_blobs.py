@@ -0,0 +1,113 @@
+"""move file contents to content-addressed blobs
+
+Revision ID: e93b4f6a1c28
+Revises: c52d7e0f9a31
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from config import ai_config
+
+# revision identifiers, used by Alembic.
+revision: str = 'e93b4f6a1c28'
+down_revision: Union[str, Sequence[str], None] = 'c52d7e0f9a31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+language = ai_config.AIConfig().language.value
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'blobs',
+        sa.Column('sha', sa.String(length=200), nullable=False, comment='Git blob hash'),
+        sa.Column('content', sa.Text(), nullable=False, comment='File content'),
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(f"to_tsvector('{language}', content)", persisted=True),
+            nullable=True,
+            comment='Full-text search vector',
+        ),
+        sa.PrimaryKeyConstraint('sha'),
+    )
+    op.create_index('idx_blobs_search_vector', 'blobs', ['search_vector'], unique=False, postgresql_using='gin')
+    op.execute(
+        """
+        INSERT INTO blobs (sha, content)
+        SELECT DISTINCT ON (sha) sha, content FROM files ORDER BY sha
+        """
+    )
+
+    op.create_index('idx_files_sha', 'files', ['sha'], unique=False)
+    op.create_foreign_key('files_sha_fkey', 'files', 'blobs', ['sha'], ['sha'])
+    op.drop_index('idx_files_search_vector', table_name='files', postgresql_using='gin')
+    op.drop_column('files', 'search_vector')
+    op.drop_column('files', 'content')
+
+    op.add_column(
+        'embed_chunks',
+        sa.Column('blob_sha', sa.String(length=200), nullable=True, comment='Hash of embedded file content'),
+    )
+    op.create_foreign_key(
+        'embed_chunks_blob_sha_fkey', 'embed_chunks', 'blobs', ['blob_sha'], ['sha'], ondelete='CASCADE'
+    )
+    op.create_index('idx_embed_chunks_blob_sha', 'embed_chunks', ['blob_sha'], unique=False)
+    # chunks belong to contents now, keep one set of chunks per content
+    op.execute(
+        """
+        UPDATE embed_chunks SET blob_sha = files.sha
+        FROM files WHERE embed_chunks.file_id = files.id
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM embed_chunks USING (
+            SELECT blob_sha, min(file_id::text) AS file_id
+            FROM embed_chunks
+            WHERE blob_sha IS NOT NULL
+            GROUP BY blob_sha
+        ) AS kept
+        WHERE embed_chunks.blob_sha = kept.blob_sha AND embed_chunks.file_id::text <> kept.file_id
+        """
+    )
+    op.execute("UPDATE embed_chunks SET file_id = NULL WHERE blob_sha IS NOT NULL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        """
+        UPDATE embed_chunks SET file_id = files.id
+        FROM (SELECT DISTINCT ON (sha) id, sha FROM files ORDER BY sha, id) AS files
+        WHERE embed_chunks.blob_sha = files.sha
+        """
+    )
+    op.drop_index('idx_embed_chunks_blob_sha', table_name='embed_chunks')
+    op.drop_constraint('embed_chunks_blob_sha_fkey', 'embed_chunks', type_='foreignkey')
+    op.drop_column('embed_chunks', 'blob_sha')
+
+    op.add_column('files', sa.Column('content', sa.Text(), nullable=True, comment='File content'))
+    op.add_column(
+        'files',
+        sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True, comment='Full-text search vector'),
+    )
+    op.execute(
+        """
+        UPDATE files SET content = blobs.content, search_vector = blobs.search_vector
+        FROM blobs WHERE files.sha = blobs.sha
+        """
+    )
+    op.alter_column('files', 'content', nullable=False)
+    op.create_index('idx_files_search_vector', 'files', ['search_vector'], unique=False, postgresql_using='gin')
+    op.drop_constraint('files_sha_fkey', 'files', type_='foreignkey')
+    op.drop_index('idx_files_sha', table_name='files')
+
+    op.drop_index('idx_blobs_search_vector', table_name='blobs', postgresql_using='gin')
+    op.drop_table('blobs')
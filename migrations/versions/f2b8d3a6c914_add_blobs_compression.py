@@ -0,0 +1,95 @@
+"""add zstd-compressed blob contents with per-repository dictionaries
+
+Revision ID: f2b8d3a6c914
+Revises: e93b4f6a1c28
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from config import ai_config
+from utils import content_codec
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b8d3a6c914'
+down_revision: Union[str, Sequence[str], None] = 'e93b4f6a1c28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+language = ai_config.AIConfig().language.value
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'compression_dictionaries',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False, comment='Id'),
+        sa.Column('repo', sa.String(length=200), nullable=False, comment='Repository full name'),
+        sa.Column('data', sa.LargeBinary(), nullable=False, comment='Dictionary content'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('repo'),
+    )
+
+    op.alter_column('blobs', 'content', nullable=True, comment='File content, not set if compressed')
+    op.add_column(
+        'blobs',
+        sa.Column('content_zstd', sa.LargeBinary(), nullable=True, comment='zstd-compressed file content'),
+    )
+    op.add_column(
+        'blobs',
+        sa.Column('dictionary_id', sa.Integer(), nullable=True, comment='Dictionary of compressed content'),
+    )
+    op.create_foreign_key(
+        'blobs_dictionary_id_fkey', 'blobs', 'compression_dictionaries', ['dictionary_id'], ['id']
+    )
+    op.create_check_constraint('ck_blobs_content', 'blobs', '(content IS NULL) <> (content_zstd IS NULL)')
+    # compressed contents can't be indexed by expression, vector is written with the row
+    op.execute("ALTER TABLE blobs ALTER COLUMN search_vector DROP EXPRESSION")
+    op.alter_column(
+        'blobs', 'search_vector', comment='Full-text search vector, built from plain content on insert'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    codec = content_codec.ContentCodec()
+
+    for row in bind.execute(sa.text("SELECT id, data FROM compression_dictionaries")):
+        codec.add_dictionary(row.id, row.data)
+
+    compressed = bind.execute(
+        sa.text("SELECT sha, content_zstd, dictionary_id FROM blobs WHERE content_zstd IS NOT NULL")
+    ).all()
+
+    for row in compressed:
+        bind.execute(
+            sa.text("UPDATE blobs SET content = :content, content_zstd = NULL WHERE sha = :sha"),
+            {"sha": row.sha, "content": codec.decompress(row.content_zstd, row.dictionary_id)},
+        )
+
+    op.drop_index('idx_blobs_search_vector', table_name='blobs', postgresql_using='gin')
+    op.drop_column('blobs', 'search_vector')
+    op.add_column(
+        'blobs',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(f"to_tsvector('{language}', content)", persisted=True),
+            nullable=True,
+            comment='Full-text search vector',
+        ),
+    )
+    op.create_index('idx_blobs_search_vector', 'blobs', ['search_vector'], unique=False, postgresql_using='gin')
+
+    op.drop_constraint('ck_blobs_content', 'blobs', type_='check')
+    op.drop_constraint('blobs_dictionary_id_fkey', 'blobs', type_='foreignkey')
+    op.drop_column('blobs', 'dictionary_id')
+    op.drop_column('blobs', 'content_zstd')
+    op.alter_column('blobs', 'content', nullable=False, comment='File content')
+
+    op.drop_table('compression_dictionaries')
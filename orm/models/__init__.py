@@ -1,4 +1,7 @@
+from orm.models.compression_dictionary_orm import CompressionDictionaryORM  # noqa
+from orm.models.blob_orm import BlobORM  # noqa
 from orm.models.file_orm import FileORM  # noqa
 from orm.models.python_dependency_graph_orm import PythonDependencyGraphORM  # noqa
 from orm.models.embed_chunk_orm import EmbedChunkORM  # noqa
 from orm.models.insight_orm import InsightORM  # noqa
+from orm.models.python_import_orm import PythonImportORM  # noqa
@@ -0,0 +1,54 @@
+from typing import Optional
+
+from sqlalchemy import String, Text, Index, Integer, LargeBinary, ForeignKey, CheckConstraint
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Mapped, mapped_column
+
+from orm.models import base_model_orm
+
+
+class BlobORM(base_model_orm.Base):
+    """
+    Content-addressed file content ORM model
+    """
+
+    __tablename__ = "blobs"
+
+    sha: Mapped[str] = mapped_column(
+        String(200),
+        primary_key=True,
+        comment="Git blob hash",
+    )
+    content: Mapped[Optional[str]] = mapped_column(
+        Text,
+        nullable=True,
+        comment="File content, not set if compressed",
+    )
+    content_zstd: Mapped[Optional[bytes]] = mapped_column(
+        LargeBinary,
+        nullable=True,
+        comment="zstd-compressed file content",
+    )
+    dictionary_id: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        ForeignKey("compression_dictionaries.id"),
+        nullable=True,
+        comment="Dictionary of compressed content",
+    )
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        nullable=True,
+        comment="Full-text search vector, built from plain content on insert",
+    )
+
+    __table_args__ = (
+        CheckConstraint(
+            "(content IS NULL) <> (content_zstd IS NULL)",
+            name="ck_blobs_content",
+        ),
+        Index(
+            "idx_blobs_search_vector",
+            "search_vector",
+            postgresql_using="gin"
+        ),
+    )
@@ -0,0 +1,30 @@
+from sqlalchemy import Integer, String, LargeBinary
+from sqlalchemy.orm import Mapped, mapped_column
+
+from orm.models import base_model_orm
+
+
+class CompressionDictionaryORM(base_model_orm.Base):
+    """
+    Per-repository zstd dictionary ORM model
+    """
+
+    __tablename__ = "compression_dictionaries"
+
+    id: Mapped[int] = mapped_column(
+        Integer,
+        primary_key=True,
+        autoincrement=True,
+        comment="Id",
+    )
+    repo: Mapped[str] = mapped_column(
+        String(200),
+        nullable=False,
+        unique=True,
+        comment="Repository full name",
+    )
+    data: Mapped[bytes] = mapped_column(
+        LargeBinary,
+        nullable=False,
+        comment="Dictionary content",
+    )
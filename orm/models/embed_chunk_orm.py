@@ -1,10 +1,14 @@
 import uuid
 
 from pgvector.sqlalchemy import Vector
-from sqlalchemy import Column, Integer, Text, ForeignKey, Index, UUID as SA_UUID
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Index, Computed, UUID as SA_UUID
+from sqlalchemy.dialects.postgresql import TSVECTOR
 
+from config import ai_config
 from orm.models import base_model_orm
 
+ai_config_ = ai_config.AIConfig()
+
 
 class EmbedChunkORM(base_model_orm.Base):
     __tablename__ = "embed_chunks"
@@ -21,10 +25,30 @@ class EmbedChunkORM(base_model_orm.Base):
         nullable=True,
         comment="File id"
     )
+    blob_sha = Column(
+        String(200),
+        ForeignKey("blobs.sha", ondelete="CASCADE"),
+        nullable=True,
+        comment="Hash of embedded file content"
+    )
+    insight_id = Column(
+        SA_UUID(as_uuid=True),
+        ForeignKey("insights.id", ondelete="CASCADE"),
+        nullable=True,
+        comment="Id of embedded insight"
+    )
     chunk_index = Column(Integer, nullable=False, comment="Index of chunk")
     content = Column(Text, nullable=False, comment="Content of chunk")
     embedding = Column(Vector(1024), nullable=False, comment="Embedding of chunk")
+    search_vector = Column(
+        TSVECTOR,
+        Computed(f"to_tsvector('{ai_config_.language.value}', content)", persisted=True),
+        comment="Full-text search vector",
+    )
 
     __table_args__ = (
         Index("idx_file_chunks_embedding", "embedding", postgresql_using="ivfflat"),
+        Index("idx_embed_chunks_blob_sha", "blob_sha"),
+        Index("idx_embed_chunks_insight_id", "insight_id"),
+        Index("idx_embed_chunks_search_vector", "search_vector", postgresql_using="gin"),
     )
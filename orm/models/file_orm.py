@@ -1,16 +1,12 @@
 import uuid
 from typing import Optional
 
-from sqlalchemy import UUID as SA_UUID, String, Float, Enum as SA_Enum, Text, Index
-from sqlalchemy.dialects.postgresql import TSVECTOR
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import UUID as SA_UUID, String, Float, Enum as SA_Enum, Index, Computed, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from config import ai_config
-from orm.models import base_model_orm
+from orm.models import base_model_orm, blob_orm
 from utils import const
 
-ai_config_ = ai_config.AIConfig()
-
 
 class FileORM(base_model_orm.Base):
     """
@@ -25,13 +21,30 @@ class FileORM(base_model_orm.Base):
         default=uuid.uuid4,
         comment="Id",
     )
+    repo: Mapped[str] = mapped_column(
+        String(200),
+        nullable=False,
+        server_default="",
+        comment="Repository full name",
+    )
     path: Mapped[Optional[str]] = mapped_column(
         String(200),
         nullable=True,
         comment="Relative file path",
     )
+    extension: Mapped[Optional[str]] = mapped_column(
+        String(200),
+        Computed(r"lower(substring(path from '\.([^./]+)$'))", persisted=True),
+        comment="Lowercase file extension without dot",
+    )
+    directory: Mapped[Optional[str]] = mapped_column(
+        String(200),
+        Computed(r"regexp_replace(path, '/?[^/]*$', '')", persisted=True),
+        comment="Parent directory path, empty for repository root",
+    )
     sha: Mapped[str] = mapped_column(
         String(200),
+        ForeignKey("blobs.sha"),
         nullable=False,
         comment="File hash",
     )
@@ -48,23 +61,31 @@ class FileORM(base_model_orm.Base):
         nullable=False,
         comment="File type",
     )
-    content: Mapped[str] = mapped_column(
-        Text,
-        nullable=False,
-        comment="File content",
-    )
-    search_vector: Mapped[Optional[str]] = mapped_column(
-        TSVECTOR,
-        server_default=f"""
-            to_tsvector('{ai_config_.language}', {content})
-        """,
-        comment="Full-text search vector",
+    blob: Mapped[blob_orm.BlobORM] = relationship(
+        lazy="joined",
+        innerjoin=True,
     )
 
     __table_args__ = (
         Index(
-            "idx_files_search_vector",
-            "search_vector",
-            postgresql_using="gin"
+            "idx_files_repo_path",
+            "repo",
+            "path",
+            unique=True,
+        ),
+        Index(
+            "idx_files_extension_directory",
+            "extension",
+            "directory",
+            postgresql_ops={"directory": "text_pattern_ops"},
+        ),
+        Index(
+            "idx_files_directory",
+            "directory",
+            postgresql_ops={"directory": "text_pattern_ops"},
+        ),
+        Index(
+            "idx_files_sha",
+            "sha",
         ),
     )
@@ -1,7 +1,7 @@
 import uuid
 from typing import List, Optional
 
-from sqlalchemy import Text, JSON, Enum as SA_Enum, Float, Index
+from sqlalchemy import Text, JSON, Enum as SA_Enum, Float, Index, Computed
 from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -58,9 +58,7 @@ class InsightORM(base_model_orm.Base):
     )
     search_vector: Mapped[Optional[str]] = mapped_column(
         TSVECTOR,
-        server_default=f"""
-            to_tsvector('{ai_config_.language}', {content})
-        """,
+        Computed(f"to_tsvector('{ai_config_.language.value}', content)", persisted=True),
         comment="Full-text search vector",
     )
 
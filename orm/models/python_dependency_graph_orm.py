@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import UUID as SA_UUID, ForeignKey
+from sqlalchemy import UUID as SA_UUID, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from orm.models import base_model_orm
@@ -29,3 +29,18 @@ class PythonDependencyGraphORM(base_model_orm.Base):
         ForeignKey("files.id"),
         comment="Parent file id"
     )
+
+    # each index covers lookups of one direction with index-only scans
+    __table_args__ = (
+        Index(
+            "idx_python_dependency_graph_file_id_parent_id",
+            "file_id",
+            "parent_id",
+            unique=True,
+        ),
+        Index(
+            "idx_python_dependency_graph_parent_id_file_id",
+            "parent_id",
+            "file_id",
+        ),
+    )
@@ -0,0 +1,31 @@
+import uuid
+
+from sqlalchemy import UUID as SA_UUID, ForeignKey, Text, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from orm.models import base_model_orm
+
+
+class PythonImportORM(base_model_orm.Base):
+    """
+    Module paths imported by python file ORM model. Kept for all imports, resolved or not,
+    to find files whose imports resolve differently when a path appears
+    """
+
+    __tablename__ = "python_imports"
+
+    file_id: Mapped[uuid.UUID] = mapped_column(
+        SA_UUID(as_uuid=True),
+        ForeignKey("files.id", ondelete="CASCADE"),
+        primary_key=True,
+        comment="Importing file id",
+    )
+    path: Mapped[str] = mapped_column(
+        Text,
+        primary_key=True,
+        comment="Candidate path of imported module",
+    )
+
+    __table_args__ = (
+        Index("idx_python_imports_path", "path"),
+    )
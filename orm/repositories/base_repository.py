@@ -1,5 +1,17 @@
+import base64
+import json
+from typing import Optional, List, Sequence
+
+from sqlalchemy import Table, text, literal_column
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.functions import func
+
+from config import ai_config
 from db_clients import alchemy_pg_client
 
+ai_config_ = ai_config.AIConfig()
+
 
 class BaseAlchemyRepository:
     """
@@ -13,3 +25,80 @@ class BaseAlchemyRepository:
         """
 
         self.pg_client = pg_client
+
+    @staticmethod
+    def _encode_cursor(values: dict) -> str:
+        """
+        Encode keyset position to opaque cursor
+        :param values: sort key values of the last row
+        :return: cursor
+        """
+
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: Optional[str]) -> Optional[dict]:
+        """
+        Decode opaque cursor to keyset position
+        :param cursor: cursor
+        :return: sort key values of the last row, None for the first page
+        """
+
+        if cursor is None:
+            return None
+
+        try:
+            return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except ValueError as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+
+    @staticmethod
+    def _ts_config() -> ColumnElement:
+        """
+        Get full-text search configuration of the app language
+        :return: regconfig literal
+        """
+
+        return literal_column(f"'{ai_config_.language.value}'::regconfig")
+
+    @classmethod
+    def _ts_query(cls, query: str) -> ColumnElement:
+        """
+        Build full-text query from user input, quotes and OR/- operators are supported
+        :param query: search query
+        :return: tsquery expression
+        """
+
+        return func.websearch_to_tsquery(cls._ts_config(), query)
+
+    @staticmethod
+    async def _copy_records(
+        session: AsyncSession,
+        table: Table,
+        columns: List[str],
+        records: Sequence[tuple],
+    ) -> None:
+        """
+        Bulk insert rows with a single COPY command in the session transaction
+        :param session: alchemy session
+        :param table: target table
+        :param columns: names of the copied columns, the rest get server defaults
+        :param records: rows values in the order of columns
+        """
+
+        if not records:
+            return
+
+        # asyncpg adapter opens the transaction lazily on the first statement,
+        # so open it explicitly to keep COPY in the session transaction
+        await session.execute(text("SELECT 1"))
+
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+
+        await raw_connection.driver_connection.copy_records_to_table(
+            table.name,
+            records=records,
+            columns=columns,
+            schema_name=table.schema,
+        )
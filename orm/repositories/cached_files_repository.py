@@ -0,0 +1,478 @@
+import uuid
+from collections import OrderedDict
+from typing import AsyncGenerator, Optional, List, Dict, Set, Iterable, Union
+
+from bases.orm_repositories import base_files_repository
+from dto import git_file_dto, page_dto, upsert_result_dto, file_facets_dto, search_hit_dto, cache_stats_dto
+from utils import const
+
+
+class CachedFilesRepository(base_files_repository.BaseFilesRepository):
+    """
+    Read-through LRU cache of files by id over another files repository.
+    Entries are validated by hash against every newer version seen by the wrapper:
+    writes through it drop changed files, metadata reads drop entries with another hash.
+    With validate_reads every lookup also checks current hashes by a metadata-only query
+    """
+
+    def __init__(
+        self,
+        files_repo: base_files_repository.BaseFilesRepository,
+        max_size: int = 1024,
+        validate_reads: bool = False,
+    ) -> None:
+        """
+        Init variables
+        :param files_repo: wrapped files repository
+        :param max_size: max number of cached files
+        :param validate_reads: check hashes of cached files in storage on every lookup,
+            needed if files are changed by other processes
+        """
+
+        self.files_repo = files_repo
+        self.max_size = max_size
+        self.validate_reads = validate_reads
+
+        self.stats = cache_stats_dto.CacheStats()
+
+        self._files: OrderedDict[uuid.UUID, git_file_dto.GitFileInDB] = OrderedDict()
+
+    def _put(self, files: Iterable[git_file_dto.GitFileInDB]) -> None:
+        """
+        Cache files, least recently used files are evicted over the size limit
+        :param files: loaded files
+        """
+
+        for file in files:
+            self._files[file.id] = file
+            self._files.move_to_end(file.id)
+
+        while len(self._files) > self.max_size:
+            self._files.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _invalidate(self, file_ids: Iterable[uuid.UUID]) -> None:
+        """
+        Drop cached files
+        :param file_ids: file ids
+        """
+
+        for file_id in file_ids:
+            if self._files.pop(file_id, None) is not None:
+                self.stats.invalidations += 1
+
+    def _check(self, files: Iterable[Union[git_file_dto.GitFileMetaInDB, git_file_dto.GitFileRef]]) -> None:
+        """
+        Drop cached files with another hash than their current version
+        :param files: current versions of files
+        """
+
+        self._invalidate([
+            file.id
+            for file in files
+            if file.id in self._files and self._files[file.id].sha != file.sha
+        ])
+
+    async def _lookup(self, file_ids: List[uuid.UUID]) -> Dict[uuid.UUID, git_file_dto.GitFileInDB]:
+        """
+        Get cached files, the rest are counted as misses
+        :param file_ids: file ids
+        :return: dict of cached files. Key - id, value - file
+        """
+
+        file_ids = list(dict.fromkeys(file_ids))
+        found = {
+            file_id: self._files[file_id]
+            for file_id in file_ids
+            if file_id in self._files
+        }
+
+        if self.validate_reads and found:
+            current = await self.files_repo.get_meta_by_ids(list(found))
+            stale = [
+                file_id
+                for file_id, file in found.items()
+                if file_id not in current or current[file_id].sha != file.sha
+            ]
+            self._invalidate(stale)
+
+            for file_id in stale:
+                del found[file_id]
+
+        for file_id in found:
+            self._files.move_to_end(file_id)
+
+        self.stats.hits += len(found)
+        self.stats.misses += len(file_ids) - len(found)
+
+        return found
+
+    @staticmethod
+    def _to_meta(file: git_file_dto.GitFileInDB) -> git_file_dto.GitFileMetaInDB:
+        """
+        Get metadata of cached file
+        :param file: file
+        :return: file metadata
+        """
+
+        return git_file_dto.GitFileMetaInDB(**file.model_dump(exclude={"content"}))
+
+    async def batch_create(
+        self,
+        files: List[git_file_dto.GitFile],
+    ) -> List[git_file_dto.GitFileInDB]:
+        """
+        Create multiple files in DB
+        :param files: list of files to create
+        :return: files with corresponding ids
+        """
+
+        return await self.files_repo.batch_create(files)
+
+    async def batch_upsert(
+        self,
+        files: List[git_file_dto.GitFile],
+    ) -> upsert_result_dto.UpsertResult:
+        """
+        Insert new files and update stored files by repository and path if their hash differs
+        :param files: list of files
+        :return: ids of inserted, updated and untouched files
+        """
+
+        result = await self.files_repo.batch_upsert(files)
+        self._invalidate(result.updated_ids)
+
+        return result
+
+    async def get_files_count(
+        self,
+        file_type: Optional[const.FileType] = None,
+        extension: Optional[str] = None,
+        directory: Optional[str] = None,
+    ) -> int:
+        """
+        Get number of files in DB
+        :param file_type: file type
+        :param extension: file extension
+        :param directory: directory path, nested directories included
+        :return: files count
+        """
+
+        return await self.files_repo.get_files_count(file_type, extension, directory)
+
+    async def get_facets(
+        self,
+        file_type: Optional[const.FileType] = None,
+        extension: Optional[str] = None,
+        directory: Optional[str] = None,
+    ) -> file_facets_dto.FileFacets:
+        """
+        Get files counts by extension, directory and type in a single scan
+        :param file_type: file type
+        :param extension: file extension
+        :param directory: directory path, nested directories included
+        :return: files facets
+        """
+
+        return await self.files_repo.get_facets(file_type, extension, directory)
+
+    async def search(
+        self,
+        query: str,
+        limit: int = 10,
+        file_type: Optional[const.FileType] = None,
+        extension: Optional[str] = None,
+        directory: Optional[str] = None,
+    ) -> List[search_hit_dto.SearchHit]:
+        """
+        Full-text search of files by content
+        :param query: search query
+        :param limit: number of files to return
+        :param file_type: file type
+        :param extension: file extension
+        :param directory: directory path, nested directories included
+        :return: files ordered by relevance, without content
+        """
+
+        return await self.files_repo.search(query, limit, file_type, extension, directory)
+
+    async def search_chunks(
+        self,
+        query: str,
+        limit: int = 10,
+    ) -> List[search_hit_dto.SearchHit]:
+        """
+        Full-text search of embedded file chunks
+        :param query: search query
+        :param limit: number of chunks to return
+        :return: chunks ordered by relevance
+        """
+
+        return await self.files_repo.search_chunks(query, limit)
+
+    async def list(
+        self,
+        file_type: Optional[const.FileType] = None,
+        extension: Optional[str] = None,
+        directory: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+    ) -> List[git_file_dto.GitFileInDB]:
+        """
+        Get list of files, loaded files are cached
+        :param file_type: file type
+        :param extension: file extension
+        :param directory: directory path, nested directories included
+        :param limit: number of files to return
+        :param offset: offset of files to return
+        :return: files
+        """
+
+        files = await self.files_repo.list(file_type, extension, directory, limit, offset)
+        self._put(files)
+
+        return files
+
+    async def iter_files(
+        self,
+        file_type: Optional[const.FileType] = None,
+        extension: Optional[str] = None,
+        directory: Optional[str] = None,
+        batch_size: int = 1000,
+    ) -> AsyncGenerator[List[git_file_dto.GitFileInDB], None]:
+        """
+        Iterate over all files by batches from a single server-side cursor.
+        Full scans bypass the cache to keep hot files in it
+        :param file_type: file type
+        :param extension: file extension
+        :param directory: directory path, nested directories included
+        :param batch_size: number of files fetched from the cursor at once
+        :return: files batch
+        """
+
+        async for files in self.files_repo.iter_files(file_type, extension, directory, batch_size):
+            self._check(files)
+
+            yield files
+
+    async def list_meta(
+        self,
+        file_type: Optional[const.FileType] = None,
+        extension: Optional[str] = None,
+        directory: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+    ) -> List[git_file_dto.GitFileMetaInDB]:
+        """
+        Get list of files metadata without content
+        :param file_type: file type
+        :param extension: file extension
+        :param directory: directory path, nested directories included
+        :param limit: number of files to return
+        :param offset: offset of files to return
+        :return: files metadata
+        """
+
+        files = await self.files_repo.list_meta(file_type, extension, directory, limit, offset)
+        self._check(files)
+
+        return files
+
+    async def list_meta_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        file_type: Optional[const.FileType] = None,
+        extension: Optional[str] = None,
+        directory: Optional[str] = None,
+        order: const.PageOrder = const.PageOrder.ID,
+    ) -> page_dto.Page[git_file_dto.GitFileMetaInDB]:
+        """
+        Get page of files metadata without content with keyset pagination
+        :param limit: number of files to return
+        :param cursor: cursor of the page, first page if not set
+        :param file_type: file type
+        :param extension: file extension
+        :param directory: directory path, nested directories included
+        :param order: files order
+        :return: files metadata page
+        """
+
+        page = await self.files_repo.list_meta_page(limit, cursor, file_type, extension, directory, order)
+        self._check(page.items)
+
+        return page
+
+    async def list_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        file_type: Optional[const.FileType] = None,
+        extension: Optional[str] = None,
+        directory: Optional[str] = None,
+        order: const.PageOrder = const.PageOrder.ID,
+    ) -> page_dto.Page[git_file_dto.GitFileInDB]:
+        """
+        Get page of files with keyset pagination, loaded files are cached
+        :param limit: number of files to return
+        :param cursor: cursor of the page, first page if not set
+        :param file_type: file type
+        :param extension: file extension
+        :param directory: directory path, nested directories included
+        :param order: files order
+        :return: files page
+        """
+
+        page = await self.files_repo.list_page(limit, cursor, file_type, extension, directory, order)
+        self._put(page.items)
+
+        return page
+
+    async def batch_update(self, objs_in: List[dict]) -> None:
+        """
+        Update files
+        :param objs_in: files batch
+        """
+
+        await self.files_repo.batch_update(objs_in)
+        self._invalidate(obj["id"] for obj in objs_in)
+
+    async def get_by_id(self, file_id: uuid.UUID) -> Optional[git_file_dto.GitFileInDB]:
+        """
+        Get file by id
+        :param file_id: file id
+        :return: file if found, None otherwise
+        """
+
+        files = await self.get_by_ids([file_id])
+
+        return files.get(file_id)
+
+    async def get_by_ids(self, file_ids: List[uuid.UUID]) -> Dict[uuid.UUID, git_file_dto.GitFileInDB]:
+        """
+        Get multiple files by their ids, only missing files are loaded
+        :param file_ids: list of file ids
+        :return: dict of files. Key - id, value - data
+        """
+
+        files = await self._lookup(file_ids)
+        missing = [file_id for file_id in dict.fromkeys(file_ids) if file_id not in files]
+
+        if missing:
+            loaded = await self.files_repo.get_by_ids(missing)
+            self._put(loaded.values())
+            files.update(loaded)
+
+        return files
+
+    async def get_meta_by_id(self, file_id: uuid.UUID) -> Optional[git_file_dto.GitFileMetaInDB]:
+        """
+        Get file metadata without content by id
+        :param file_id: file id
+        :return: file metadata if found, None otherwise
+        """
+
+        files = await self.get_meta_by_ids([file_id])
+
+        return files.get(file_id)
+
+    async def get_meta_by_ids(
+        self,
+        file_ids: List[uuid.UUID],
+    ) -> Dict[uuid.UUID, git_file_dto.GitFileMetaInDB]:
+        """
+        Get metadata without content of multiple files, metadata of cached files is not loaded
+        :param file_ids: list of file ids
+        :return: dict of files metadata. Key - id, value - metadata
+        """
+
+        if self.validate_reads:
+            files = await self.files_repo.get_meta_by_ids(file_ids)
+            self._check(files.values())
+
+            return files
+
+        files = {
+            file_id: self._to_meta(file)
+            for file_id, file in (await self._lookup(file_ids)).items()
+        }
+        missing = [file_id for file_id in dict.fromkeys(file_ids) if file_id not in files]
+
+        if missing:
+            files.update(await self.files_repo.get_meta_by_ids(missing))
+
+        return files
+
+    async def get_meta_by_shas(
+        self,
+        shas: List[str],
+    ) -> Dict[str, List[git_file_dto.GitFileMetaInDB]]:
+        """
+        Get metadata without content of files with given content hashes
+        :param shas: content hashes
+        :return: dict of files metadata. Key - hash, value - files with this content
+        """
+
+        files = await self.files_repo.get_meta_by_shas(shas)
+
+        for sha_files in files.values():
+            self._check(sha_files)
+
+        return files
+
+    async def get_contents(
+        self,
+        file_ids: List[uuid.UUID],
+        max_length: Optional[int] = None,
+    ) -> Dict[uuid.UUID, str]:
+        """
+        Get content of multiple files. Missing files are loaded whole to be cached
+        :param file_ids: list of file ids
+        :param max_length: number of leading characters to return, whole content if not set
+        :return: dict of contents. Key - id, value - content
+        """
+
+        files = await self.get_by_ids(file_ids)
+
+        return {
+            file_id: file.content[:max_length]
+            for file_id, file in files.items()
+        }
+
+    async def get_refs(self, repo: Optional[str] = None) -> Dict[str, git_file_dto.GitFileRef]:
+        """
+        Get stored versions of all files
+        :param repo: repository full name, files of all repositories if not set
+        :return: dict of file versions. Key - path, value - version
+        """
+
+        refs = await self.files_repo.get_refs(repo)
+        self._check(refs.values())
+
+        return refs
+
+    async def delete_by_ids(self, file_ids: List[uuid.UUID]) -> None:
+        """
+        Delete files with their dependency graph nodes
+        :param file_ids: list of file ids
+        """
+
+        await self.files_repo.delete_by_ids(file_ids)
+        self._invalidate(file_ids)
+
+    async def delete_orphan_blobs(self) -> int:
+        """
+        Delete contents not referenced by any file
+        :return: number of deleted contents
+        """
+
+        return await self.files_repo.delete_orphan_blobs()
+
+    async def get_embedded_shas(self, shas: List[str]) -> Set[str]:
+        """
+        Get content hashes which already have embedded chunks
+        :param shas: content hashes
+        :return: embedded content hashes
+        """
+
+        return await self.files_repo.get_embedded_shas(shas)
@@ -1,12 +1,17 @@
 import uuid
-from typing import Optional, List
+from collections import defaultdict
+from typing import Optional, List, Dict, Set, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import select, delete, any_, bindparam, literal, text, Text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from bases.orm_repositories import base_dependency_graph_repository
-from dto import dependency_graph_node_dto
-from orm.models import python_dependency_graph_orm
+from db_clients import alchemy_pg_client
+from dto import dependency_graph_node_dto, page_dto, graph_diff_dto, graph_adjacency_dto
+from orm.models import python_dependency_graph_orm, python_import_orm
 from orm.repositories import base_repository
+from utils import const, data_loader
 
 
 class DependencyGraphRepository(
@@ -17,43 +22,87 @@ class DependencyGraphRepository(
     Repository for python dependency graph entity
     """
 
-    async def batch_create(
-        self,
-        nodes: List[dependency_graph_node_dto.DependencyGraphNode],
-    ) -> List[dependency_graph_node_dto.PythonDependencyGraphNodeInDB]:
+    # rows per insert or delete statement, keeps bind parameters below the asyncpg limit
+    write_chunk_size = 1000
+
+    def __init__(self, pg_client: alchemy_pg_client.AlchemyPGClient) -> None:
         """
-        Create multiple nodes in DB
-        :param nodes: list of nodes to create
-        :return: nodes with corresponding ids
+        Init variables
+        :param pg_client: Postgres alchemy client
         """
 
-        db_objs = [
-            python_dependency_graph_orm.PythonDependencyGraphORM(
-                file_id=obj.file_id,
-                parent_id=obj.parent_id,
-            )
-            for obj in nodes
-        ]
+        super().__init__(pg_client)
 
-        async with self.pg_client.session() as session:
-            session.add_all(db_objs)
+        # concurrent per-file lookups are coalesced into one query
+        self._dependencies_loader = data_loader.DataLoader(self.get_dependencies_by_file_ids, set)
+        self._dependents_loader = data_loader.DataLoader(self.get_dependents_by_file_ids, set)
 
-            await session.flush()
+    @staticmethod
+    def _to_dto(
+        db_obj: python_dependency_graph_orm.PythonDependencyGraphORM,
+    ) -> dependency_graph_node_dto.PythonDependencyGraphNodeInDB:
+        """
+        Convert DB object to DTO
+        :param db_obj: node DB object
+        :return: node
+        """
 
-            for db_obj in db_objs:
-                await session.refresh(db_obj)
+        return dependency_graph_node_dto.PythonDependencyGraphNodeInDB(
+            id=db_obj.id,
+            file_id=db_obj.file_id,
+            parent_id=db_obj.parent_id,
+        )
 
-            await session.commit()
+    async def _insert_edges(
+        self,
+        session: AsyncSession,
+        edges: List[Tuple[uuid.UUID, uuid.UUID]],
+    ) -> List[dependency_graph_node_dto.PythonDependencyGraphNodeInDB]:
+        """
+        Insert edges skipping already stored ones, session is not committed
+        :param session: DB session
+        :param edges: file id and parent id pairs
+        :return: inserted nodes
+        """
 
-            return [
+        graph_orm = python_dependency_graph_orm.PythonDependencyGraphORM
+        inserted = []
+
+        for start in range(0, len(edges), self.write_chunk_size):
+            query = insert(graph_orm).values([
+                {"id": uuid.uuid4(), "file_id": file_id, "parent_id": parent_id}
+                for file_id, parent_id in edges[start:start + self.write_chunk_size]
+            ]).on_conflict_do_nothing(
+                index_elements=[graph_orm.file_id, graph_orm.parent_id],
+            ).returning(graph_orm.id, graph_orm.file_id, graph_orm.parent_id)
+
+            result = await session.execute(query)
+            inserted.extend(
                 dependency_graph_node_dto.PythonDependencyGraphNodeInDB(
-                    id=db_obj.id,
-                    file_id=db_obj.file_id,
-                    parent_id=db_obj.parent_id,
+                    id=row.id,
+                    file_id=row.file_id,
+                    parent_id=row.parent_id,
                 )
-                for db_obj in db_objs
-            ]
+                for row in result.all()
+            )
+
+        return inserted
+
+    async def batch_create(
+        self,
+        nodes: List[dependency_graph_node_dto.DependencyGraphNode],
+    ) -> List[dependency_graph_node_dto.PythonDependencyGraphNodeInDB]:
+        """
+        Create multiple nodes in DB, nodes of already stored edges are skipped
+        :param nodes: list of nodes to create
+        :return: created nodes with corresponding ids
+        """
 
+        async with self.pg_client.session() as session:
+            created = await self._insert_edges(session, [(node.file_id, node.parent_id) for node in nodes])
+            await session.commit()
+
+        return created
 
     async def list(
         self,
@@ -68,7 +117,9 @@ class DependencyGraphRepository(
         """
 
         async with self.pg_client.session() as session:
-            query = select(python_dependency_graph_orm.PythonDependencyGraphORM)
+            query = select(python_dependency_graph_orm.PythonDependencyGraphORM).order_by(
+                python_dependency_graph_orm.PythonDependencyGraphORM.id
+            )
 
             if limit is not None:
                 query = query.limit(limit)
@@ -80,69 +131,336 @@ class DependencyGraphRepository(
             db_objs = db_objs.scalars().all()
 
             return [
-                dependency_graph_node_dto.PythonDependencyGraphNodeInDB(
-                    id=db_obj.id,
-                    file_id=db_obj.file_id,
-                    parent_id=db_obj.parent_id,
-                )
+                self._to_dto(db_obj)
                 for db_obj in db_objs
             ]
 
-    async def get_dependencies(self, file_id: uuid.UUID) -> set[uuid.UUID]:
+    async def list_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+    ) -> page_dto.Page[dependency_graph_node_dto.PythonDependencyGraphNodeInDB]:
         """
-        Get all direct dependencies for a file (what this file imports)
-        :param file_id: file id
-        :return: set of dependency file ids
+        Get page of nodes ordered by id with keyset pagination
+        :param limit: number of nodes to return
+        :param cursor: cursor of the page, first page if not set
+        :return: nodes page
         """
 
+        graph_orm = python_dependency_graph_orm.PythonDependencyGraphORM
+        position = self._decode_cursor(cursor)
+
         async with self.pg_client.session() as session:
-            query = select(
-                python_dependency_graph_orm.PythonDependencyGraphORM.parent_id
-            ).where(
-                python_dependency_graph_orm.PythonDependencyGraphORM.file_id == file_id
+            query = select(graph_orm).order_by(graph_orm.id)
+
+            if position is not None:
+                query = query.filter(graph_orm.id > uuid.UUID(position["id"]))
+
+            result = await session.execute(query.limit(limit))
+            db_objs = result.scalars().all()
+
+            next_cursor = None
+
+            if len(db_objs) == limit:
+                next_cursor = self._encode_cursor({"id": str(db_objs[-1].id)})
+
+            return page_dto.Page[dependency_graph_node_dto.PythonDependencyGraphNodeInDB](
+                items=[self._to_dto(db_obj) for db_obj in db_objs],
+                next_cursor=next_cursor,
             )
 
-            result = await session.execute(query)
+    async def get_adjacency(self) -> graph_adjacency_dto.GraphAdjacency:
+        """
+        Get whole graph in compressed sparse row form
+        :return: graph adjacency
+        """
+
+        # nodes are numbered and edges grouped by Postgres, so building the snapshot only copies arrays
+        async with self.pg_client.session() as session:
+            result = await session.execute(
+                text(
+                    """
+                    WITH nodes AS (
+                        SELECT id, row_number() OVER (ORDER BY id) - 1 AS position
+                        FROM (
+                            SELECT file_id AS id FROM python_dependency_graph
+                            UNION
+                            SELECT parent_id FROM python_dependency_graph
+                        ) AS ids
+                    ),
+                    edges AS (
+                        SELECT sources.position AS source, targets.position AS target
+                        FROM python_dependency_graph AS graph
+                        JOIN nodes AS sources ON sources.id = graph.file_id
+                        JOIN nodes AS targets ON targets.id = graph.parent_id
+                    )
+                    SELECT
+                        (SELECT array_agg(id ORDER BY position) FROM nodes) AS node_ids,
+                        (
+                            SELECT array_agg(coalesce(degrees.degree, 0) ORDER BY nodes.position)
+                            FROM nodes
+                            LEFT JOIN (SELECT source, count(*) AS degree FROM edges GROUP BY source) AS degrees
+                                ON degrees.source = nodes.position
+                        ) AS forward_degrees,
+                        (SELECT array_agg(target ORDER BY source, target) FROM edges) AS forward_indices,
+                        (
+                            SELECT array_agg(coalesce(degrees.degree, 0) ORDER BY nodes.position)
+                            FROM nodes
+                            LEFT JOIN (SELECT target, count(*) AS degree FROM edges GROUP BY target) AS degrees
+                                ON degrees.target = nodes.position
+                        ) AS reverse_degrees,
+                        (SELECT array_agg(source ORDER BY target, source) FROM edges) AS reverse_indices
+                    """
+                )
+            )
+            row = result.one()
+
+            return graph_adjacency_dto.GraphAdjacency(
+                node_ids=row.node_ids or [],
+                forward_degrees=row.forward_degrees or [],
+                forward_indices=row.forward_indices or [],
+                reverse_degrees=row.reverse_degrees or [],
+                reverse_indices=row.reverse_indices or [],
+            )
+
+    async def get_dependencies(self, file_id: uuid.UUID) -> set[uuid.UUID]:
+        """
+        Get all direct dependencies for a file (what this file imports).
+        Lookups of concurrent callers are loaded by one query
+        :param file_id: file id
+        :return: set of dependency file ids
+        """
 
-            return {row[0] for row in result.all()}
+        return set(await self._dependencies_loader.load(file_id))
 
     async def get_dependents(self, file_id: uuid.UUID) -> set[uuid.UUID]:
         """
-        Get all files that depend on this file (who imports this file)
+        Get all files that depend on this file (who imports this file).
+        Lookups of concurrent callers are loaded by one query
         :param file_id: file id
         :return: set of dependent file ids
         """
 
+        return set(await self._dependents_loader.load(file_id))
+
+    async def get_dependencies_by_file_ids(
+        self,
+        file_ids: List[uuid.UUID],
+    ) -> Dict[uuid.UUID, Set[uuid.UUID]]:
+        """
+        Get direct dependencies of multiple files in a single query
+        :param file_ids: list of file ids
+        :return: dict of dependencies. Key - file id, value - dependency file ids, files without dependencies are omitted
+        """
+
+        graph_orm = python_dependency_graph_orm.PythonDependencyGraphORM
+
         async with self.pg_client.session() as session:
-            query = select(
-                python_dependency_graph_orm.PythonDependencyGraphORM.file_id
-            ).where(
-                python_dependency_graph_orm.PythonDependencyGraphORM.parent_id == file_id
+            query = select(graph_orm.file_id, graph_orm.parent_id).where(
+                graph_orm.file_id.in_(file_ids)
             )
+            result = await session.execute(query)
+            dependencies = defaultdict(set)
+
+            for row in result.all():
+                dependencies[row.file_id].add(row.parent_id)
 
+            return dict(dependencies)
+
+    async def get_dependents_by_file_ids(
+        self,
+        file_ids: List[uuid.UUID],
+    ) -> Dict[uuid.UUID, Set[uuid.UUID]]:
+        """
+        Get dependents of multiple files in a single query
+        :param file_ids: list of file ids
+        :return: dict of dependents. Key - file id, value - dependent file ids, files without dependents are omitted
+        """
+
+        graph_orm = python_dependency_graph_orm.PythonDependencyGraphORM
+
+        async with self.pg_client.session() as session:
+            query = select(graph_orm.parent_id, graph_orm.file_id).where(
+                graph_orm.parent_id.in_(file_ids)
+            )
             result = await session.execute(query)
-            return {row[0] for row in result.all()}
+            dependents = defaultdict(set)
 
-    async def get_dependency_graph(self, file_id: uuid.UUID, depth: int = 2) -> dict:
+            for row in result.all():
+                dependents[row.parent_id].add(row.file_id)
+
+            return dict(dependents)
+
+    async def get_dependency_graph(
+        self,
+        file_id: uuid.UUID,
+        depth: int = 2,
+        direction: const.GraphDirection = const.GraphDirection.DEPENDENCIES,
+    ) -> dict:
         """
-        Get full dependency graph up to specified depth
+        Get dependency graph up to specified depth by one recursive query. Every file is included once
+        at its shallowest depth, so cycles are cut
         :param file_id: starting file id
-        :param depth: max depth to traverse
-        :return: nested dict representing dependency tree
+        :param depth: max depth to traverse, files at the last level are listed with empty subtrees
+        :param direction: follow dependencies or dependents
+        :return: nested dict representing dependency tree. Key - file id, value - its subtree
         """
 
-        async def _traverse(current_id: uuid.UUID, current_depth: int, visited: set) -> dict:
-            if current_depth > depth or current_id in visited:
-                return {}
+        if depth < 0:
+            return {}
 
-            visited.add(current_id)
-            deps = await self.get_dependencies(current_id)
+        graph_orm = python_dependency_graph_orm.PythonDependencyGraphORM
 
-            result = {}
-            for dep_id in deps:
-                if dep_id not in visited:
-                    result[str(dep_id)] = await _traverse(dep_id, current_depth + 1, visited)
+        if direction == const.GraphDirection.DEPENDENCIES:
+            source, target = graph_orm.file_id, graph_orm.parent_id
+        else:
+            source, target = graph_orm.parent_id, graph_orm.file_id
 
-            return result
+        walk = select(
+            source.label("source_id"),
+            target.label("target_id"),
+            literal(1).label("depth"),
+        ).where(source == file_id).cte("walk", recursive=True)
 
-        return await _traverse(file_id, 0, set())
+        # UNION drops edges already walked at the same depth, the depth limit stops cycles.
+        # Files at depth are expanded too, so edges go one level deeper
+        walk = walk.union(
+            select(source, target, walk.c.depth + 1).where(
+                source == walk.c.target_id,
+                walk.c.depth <= depth,
+            )
+        )
+
+        async with self.pg_client.session() as session:
+            result = await session.execute(
+                select(walk.c.source_id, walk.c.target_id).order_by(
+                    walk.c.depth, walk.c.source_id, walk.c.target_id
+                )
+            )
+            rows = result.all()
+
+        tree = {}
+        subtrees = {file_id: tree}
+
+        # rows come breadth-first, so the first edge reaching a file is the shallowest one
+        for row in rows:
+            if row.target_id in subtrees or row.source_id not in subtrees:
+                continue
+
+            subtree = {}
+            subtrees[row.source_id][str(row.target_id)] = subtree
+            subtrees[row.target_id] = subtree
+
+        return tree
+
+    async def get_importers(self, paths: List[str]) -> Set[uuid.UUID]:
+        """
+        Get files importing any of module paths, whether the import is resolved or not
+        :param paths: module paths
+        :return: importing file ids
+        """
+
+        if not paths:
+            return set()
+
+        import_orm = python_import_orm.PythonImportORM
+
+        async with self.pg_client.session() as session:
+            query = select(import_orm.file_id).where(
+                import_orm.path == any_(bindparam("paths", paths, type_=ARRAY(Text)))
+            ).distinct()
+            result = await session.execute(query)
+
+            return set(result.scalars())
+
+    async def replace_dependencies(
+        self,
+        file_ids: List[uuid.UUID],
+        dependencies: Dict[uuid.UUID, Set[uuid.UUID]],
+        imports: Dict[uuid.UUID, Set[str]],
+    ) -> graph_diff_dto.GraphDiff:
+        """
+        Replace dependencies and imports of files in one transaction.
+        New edges are diffed against stored ones, only missing edges are inserted and
+        only outdated edges are deleted
+        :param file_ids: re-resolved files, files missing in dependencies lose all their dependencies
+        :param dependencies: new dependencies. Key - file id, value - dependency file ids
+        :param imports: imported module paths of existing files. Key - file id, value - paths
+        :return: applied changes
+        """
+
+        graph_orm = python_dependency_graph_orm.PythonDependencyGraphORM
+        import_orm = python_import_orm.PythonImportORM
+        diff = graph_diff_dto.GraphDiff(resolved_count=len(file_ids))
+
+        if not file_ids:
+            return diff
+
+        ids_param = bindparam("file_ids", list(file_ids), type_=ARRAY(UUID(as_uuid=True)))
+        new_edges = {
+            (file_id, dep_id)
+            for file_id in file_ids
+            for dep_id in dependencies.get(file_id, ())
+        }
+
+        async with self.pg_client.session() as session:
+            result = await session.execute(
+                select(graph_orm.id, graph_orm.file_id, graph_orm.parent_id).where(
+                    graph_orm.file_id == any_(ids_param)
+                )
+            )
+
+            kept_edges = set()
+            outdated_ids = []
+
+            for row in result.all():
+                edge = (row.file_id, row.parent_id)
+
+                if edge in new_edges:
+                    kept_edges.add(edge)
+                else:
+                    outdated_ids.append(row.id)
+
+            for start in range(0, len(outdated_ids), self.write_chunk_size):
+                await session.execute(
+                    delete(graph_orm).where(
+                        graph_orm.id.in_(outdated_ids[start:start + self.write_chunk_size])
+                    )
+                )
+
+            inserted = await self._insert_edges(session, list(new_edges - kept_edges))
+
+            await session.execute(delete(import_orm).where(import_orm.file_id == any_(ids_param)))
+            await self._copy_records(
+                session,
+                import_orm.__table__,
+                ["file_id", "path"],
+                [
+                    (file_id, path)
+                    for file_id in file_ids
+                    for path in imports.get(file_id, ())
+                ],
+            )
+            await session.commit()
+
+        diff.inserted_count = len(inserted)
+        diff.deleted_count = len(outdated_ids)
+
+        return diff
+
+    async def delete_by_file_ids(self, file_ids: List[uuid.UUID]) -> None:
+        """
+        Delete dependencies of files (nodes where files are children)
+        :param file_ids: list of file ids
+        """
+
+        if not file_ids:
+            return
+
+        async with self.pg_client.session() as session:
+            await session.execute(
+                delete(python_dependency_graph_orm.PythonDependencyGraphORM).where(
+                    python_dependency_graph_orm.PythonDependencyGraphORM.file_id.in_(file_ids)
+                )
+            )
+            await session.commit()
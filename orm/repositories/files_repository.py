@@ -1,14 +1,58 @@
+import asyncio
+import re
 import uuid
-from typing import Optional, List, Dict
+from collections import defaultdict
+from typing import AsyncGenerator, Optional, List, Dict, Set, Iterable, Sequence
 
-from sqlalchemy import update, select
+from sqlalchemy import (
+    Select,
+    Boolean,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    update,
+    select,
+    delete,
+    or_,
+    tuple_,
+    literal_column,
+    column,
+    table,
+    text,
+    any_,
+    bindparam,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql.functions import func
 
 from bases.orm_repositories import base_files_repository
-from dto import git_file_dto
-from orm.models import file_orm
+from config import storage_config
+from db_clients import alchemy_pg_client
+from dto import git_file_dto, page_dto, upsert_result_dto, file_facets_dto, search_hit_dto
+from orm.models import (
+    file_orm,
+    blob_orm,
+    compression_dictionary_orm,
+    embed_chunk_orm,
+    python_dependency_graph_orm,
+)
 from orm.repositories import base_repository
-from utils import const
+from utils import const, content_codec, data_loader
+
+storage_config_ = storage_config.StorageConfig()
+
+# session temporary table of contents to store. search_text is plain content of compressed rows,
+# sent only to build the search vector, so compressed inserts carry content twice
+blobs_staging = table(
+    "blobs_staging",
+    column("sha", String),
+    column("content", Text),
+    column("content_zstd", LargeBinary),
+    column("dictionary_id", Integer),
+    column("search_text", Text),
+)
 
 
 class FilesRepository(
@@ -19,6 +63,343 @@ class FilesRepository(
     Repository for files entity
     """
 
+    # rows per upsert statement, keeps bind parameters below the asyncpg limit
+    upsert_chunk_size = 1000
+
+    def __init__(
+        self,
+        pg_client: alchemy_pg_client.AlchemyPGClient,
+        compress: bool = storage_config_.compress_content,
+        dictionary_min_samples: int = storage_config_.dictionary_min_samples,
+        codec: Optional[content_codec.ContentCodec] = None,
+    ) -> None:
+        """
+        Init variables
+        :param pg_client: Postgres alchemy client
+        :param compress: store new contents zstd-compressed. Stored contents are read in any mode
+        :param dictionary_min_samples: min number of contents to train repository dictionary on
+        :param codec: contents codec
+        """
+
+        super().__init__(pg_client)
+
+        self.compress = compress
+        self.dictionary_min_samples = dictionary_min_samples
+        self.codec = codec or content_codec.ContentCodec(
+            level=storage_config_.compression_level,
+            dictionary_size=storage_config_.dictionary_size,
+        )
+        # repository dictionaries, None if the repository has no dictionary yet
+        self._repo_dictionaries: Dict[str, Optional[int]] = {}
+        # concurrent lookups by id are coalesced into one query
+        self._files_loader = data_loader.DataLoader(self.get_by_ids)
+
+    def _decode_content(self, blob: blob_orm.BlobORM) -> str:
+        """
+        Get plain content of blob
+        :param blob: blob DB object, its dictionary must be loaded
+        :return: content
+        """
+
+        if blob.content is not None:
+            return blob.content
+
+        return self.codec.decompress(blob.content_zstd, blob.dictionary_id)
+
+    def _to_dto(self, db_obj: file_orm.FileORM) -> git_file_dto.GitFileInDB:
+        """
+        Convert DB object to DTO
+        :param db_obj: file DB object
+        :return: file
+        """
+
+        return git_file_dto.GitFileInDB(
+            id=db_obj.id,
+            repo=db_obj.repo,
+            path=db_obj.path,
+            sha=db_obj.sha,
+            size=db_obj.size_bytes,
+            type=db_obj.type,
+            content=self._decode_content(db_obj.blob),
+        )
+
+    async def _load_dictionaries(
+        self,
+        session: AsyncSession,
+        dictionary_ids: Iterable[Optional[int]],
+    ) -> None:
+        """
+        Load dictionaries of compressed contents to the codec once
+        :param session: alchemy session
+        :param dictionary_ids: dictionary ids of contents to decode
+        """
+
+        missing = {
+            dictionary_id
+            for dictionary_id in dictionary_ids
+            if dictionary_id is not None and not self.codec.has_dictionary(dictionary_id)
+        }
+
+        if not missing:
+            return
+
+        dictionary_orm = compression_dictionary_orm.CompressionDictionaryORM
+        result = await session.execute(
+            select(dictionary_orm.id, dictionary_orm.data).where(dictionary_orm.id.in_(missing))
+        )
+
+        for row in result.all():
+            self.codec.add_dictionary(row.id, row.data)
+
+    async def _get_repo_dictionary(self, repo: str, samples: List[str]) -> Optional[int]:
+        """
+        Get dictionary of repository, train it on samples if the repository has none.
+        Dictionary is committed separately to stay valid if the caller transaction is rolled back
+        :param repo: repository full name
+        :param samples: contents of repository
+        :return: dictionary id, None if the repository has no dictionary and samples are not enough
+        """
+
+        if self._repo_dictionaries.get(repo) is not None:
+            return self._repo_dictionaries[repo]
+
+        dictionary_orm = compression_dictionary_orm.CompressionDictionaryORM
+        query = select(dictionary_orm.id, dictionary_orm.data).where(dictionary_orm.repo == repo)
+
+        async with self.pg_client.session() as session:
+            row = (await session.execute(query)).one_or_none()
+
+            if row is None and len(samples) >= self.dictionary_min_samples:
+                data = await asyncio.to_thread(self.codec.train, samples)
+
+                if data is not None:
+                    # concurrent writers of the same repository keep the first trained dictionary
+                    await session.execute(
+                        insert(dictionary_orm)
+                        .values(repo=repo, data=data)
+                        .on_conflict_do_nothing(index_elements=[dictionary_orm.repo])
+                    )
+                    await session.commit()
+                    row = (await session.execute(query)).one_or_none()
+
+        if row is None:
+            return None
+
+        if not self.codec.has_dictionary(row.id):
+            self.codec.add_dictionary(row.id, row.data)
+
+        self._repo_dictionaries[repo] = row.id
+
+        return row.id
+
+    @staticmethod
+    def _meta_query() -> Select:
+        """
+        Get query of files metadata without content
+        :return: query
+        """
+
+        return select(
+            file_orm.FileORM.id,
+            file_orm.FileORM.repo,
+            file_orm.FileORM.path,
+            file_orm.FileORM.sha,
+            file_orm.FileORM.size_bytes,
+            file_orm.FileORM.type,
+        )
+
+    @staticmethod
+    def _row_to_meta(row) -> git_file_dto.GitFileMetaInDB:
+        """
+        Convert metadata row to DTO
+        :param row: row of metadata query
+        :return: file metadata
+        """
+
+        return git_file_dto.GitFileMetaInDB(
+            id=row.id,
+            repo=row.repo,
+            path=row.path,
+            sha=row.sha,
+            size=row.size_bytes,
+            type=row.type,
+        )
+
+    @staticmethod
+    def _apply_filters(
+        query: Select,
+        file_type: Optional[const.FileType] = None,
+        extension: Optional[str] = None,
+        directory: Optional[str] = None,
+    ) -> Select:
+        """
+        Filter files query
+        :param query: query
+        :param file_type: file type
+        :param extension: file extension
+        :param directory: directory path, nested directories included
+        :return: filtered query
+        """
+
+        if file_type is not None:
+            query = query.filter(
+                file_orm.FileORM.type == file_type
+            )
+
+        if extension is not None:
+            query = query.filter(
+                file_orm.FileORM.extension == extension.lstrip(".").lower()
+            )
+
+        if directory is not None:
+            directory = directory.strip("/")
+
+            if directory:
+                # default backslash escape keeps LIKE prefix usable by text_pattern_ops index
+                pattern = re.sub(r"([\\%_])", r"\\\1", directory)
+                query = query.filter(
+                    or_(
+                        file_orm.FileORM.directory == directory,
+                        file_orm.FileORM.directory.like(f"{pattern}/%"),
+                    )
+                )
+
+        return query
+
+    @staticmethod
+    def _apply_keyset(query: Select, cursor: Optional[str], order: const.PageOrder) -> Select:
+        """
+        Order files query and start it after the cursor position
+        :param query: query
+        :param cursor: cursor of the page, first page if not set
+        :param order: files order
+        :return: page query
+        """
+
+        position = FilesRepository._decode_cursor(cursor)
+
+        if order == const.PageOrder.PATH:
+            query = query.order_by(file_orm.FileORM.path, file_orm.FileORM.id)
+
+            if position is not None:
+                query = query.filter(
+                    tuple_(file_orm.FileORM.path, file_orm.FileORM.id)
+                    > (position["path"], uuid.UUID(position["id"]))
+                )
+        else:
+            query = query.order_by(file_orm.FileORM.id)
+
+            if position is not None:
+                query = query.filter(file_orm.FileORM.id > uuid.UUID(position["id"]))
+
+        return query
+
+    @staticmethod
+    def _next_cursor(rows: Sequence, limit: int, order: const.PageOrder) -> Optional[str]:
+        """
+        Get cursor of the page after rows
+        :param rows: page rows with id and path
+        :param limit: number of files in a page
+        :param order: files order
+        :return: cursor, None for the last page
+        """
+
+        if len(rows) < limit:
+            return None
+
+        last = rows[-1]
+
+        return FilesRepository._encode_cursor(
+            {"id": str(last.id), "path": last.path}
+            if order == const.PageOrder.PATH
+            else {"id": str(last.id)}
+        )
+
+    async def _store_blobs(
+        self,
+        session: AsyncSession,
+        files: List[git_file_dto.GitFile],
+    ) -> None:
+        """
+        Store files contents by hash, already stored contents are skipped.
+        Contents are compressed with dictionary of their repository in compression mode
+        :param session: alchemy session
+        :param files: files with content
+        """
+
+        unique_files = {file.sha: file for file in files}
+        dictionaries: Dict[str, Optional[int]] = {}
+
+        if self.compress:
+            samples = defaultdict(list)
+
+            for file in unique_files.values():
+                samples[file.repo].append(file.content)
+
+            for repo, repo_samples in samples.items():
+                dictionaries[repo] = await self._get_repo_dictionary(repo, repo_samples)
+
+        rows = []
+
+        for sha, file in unique_files.items():
+            if self.compress:
+                dictionary_id = dictionaries[file.repo]
+                rows.append((
+                    sha,
+                    None,
+                    self.codec.compress(file.content, dictionary_id),
+                    dictionary_id,
+                    file.content,
+                ))
+            else:
+                rows.append((sha, file.content, None, None, None))
+
+        # staged by COPY, large contents are not sent as bind parameters
+        await session.execute(
+            text(
+                """
+                CREATE TEMPORARY TABLE IF NOT EXISTS blobs_staging (
+                    sha varchar(200),
+                    content text,
+                    content_zstd bytea,
+                    dictionary_id integer,
+                    search_text text
+                ) ON COMMIT DELETE ROWS
+                """
+            )
+        )
+
+        # blobs are locked until commit, so orphan collection can't delete them before files
+        # reference them. Blobs deleted by a collection in flight are not locked and stored again
+        while rows:
+            await self._copy_records(session, blobs_staging, list(blobs_staging.c.keys()), rows)
+
+            query = insert(blob_orm.BlobORM).from_select(
+                ["sha", "content", "content_zstd", "dictionary_id", "search_vector"],
+                select(
+                    blobs_staging.c.sha,
+                    blobs_staging.c.content,
+                    blobs_staging.c.content_zstd,
+                    blobs_staging.c.dictionary_id,
+                    func.to_tsvector(
+                        self._ts_config(),
+                        func.coalesce(blobs_staging.c.content, blobs_staging.c.search_text),
+                    ),
+                ),
+            )
+            await session.execute(
+                query.on_conflict_do_nothing(index_elements=[blob_orm.BlobORM.sha])
+            )
+            await session.execute(delete(blobs_staging))
+
+            locked = await session.execute(
+                select(blob_orm.BlobORM.sha)
+                .where(blob_orm.BlobORM.sha == any_(bindparam("shas", [row[0] for row in rows], type_=ARRAY(String))))
+                .with_for_update(key_share=True)
+            )
+            locked_shas = set(locked.scalars())
+            rows = [row for row in rows if row[0] not in locked_shas]
+
     async def batch_create(
         self,
         files: List[git_file_dto.GitFile],
@@ -29,62 +410,106 @@ class FilesRepository(
         :return: files with corresponding ids
         """
 
-        db_objs = [
-            file_orm.FileORM(
-                path=obj.path,
-                sha=obj.sha,
-                size_bytes=obj.size,
-                type=obj.type,
-                content=obj.content,
-            )
-            for obj in files
+        created = [
+            git_file_dto.GitFileInDB(id=uuid.uuid4(), **file.model_dump(exclude={"id"}))
+            for file in files
         ]
 
         async with self.pg_client.session() as session:
-            session.add_all(db_objs)
+            await self._store_blobs(session, created)
+            await self._copy_records(
+                session,
+                file_orm.FileORM.__table__,
+                ["id", "repo", "path", "sha", "size_bytes", "type"],
+                [
+                    (file.id, file.repo, file.path, file.sha, file.size, file.type.value)
+                    for file in created
+                ],
+            )
+            await session.commit()
 
-            await session.flush()
+        return created
 
-            for db_obj in db_objs:
-                await session.refresh(db_obj)
+    async def batch_upsert(
+        self,
+        files: List[git_file_dto.GitFile],
+    ) -> upsert_result_dto.UpsertResult:
+        """
+        Insert new files and update stored files by repository and path if their hash differs
+        :param files: list of files
+        :return: ids of inserted, updated and untouched files
+        """
 
-            await session.commit()
+        result = upsert_result_dto.UpsertResult()
 
-            return [
-                git_file_dto.GitFileInDB(
-                    id=db_obj.id,
-                    path=db_obj.path,
-                    sha=db_obj.sha,
-                    size=db_obj.size_bytes,
-                    type=db_obj.type,
-                    content=db_obj.content,
+        # one statement can't affect the same row twice, the last version wins
+        unique_files = {(file.repo, file.path): file for file in files}
+        keys = list(unique_files)
+        affected = set()
+
+        async with self.pg_client.session() as session:
+            await self._store_blobs(session, list(unique_files.values()))
+
+            for start in range(0, len(keys), self.upsert_chunk_size):
+                chunk = [unique_files[key] for key in keys[start:start + self.upsert_chunk_size]]
+
+                query = insert(file_orm.FileORM).values([
+                    {
+                        "id": uuid.uuid4(),
+                        "repo": file.repo,
+                        "path": file.path,
+                        "sha": file.sha,
+                        "size_bytes": file.size,
+                        "type": file.type,
+                    }
+                    for file in chunk
+                ])
+                query = query.on_conflict_do_update(
+                    index_elements=[file_orm.FileORM.repo, file_orm.FileORM.path],
+                    set_={
+                        "sha": query.excluded.sha,
+                        "size_bytes": query.excluded.size_bytes,
+                        "type": query.excluded.type,
+                    },
+                    where=file_orm.FileORM.sha != query.excluded.sha,
+                ).returning(
+                    file_orm.FileORM.id,
+                    file_orm.FileORM.repo,
+                    file_orm.FileORM.path,
+                    # xmax is zero only for rows inserted by the statement
+                    literal_column("xmax = 0", Boolean).label("inserted"),
                 )
-                for db_obj in db_objs
-            ]
+
+                for row in await session.execute(query):
+                    affected.add((row.repo, row.path))
+
+                    if row.inserted:
+                        result.inserted_ids.append(row.id)
+                    else:
+                        result.updated_ids.append(row.id)
+
+            untouched = [key for key in keys if key not in affected]
+
+            for start in range(0, len(untouched), self.upsert_chunk_size):
+                query = select(file_orm.FileORM.id).where(
+                    tuple_(file_orm.FileORM.repo, file_orm.FileORM.path).in_(
+                        untouched[start:start + self.upsert_chunk_size]
+                    )
+                )
+                result.untouched_ids.extend((await session.execute(query)).scalars())
+
+            await session.commit()
+
+        return result
 
     async def get_by_id(self, file_id: uuid.UUID) -> Optional[git_file_dto.GitFileInDB]:
         """
-        Get file by id
+        Get file by id. Lookups of concurrent callers are loaded by one query
         :param file_id: file id
         :return: file if found, None otherwise
         """
 
-        async with self.pg_client.session() as session:
-            query = select(file_orm.FileORM).where(file_orm.FileORM.id == file_id)
-            result = await session.execute(query)
-            db_obj = result.scalar_one_or_none()
-
-            if not db_obj:
-                return None
-
-            return git_file_dto.GitFileInDB(
-                id=db_obj.id,
-                path=db_obj.path,
-                sha=db_obj.sha,
-                size=db_obj.size_bytes,
-                type=db_obj.type,
-                content=db_obj.content,
-            )
+        return await self._files_loader.load(file_id)
 
     async def get_by_ids(self, file_ids: List[uuid.UUID]) -> Dict[uuid.UUID, git_file_dto.GitFileInDB]:
         """
@@ -100,52 +525,255 @@ class FilesRepository(
             result = await session.execute(query)
             db_objs = result.scalars().all()
 
+            await self._load_dictionaries(session, (db_obj.blob.dictionary_id for db_obj in db_objs))
+
             return {
-                db_obj.id: git_file_dto.GitFileInDB(
-                    id=db_obj.id,
-                    path=db_obj.path,
-                    sha=db_obj.sha,
-                    size=db_obj.size_bytes,
-                    type=db_obj.type,
-                    content=db_obj.content,
-                )
+                db_obj.id: self._to_dto(db_obj)
                 for db_obj in db_objs
             }
 
+    async def get_meta_by_id(self, file_id: uuid.UUID) -> Optional[git_file_dto.GitFileMetaInDB]:
+        """
+        Get file metadata without content by id
+        :param file_id: file id
+        :return: file metadata if found, None otherwise
+        """
+
+        async with self.pg_client.session() as session:
+            query = self._meta_query().where(file_orm.FileORM.id == file_id)
+            result = await session.execute(query)
+            row = result.one_or_none()
+
+            if not row:
+                return None
+
+            return self._row_to_meta(row)
+
+    async def get_meta_by_ids(
+        self,
+        file_ids: List[uuid.UUID],
+    ) -> Dict[uuid.UUID, git_file_dto.GitFileMetaInDB]:
+        """
+        Get metadata without content of multiple files in a single query
+        :param file_ids: list of file ids
+        :return: dict of files metadata. Key - id, value - metadata
+        """
+
+        async with self.pg_client.session() as session:
+            query = self._meta_query().where(file_orm.FileORM.id.in_(file_ids))
+            result = await session.execute(query)
+
+            return {
+                row.id: self._row_to_meta(row)
+                for row in result.all()
+            }
+
+    async def get_meta_by_shas(
+        self,
+        shas: List[str],
+    ) -> Dict[str, List[git_file_dto.GitFileMetaInDB]]:
+        """
+        Get metadata without content of files with given content hashes
+        :param shas: content hashes
+        :return: dict of files metadata. Key - hash, value - files with this content
+        """
+
+        async with self.pg_client.session() as session:
+            query = self._meta_query().where(file_orm.FileORM.sha.in_(shas))
+            result = await session.execute(query)
+            files = defaultdict(list)
+
+            for row in result.all():
+                files[row.sha].append(self._row_to_meta(row))
+
+            return dict(files)
+
+    async def get_contents(
+        self,
+        file_ids: List[uuid.UUID],
+        max_length: Optional[int] = None,
+    ) -> Dict[uuid.UUID, str]:
+        """
+        Get content of multiple files
+        :param file_ids: list of file ids
+        :param max_length: number of leading characters to load, whole content if not set
+        :return: dict of contents. Key - id, value - content
+        """
+
+        content = blob_orm.BlobORM.content
+
+        if max_length is not None:
+            content = func.left(content, max_length)
+
+        async with self.pg_client.session() as session:
+            query = select(
+                file_orm.FileORM.id,
+                content.label("content"),
+                blob_orm.BlobORM.content_zstd,
+                blob_orm.BlobORM.dictionary_id,
+            ).join(
+                blob_orm.BlobORM, blob_orm.BlobORM.sha == file_orm.FileORM.sha
+            ).where(
+                file_orm.FileORM.id.in_(file_ids)
+            )
+            rows = (await session.execute(query)).all()
+
+            await self._load_dictionaries(session, (row.dictionary_id for row in rows))
+
+        contents = {}
+
+        for row in rows:
+            if row.content is not None:
+                contents[row.id] = row.content
+                continue
+
+            # compressed content can't be cut by the database
+            contents[row.id] = self.codec.decompress(row.content_zstd, row.dictionary_id)[:max_length]
+
+        return contents
+
     async def get_files_count(
         self,
         file_type: Optional[const.FileType] = None,
         extension: Optional[str] = None,
+        directory: Optional[str] = None,
     ) -> int:
         """
         Get number of files in DB
         :param file_type: file type
         :param extension: file extension
+        :param directory: directory path, nested directories included
         :return: files count
         """
 
         async with self.pg_client.session() as session:
             query = select(func.count(file_orm.FileORM.id))
+            query = self._apply_filters(query, file_type, extension, directory)
 
-            if file_type is not None:
-                query = query.filter(
-                    file_orm.FileORM.type == file_type
-                )
+            result = await session.execute(query)
 
-            if extension is not None:
-                extension = f".{extension}" if extension[0] != "." else extension
-                query = query.filter(
-                    file_orm.FileORM.path.ilike(f"%{extension}")
+            return result.scalar()
+
+    async def get_facets(
+        self,
+        file_type: Optional[const.FileType] = None,
+        extension: Optional[str] = None,
+        directory: Optional[str] = None,
+    ) -> file_facets_dto.FileFacets:
+        """
+        Get files counts by extension, directory and type in a single scan
+        :param file_type: file type
+        :param extension: file extension
+        :param directory: directory path, nested directories included
+        :return: files facets
+        """
+
+        extension_col = file_orm.FileORM.extension
+        directory_col = file_orm.FileORM.directory
+        type_col = file_orm.FileORM.type
+
+        async with self.pg_client.session() as session:
+            query = select(
+                extension_col,
+                directory_col,
+                type_col,
+                func.grouping(extension_col).label("by_extension"),
+                func.grouping(directory_col).label("by_directory"),
+                func.count().label("count"),
+            ).group_by(
+                func.grouping_sets(
+                    tuple_(extension_col),
+                    tuple_(directory_col),
+                    tuple_(type_col),
                 )
+            )
+            query = self._apply_filters(query, file_type, extension, directory)
 
             result = await session.execute(query)
+            facets = file_facets_dto.FileFacets()
 
-            return result.scalar()
+            for row in result.all():
+                # grouping() is 0 for the column the row is grouped by
+                if row.by_extension == 0:
+                    facets.extensions[row.extension or ""] = row.count
+                elif row.by_directory == 0:
+                    facets.directories[row.directory or ""] = row.count
+                else:
+                    facets.types[row.type] = row.count
+                    facets.total += row.count
+
+            return facets
+
+    async def search(
+        self,
+        query: str,
+        limit: int = 10,
+        file_type: Optional[const.FileType] = None,
+        extension: Optional[str] = None,
+        directory: Optional[str] = None,
+    ) -> List[search_hit_dto.SearchHit]:
+        """
+        Full-text search of files by content
+        :param query: search query
+        :param limit: number of files to return
+        :param file_type: file type
+        :param extension: file extension
+        :param directory: directory path, nested directories included
+        :return: files ordered by relevance, without content
+        """
+
+        ts_query = self._ts_query(query)
+        rank = func.ts_rank(blob_orm.BlobORM.search_vector, ts_query)
+
+        async with self.pg_client.session() as session:
+            stmt = select(file_orm.FileORM.id, rank.label("rank")).join(
+                blob_orm.BlobORM, blob_orm.BlobORM.sha == file_orm.FileORM.sha
+            ).where(
+                blob_orm.BlobORM.search_vector.bool_op("@@")(ts_query)
+            ).order_by(rank.desc(), file_orm.FileORM.id).limit(limit)
+            stmt = self._apply_filters(stmt, file_type, extension, directory)
+
+            result = await session.execute(stmt)
+
+            return [
+                search_hit_dto.SearchHit(id=row.id, score=row.rank, text_rank=position)
+                for position, row in enumerate(result.all(), start=1)
+            ]
+
+    async def search_chunks(
+        self,
+        query: str,
+        limit: int = 10,
+    ) -> List[search_hit_dto.SearchHit]:
+        """
+        Full-text search of embedded file chunks
+        :param query: search query
+        :param limit: number of chunks to return
+        :return: chunks ordered by relevance
+        """
+
+        chunk_orm = embed_chunk_orm.EmbedChunkORM
+        ts_query = self._ts_query(query)
+        rank = func.ts_rank(chunk_orm.search_vector, ts_query)
+
+        async with self.pg_client.session() as session:
+            stmt = select(chunk_orm.id, chunk_orm.content, rank.label("rank")).where(
+                chunk_orm.blob_sha.is_not(None),
+                chunk_orm.search_vector.bool_op("@@")(ts_query),
+            ).order_by(rank.desc(), chunk_orm.id).limit(limit)
+
+            result = await session.execute(stmt)
+
+            return [
+                search_hit_dto.SearchHit(id=row.id, content=row.content, score=row.rank, text_rank=position)
+                for position, row in enumerate(result.all(), start=1)
+            ]
 
     async def list(
         self,
         file_type: Optional[const.FileType] = None,
         extension: Optional[str] = None,
+        directory: Optional[str] = None,
         limit: Optional[int] = None,
         offset: Optional[int] = None,
     ) -> List[git_file_dto.GitFileInDB]:
@@ -153,24 +781,15 @@ class FilesRepository(
         Get list of files
         :param file_type: file type
         :param extension: file extension
+        :param directory: directory path, nested directories included
         :param limit: number of files to return
         :param offset: offset of files to return
         :return: files
         """
 
         async with self.pg_client.session() as session:
-            query = select(file_orm.FileORM)
-
-            if file_type is not None:
-                query = query.filter(
-                    file_orm.FileORM.type == file_type
-                )
-
-            if extension is not None:
-                extension = f".{extension}" if extension[0] != "." else extension
-                query = query.filter(
-                    file_orm.FileORM.path.ilike(f"%{extension}")
-                )
+            query = select(file_orm.FileORM).order_by(file_orm.FileORM.id)
+            query = self._apply_filters(query, file_type, extension, directory)
 
             if limit is not None:
                 query = query.limit(limit)
@@ -181,18 +800,147 @@ class FilesRepository(
             db_objs = await session.execute(query)
             db_objs = db_objs.scalars().all()
 
+            await self._load_dictionaries(session, (db_obj.blob.dictionary_id for db_obj in db_objs))
+
             return [
-                git_file_dto.GitFileInDB(
-                    id=db_obj.id,
-                    path=db_obj.path,
-                    sha=db_obj.sha,
-                    size=db_obj.size_bytes,
-                    type=db_obj.type,
-                    content=db_obj.content,
-                )
+                self._to_dto(db_obj)
                 for db_obj in db_objs
             ]
 
+    async def iter_files(
+        self,
+        file_type: Optional[const.FileType] = None,
+        extension: Optional[str] = None,
+        directory: Optional[str] = None,
+        batch_size: int = 1000,
+    ) -> AsyncGenerator[List[git_file_dto.GitFileInDB], None]:
+        """
+        Iterate over all files by batches from a single server-side cursor. The connection is held
+        until iteration ends, consumers waiting on remote calls should use list_page
+        :param file_type: file type
+        :param extension: file extension
+        :param directory: directory path, nested directories included
+        :param batch_size: number of files fetched from the cursor at once
+        :return: files batch
+        """
+
+        async with self.pg_client.session() as session:
+            query = select(file_orm.FileORM).order_by(file_orm.FileORM.id)
+            query = self._apply_filters(query, file_type, extension, directory)
+
+            result = await session.stream_scalars(
+                query.execution_options(yield_per=batch_size)
+            )
+
+            async for db_objs in result.partitions():
+                await self._load_dictionaries(session, (db_obj.blob.dictionary_id for db_obj in db_objs))
+
+                yield [
+                    self._to_dto(db_obj)
+                    for db_obj in db_objs
+                ]
+
+    async def list_meta(
+        self,
+        file_type: Optional[const.FileType] = None,
+        extension: Optional[str] = None,
+        directory: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+    ) -> List[git_file_dto.GitFileMetaInDB]:
+        """
+        Get list of files metadata without content
+        :param file_type: file type
+        :param extension: file extension
+        :param directory: directory path, nested directories included
+        :param limit: number of files to return
+        :param offset: offset of files to return
+        :return: files metadata
+        """
+
+        async with self.pg_client.session() as session:
+            query = self._meta_query().order_by(file_orm.FileORM.id)
+            query = self._apply_filters(query, file_type, extension, directory)
+
+            if limit is not None:
+                query = query.limit(limit)
+
+            if offset is not None:
+                query = query.offset(offset)
+
+            result = await session.execute(query)
+
+            return [
+                self._row_to_meta(row)
+                for row in result.all()
+            ]
+
+    async def list_meta_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        file_type: Optional[const.FileType] = None,
+        extension: Optional[str] = None,
+        directory: Optional[str] = None,
+        order: const.PageOrder = const.PageOrder.ID,
+    ) -> page_dto.Page[git_file_dto.GitFileMetaInDB]:
+        """
+        Get page of files metadata without content with keyset pagination
+        :param limit: number of files to return
+        :param cursor: cursor of the page, first page if not set
+        :param file_type: file type
+        :param extension: file extension
+        :param directory: directory path, nested directories included
+        :param order: files order
+        :return: files metadata page
+        """
+
+        async with self.pg_client.session() as session:
+            query = self._apply_filters(self._meta_query(), file_type, extension, directory)
+            query = self._apply_keyset(query, cursor, order)
+
+            result = await session.execute(query.limit(limit))
+            rows = result.all()
+
+            return page_dto.Page[git_file_dto.GitFileMetaInDB](
+                items=[self._row_to_meta(row) for row in rows],
+                next_cursor=self._next_cursor(rows, limit, order),
+            )
+
+    async def list_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        file_type: Optional[const.FileType] = None,
+        extension: Optional[str] = None,
+        directory: Optional[str] = None,
+        order: const.PageOrder = const.PageOrder.ID,
+    ) -> page_dto.Page[git_file_dto.GitFileInDB]:
+        """
+        Get page of files with keyset pagination
+        :param limit: number of files to return
+        :param cursor: cursor of the page, first page if not set
+        :param file_type: file type
+        :param extension: file extension
+        :param directory: directory path, nested directories included
+        :param order: files order
+        :return: files page
+        """
+
+        async with self.pg_client.session() as session:
+            query = self._apply_filters(select(file_orm.FileORM), file_type, extension, directory)
+            query = self._apply_keyset(query, cursor, order)
+
+            result = await session.execute(query.limit(limit))
+            db_objs = result.scalars().all()
+
+            await self._load_dictionaries(session, (db_obj.blob.dictionary_id for db_obj in db_objs))
+
+            return page_dto.Page[git_file_dto.GitFileInDB](
+                items=[self._to_dto(db_obj) for db_obj in db_objs],
+                next_cursor=self._next_cursor(db_objs, limit, order),
+            )
+
     async def batch_update(self, objs_in: List[dict]) -> None:
         """
         Update files
@@ -202,3 +950,102 @@ class FilesRepository(
         async with self.pg_client.session() as session:
             await session.execute(update(file_orm.FileORM), objs_in)
             await session.commit()
+
+    async def get_refs(self, repo: Optional[str] = None) -> Dict[str, git_file_dto.GitFileRef]:
+        """
+        Get stored versions of all files
+        :param repo: repository full name, files of all repositories if not set
+        :return: dict of file versions. Key - path, value - version
+        """
+
+        async with self.pg_client.session() as session:
+            query = select(
+                file_orm.FileORM.id,
+                file_orm.FileORM.path,
+                file_orm.FileORM.sha,
+            )
+
+            if repo is not None:
+                query = query.filter(file_orm.FileORM.repo == repo)
+            result = await session.execute(query)
+
+            return {
+                row.path: git_file_dto.GitFileRef(
+                    id=row.id,
+                    path=row.path,
+                    sha=row.sha,
+                )
+                for row in result.all()
+            }
+
+    async def delete_by_ids(self, file_ids: List[uuid.UUID]) -> None:
+        """
+        Delete files with their dependency graph nodes.
+        Contents with their chunks are kept until delete_orphan_blobs
+        :param file_ids: list of file ids
+        """
+
+        if not file_ids:
+            return
+
+        graph_orm = python_dependency_graph_orm.PythonDependencyGraphORM
+
+        async with self.pg_client.session() as session:
+            await session.execute(
+                delete(graph_orm).where(
+                    or_(
+                        graph_orm.file_id.in_(file_ids),
+                        graph_orm.parent_id.in_(file_ids),
+                    )
+                )
+            )
+            await session.execute(
+                delete(file_orm.FileORM).where(file_orm.FileORM.id.in_(file_ids))
+            )
+            await session.commit()
+
+    async def delete_orphan_blobs(self) -> int:
+        """
+        Delete contents not referenced by any file, their embedded chunks are removed by cascade.
+        Maintenance step, safe to run alongside ingestion: contents being stored are skipped
+        :return: number of deleted contents
+        """
+
+        blob = blob_orm.BlobORM
+        not_referenced = ~select(file_orm.FileORM.id).where(file_orm.FileORM.sha == blob.sha).exists()
+
+        async with self.pg_client.session() as session:
+            # blobs locked by ingestion in flight are skipped, locked orphans can't get new references
+            result = await session.execute(
+                select(blob.sha).where(not_referenced).with_for_update(skip_locked=True)
+            )
+            shas = list(result.scalars())
+
+            if not shas:
+                return 0
+
+            # checked again by a new statement, which sees files committed before the lock
+            result = await session.execute(
+                delete(blob).where(
+                    blob.sha == any_(bindparam("shas", shas, type_=ARRAY(String))),
+                    not_referenced,
+                )
+            )
+            await session.commit()
+
+            return result.rowcount
+
+    async def get_embedded_shas(self, shas: List[str]) -> Set[str]:
+        """
+        Get content hashes which already have embedded chunks
+        :param shas: content hashes
+        :return: embedded content hashes
+        """
+
+        async with self.pg_client.session() as session:
+            query = select(embed_chunk_orm.EmbedChunkORM.blob_sha).where(
+                embed_chunk_orm.EmbedChunkORM.blob_sha.in_(shas)
+            ).distinct()
+            result = await session.execute(query)
+
+            return set(result.scalars())
@@ -1,10 +1,13 @@
+import json
 import uuid
-from typing import Optional, List
+from typing import AsyncGenerator, Optional, List, Dict
 
-from sqlalchemy import select
+from sqlalchemy import select, delete, cast, bindparam, Text
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.sql.functions import func
 
 from bases.orm_repositories import base_insights_repository
-from dto import insight_dto
+from dto import insight_dto, page_dto, search_hit_dto
 from orm.models import insight_orm
 from orm.repositories import base_repository
 from utils import const
@@ -18,6 +21,23 @@ class InsightsRepository(
     Repository for insight entity
     """
 
+    @staticmethod
+    def _to_dto(db_obj: insight_orm.InsightORM) -> insight_dto.InsightInDB:
+        """
+        Convert DB object to DTO
+        :param db_obj: insight DB object
+        :return: insight
+        """
+
+        return insight_dto.InsightInDB(
+            id=db_obj.id,
+            file_ids=[uuid.UUID(str(id_)) for id_ in db_obj.file_ids],
+            content=db_obj.content,
+            insight_type=const.InsightType(db_obj.insight_type),
+            severity=const.InsightSeverity(db_obj.severity),
+            confidence=db_obj.confidence,
+        )
+
     async def list(
         self,
         limit: Optional[int] = None,
@@ -31,7 +51,7 @@ class InsightsRepository(
         """
 
         async with self.pg_client.session() as session:
-            query = select(insight_orm.InsightORM)
+            query = select(insight_orm.InsightORM).order_by(insight_orm.InsightORM.id)
 
             if limit is not None:
                 query = query.limit(limit)
@@ -43,19 +63,67 @@ class InsightsRepository(
             db_objs = db_objs.scalars().all()
 
             return [
-                insight_dto.InsightInDB(
-                    id=db_obj.id,
-                    content=db_obj.content,
-                    file_ids=[
-                        id_ for id_ in db_obj.file_ids
-                    ],
-                    insight_type=db_obj.insight_type,
-                    severity=db_obj.severity,
-                    confidence=db_obj.confidence,
-                )
+                self._to_dto(db_obj)
                 for db_obj in db_objs
             ]
 
+    async def iter_insights(
+        self,
+        batch_size: int = 1000,
+    ) -> AsyncGenerator[List[insight_dto.InsightInDB], None]:
+        """
+        Iterate over all insights by batches from a single server-side cursor. The connection is held
+        until iteration ends, consumers waiting on remote calls should use list_page
+        :param batch_size: number of insights fetched from the cursor at once
+        :return: insights batch
+        """
+
+        async with self.pg_client.session() as session:
+            query = select(insight_orm.InsightORM).order_by(insight_orm.InsightORM.id)
+
+            result = await session.stream_scalars(
+                query.execution_options(yield_per=batch_size)
+            )
+
+            async for db_objs in result.partitions():
+                yield [
+                    self._to_dto(db_obj)
+                    for db_obj in db_objs
+                ]
+
+    async def list_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+    ) -> page_dto.Page[insight_dto.InsightInDB]:
+        """
+        Get page of insights ordered by id with keyset pagination
+        :param limit: number of insights to return
+        :param cursor: cursor of the page, first page if not set
+        :return: insights page
+        """
+
+        position = self._decode_cursor(cursor)
+
+        async with self.pg_client.session() as session:
+            query = select(insight_orm.InsightORM).order_by(insight_orm.InsightORM.id)
+
+            if position is not None:
+                query = query.filter(insight_orm.InsightORM.id > uuid.UUID(position["id"]))
+
+            result = await session.execute(query.limit(limit))
+            db_objs = result.scalars().all()
+
+            next_cursor = None
+
+            if len(db_objs) == limit:
+                next_cursor = self._encode_cursor({"id": str(db_objs[-1].id)})
+
+            return page_dto.Page[insight_dto.InsightInDB](
+                items=[self._to_dto(db_obj) for db_obj in db_objs],
+                next_cursor=next_cursor,
+            )
+
     async def batch_create(
         self,
         insights: List[insight_dto.Insight],
@@ -66,36 +134,101 @@ class InsightsRepository(
         :return: list of insights as db objects
         """
 
-        db_objs: list[insight_orm.InsightORM] = []
+        created = [
+            insight_dto.InsightInDB(id=uuid.uuid4(), **insight.model_dump(exclude={"id"}))
+            for insight in insights
+        ]
 
-        for insight in insights:
-            db_objs.append(
-                insight_orm.InsightORM(
-                    file_ids=[str(id_) for id_ in insight.file_ids],
-                    content=insight.content,
-                    insight_type=insight.insight_type.value,
-                    severity=insight.severity.value,
-                    confidence=insight.confidence,
+        async with self.pg_client.session() as session:
+            await self._copy_records(
+                session,
+                insight_orm.InsightORM.__table__,
+                ["id", "file_ids", "content", "insight_type", "severity", "confidence"],
+                [
+                    (
+                        insight.id,
+                        json.dumps([str(id_) for id_ in insight.file_ids]),
+                        insight.content,
+                        insight.insight_type.value,
+                        insight.severity.value,
+                        insight.confidence,
+                    )
+                    for insight in created
+                ],
+            )
+            await session.commit()
+
+        return created
+
+    async def delete_by_file_ids(self, file_ids: List[uuid.UUID]) -> int:
+        """
+        Delete insights referencing any of files, their embedded chunks are removed by cascade
+        :param file_ids: list of file ids
+        :return: number of deleted insights
+        """
+
+        if not file_ids:
+            return 0
+
+        file_ids_param = bindparam("file_ids", [str(id_) for id_ in file_ids], type_=ARRAY(Text))
+
+        async with self.pg_client.session() as session:
+            # file ids are stored as a JSON array of strings, ?| matches any of them
+            result = await session.execute(
+                delete(insight_orm.InsightORM).where(
+                    cast(insight_orm.InsightORM.file_ids, JSONB).op("?|")(file_ids_param)
                 )
             )
+            await session.commit()
+
+            return result.rowcount
+
+    async def get_by_ids(self, insight_ids: List[uuid.UUID]) -> Dict[uuid.UUID, insight_dto.InsightInDB]:
+        """
+        Get multiple insights by their ids in a single query
+        :param insight_ids: list of insight ids
+        :return: dict of insights. Key - id, value - data
+        """
 
         async with self.pg_client.session() as session:
-            session.add_all(db_objs)
-            await session.flush()
+            query = select(insight_orm.InsightORM).where(
+                insight_orm.InsightORM.id.in_(insight_ids)
+            )
+            result = await session.execute(query)
+            db_objs = result.scalars().all()
 
-            for db_obj in db_objs:
-                await session.refresh(db_obj)
+            return {
+                db_obj.id: self._to_dto(db_obj)
+                for db_obj in db_objs
+            }
 
-            await session.commit()
+    async def search(
+        self,
+        query: str,
+        limit: int = 10,
+    ) -> List[search_hit_dto.SearchHit]:
+        """
+        Full-text search of insights
+        :param query: search query
+        :param limit: number of insights to return
+        :return: insights ordered by relevance
+        """
+
+        ts_query = self._ts_query(query)
+        rank = func.ts_rank(insight_orm.InsightORM.search_vector, ts_query)
+
+        async with self.pg_client.session() as session:
+            stmt = select(
+                insight_orm.InsightORM.id,
+                insight_orm.InsightORM.content,
+                rank.label("rank"),
+            ).where(
+                insight_orm.InsightORM.search_vector.bool_op("@@")(ts_query)
+            ).order_by(rank.desc(), insight_orm.InsightORM.id).limit(limit)
+
+            result = await session.execute(stmt)
 
             return [
-                insight_dto.InsightInDB(
-                    id=db_obj.id,
-                    file_ids=[uuid.UUID(id_) for id_ in db_obj.file_ids],  # noqa
-                    content=db_obj.content,
-                    insight_type=const.InsightType(db_obj.insight_type),
-                    severity=const.InsightSeverity(db_obj.severity),
-                    confidence=db_obj.confidence,
-                )
-                for db_obj in db_objs
+                search_hit_dto.SearchHit(id=row.id, content=row.content, score=row.rank, text_rank=position)
+                for position, row in enumerate(result.all(), start=1)
             ]
@@ -0,0 +1,244 @@
+import asyncio
+import uuid
+from typing import Optional, List, Dict, Set
+
+from bases.orm_repositories import base_dependency_graph_repository
+from dto import dependency_graph_node_dto, page_dto, graph_diff_dto, graph_adjacency_dto
+from utils import const, csr_graph
+
+
+class SnapshotDependencyGraphRepository(base_dependency_graph_repository.BaseDependencyGraphRepository):
+    """
+    In-memory snapshot of the whole dependency graph over another dependency graph repository.
+    The graph is loaded in CSR form by one query on first lookup, neighbour and graph lookups
+    are served from CSR arrays without round trips. Writes through the wrapper drop the snapshot,
+    changes made elsewhere (graph rebuild by another process, cascade deletes of files)
+    need invalidate
+    """
+
+    def __init__(self, deps_repo: base_dependency_graph_repository.BaseDependencyGraphRepository) -> None:
+        """
+        Init variables
+        :param deps_repo: wrapped dependency graph repository
+        """
+
+        self.deps_repo = deps_repo
+
+        self._graph: Optional[csr_graph.CSRGraph] = None
+        self._generation = 0
+        self._load_lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        """
+        Drop snapshot, the next lookup loads the graph again
+        """
+
+        self._graph = None
+        self._generation += 1
+
+    async def _get_graph(self) -> csr_graph.CSRGraph:
+        """
+        Get snapshot, concurrent first lookups share one load
+        :return: graph snapshot
+        """
+
+        if self._graph is not None:
+            return self._graph
+
+        async with self._load_lock:
+            if self._graph is not None:
+                return self._graph
+
+            generation = self._generation
+            graph = csr_graph.CSRGraph(await self.deps_repo.get_adjacency())
+
+            # a snapshot loaded across invalidation may miss the change and is not kept
+            if generation == self._generation:
+                self._graph = graph
+
+            return graph
+
+    async def batch_create(
+        self,
+        nodes: List[dependency_graph_node_dto.DependencyGraphNode],
+    ) -> List[dependency_graph_node_dto.PythonDependencyGraphNodeInDB]:
+        """
+        Create multiple nodes in DB, nodes of already stored edges are skipped
+        :param nodes: list of nodes to create
+        :return: created nodes with corresponding ids
+        """
+
+        try:
+            return await self.deps_repo.batch_create(nodes)
+        finally:
+            self.invalidate()
+
+    async def list(
+        self,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+    ) -> List[dependency_graph_node_dto.PythonDependencyGraphNodeInDB]:
+        """
+        Get list of nodes
+        :param limit: number of files to return
+        :param offset: offset of files to return
+        :return: nodes
+        """
+
+        return await self.deps_repo.list(limit, offset)
+
+    async def list_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+    ) -> page_dto.Page[dependency_graph_node_dto.PythonDependencyGraphNodeInDB]:
+        """
+        Get page of nodes ordered by id with keyset pagination
+        :param limit: number of nodes to return
+        :param cursor: cursor of the page, first page if not set
+        :return: nodes page
+        """
+
+        return await self.deps_repo.list_page(limit, cursor)
+
+    async def get_adjacency(self) -> graph_adjacency_dto.GraphAdjacency:
+        """
+        Get whole graph in compressed sparse row form
+        :return: graph adjacency
+        """
+
+        return (await self._get_graph()).get_adjacency()
+
+    async def get_dependencies(self, file_id: uuid.UUID) -> set[uuid.UUID]:
+        """
+        Get all direct dependencies for a file (what this file imports)
+        :param file_id: file id
+        :return: set of dependency file ids
+        """
+
+        return (await self._get_graph()).get_successor_ids(file_id)
+
+    async def get_dependents(self, file_id: uuid.UUID) -> set[uuid.UUID]:
+        """
+        Get all files that depend on this file (who imports this file)
+        :param file_id: file id
+        :return: set of dependent file ids
+        """
+
+        return (await self._get_graph()).get_predecessor_ids(file_id)
+
+    async def get_dependencies_by_file_ids(
+        self,
+        file_ids: List[uuid.UUID],
+    ) -> Dict[uuid.UUID, Set[uuid.UUID]]:
+        """
+        Get direct dependencies of multiple files
+        :param file_ids: list of file ids
+        :return: dict of dependencies. Key - file id, value - dependency file ids, files without dependencies are omitted
+        """
+
+        graph = await self._get_graph()
+        dependencies = {file_id: graph.get_successor_ids(file_id) for file_id in file_ids}
+
+        return {file_id: deps for file_id, deps in dependencies.items() if deps}
+
+    async def get_dependents_by_file_ids(
+        self,
+        file_ids: List[uuid.UUID],
+    ) -> Dict[uuid.UUID, Set[uuid.UUID]]:
+        """
+        Get dependents of multiple files
+        :param file_ids: list of file ids
+        :return: dict of dependents. Key - file id, value - dependent file ids, files without dependents are omitted
+        """
+
+        graph = await self._get_graph()
+        dependents = {file_id: graph.get_predecessor_ids(file_id) for file_id in file_ids}
+
+        return {file_id: deps for file_id, deps in dependents.items() if deps}
+
+    async def get_dependency_graph(
+        self,
+        file_id: uuid.UUID,
+        depth: int = 2,
+        direction: const.GraphDirection = const.GraphDirection.DEPENDENCIES,
+    ) -> dict:
+        """
+        Get dependency graph up to specified depth by breadth-first walk over the snapshot.
+        Every file is included once at its shallowest depth, so cycles are cut
+        :param file_id: starting file id
+        :param depth: max depth to traverse, files at the last level are listed with empty subtrees
+        :param direction: follow dependencies or dependents
+        :return: nested dict representing dependency tree. Key - file id, value - its subtree
+        """
+
+        graph = await self._get_graph()
+        start = graph.node_index.get(file_id)
+
+        if start is None or depth < 0:
+            return {}
+
+        neighbours = graph.successors if direction == const.GraphDirection.DEPENDENCIES else graph.predecessors
+
+        tree = {}
+        subtrees = {start: tree}
+        frontier = [start]
+
+        # nodes are numbered by sorted ids, so ties resolve like the recursive query ordering
+        for _ in range(depth + 1):
+            next_frontier = []
+
+            for node in frontier:
+                for neighbour in neighbours(node):
+                    if neighbour in subtrees:
+                        continue
+
+                    subtree = {}
+                    subtrees[node][str(graph.node_ids[neighbour])] = subtree
+                    subtrees[neighbour] = subtree
+                    next_frontier.append(neighbour)
+
+            frontier = sorted(next_frontier)
+
+        return tree
+
+    async def get_importers(self, paths: List[str]) -> Set[uuid.UUID]:
+        """
+        Get files importing any of module paths, whether the import is resolved or not
+        :param paths: module paths
+        :return: importing file ids
+        """
+
+        return await self.deps_repo.get_importers(paths)
+
+    async def replace_dependencies(
+        self,
+        file_ids: List[uuid.UUID],
+        dependencies: Dict[uuid.UUID, Set[uuid.UUID]],
+        imports: Dict[uuid.UUID, Set[str]],
+    ) -> graph_diff_dto.GraphDiff:
+        """
+        Replace dependencies and imports of files in one transaction.
+        New edges are diffed against stored ones, only missing edges are inserted and
+        only outdated edges are deleted
+        :param file_ids: re-resolved files, files missing in dependencies lose all their dependencies
+        :param dependencies: new dependencies. Key - file id, value - dependency file ids
+        :param imports: imported module paths of existing files. Key - file id, value - paths
+        :return: applied changes
+        """
+
+        try:
+            return await self.deps_repo.replace_dependencies(file_ids, dependencies, imports)
+        finally:
+            self.invalidate()
+
+    async def delete_by_file_ids(self, file_ids: List[uuid.UUID]) -> None:
+        """
+        Delete dependencies of files (nodes where files are children)
+        :param file_ids: list of file ids
+        """
+
+        try:
+            await self.deps_repo.delete_by_file_ids(file_ids)
+        finally:
+            self.invalidate()
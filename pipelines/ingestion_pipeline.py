@@ -0,0 +1,138 @@
+import asyncio
+import time
+from typing import Dict, List
+
+from bases import base_git_client
+from bases.orm_repositories import base_files_repository
+from dto import ingestion_stats_dto
+
+_done = object()
+
+
+class IngestionPipeline:
+    """
+    Streaming ingestion from git client to files repository.
+    Tree discovery, content download and DB writes run concurrently and are connected
+    by bounded queues, so memory is limited by queue sizes and slow stages apply backpressure
+    """
+
+    def __init__(
+        self,
+        git_client: base_git_client.BaseGitClient,
+        files_repo: base_files_repository.BaseFilesRepository,
+        batch_size: int = 50,
+        download_workers: int = 4,
+        write_workers: int = 2,
+        queue_size: int = 4,
+    ) -> None:
+        """
+        Init variables
+        :param git_client: initialized git client
+        :param files_repo: repository for files
+        :param batch_size: files in one download chunk and DB write
+        :param download_workers: number of concurrent download workers
+        :param write_workers: number of concurrent DB writers
+        :param queue_size: max batches waiting between stages
+        """
+
+        self.git_client = git_client
+        self.files_repo = files_repo
+        self.batch_size = batch_size
+        self.download_workers = download_workers
+        self.write_workers = write_workers
+        self.queue_size = queue_size
+
+        self.stats = ingestion_stats_dto.IngestionStats()
+
+    async def run(self) -> ingestion_stats_dto.IngestionStats:
+        """
+        Ingest repository files
+        :return: counters of this run
+        """
+
+        # reset in place, progress reporters keep a reference to the stats object
+        for name, field in type(self.stats).model_fields.items():
+            setattr(self.stats, name, field.get_default(call_default_factory=True))
+
+        started_at = time.monotonic()
+        skipped_before = len(self.git_client.skipped_files)
+
+        metadata_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        files_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+
+        async def download_stage() -> None:
+            async with asyncio.TaskGroup() as group:
+                for _ in range(self.download_workers):
+                    group.create_task(self._download(metadata_queue, files_queue))
+
+            for _ in range(self.write_workers):
+                await files_queue.put(_done)
+
+        try:
+            async with asyncio.TaskGroup() as group:
+                group.create_task(self._discover(metadata_queue))
+                group.create_task(download_stage())
+
+                for _ in range(self.write_workers):
+                    group.create_task(self._write(files_queue))
+        except ExceptionGroup as e:
+            # stages are cancelled on the first failure, report it instead of the group
+            error = e
+
+            while isinstance(error, ExceptionGroup):
+                error = error.exceptions[0]
+
+            raise error from e
+
+        self.stats.skipped = len(self.git_client.skipped_files) - skipped_before
+        self.stats.elapsed = time.monotonic() - started_at
+
+        return self.stats
+
+    async def _discover(self, metadata_queue: asyncio.Queue) -> None:
+        """
+        Put chunks of files metadata to the queue
+        :param metadata_queue: queue for download stage
+        """
+
+        pending: List[Dict] = []
+
+        async for chunk in self.git_client.iter_files_metadata():
+            self.stats.discovered += len(chunk)
+            pending.extend(chunk)
+
+            while len(pending) >= self.batch_size:
+                await metadata_queue.put(pending[:self.batch_size])
+                pending = pending[self.batch_size:]
+
+        if pending:
+            await metadata_queue.put(pending)
+
+        for _ in range(self.download_workers):
+            await metadata_queue.put(_done)
+
+    async def _download(self, metadata_queue: asyncio.Queue, files_queue: asyncio.Queue) -> None:
+        """
+        Load content of metadata chunks
+        :param metadata_queue: queue of files metadata chunks
+        :param files_queue: queue for write stage
+        """
+
+        while (items := await metadata_queue.get()) is not _done:
+            async for batch in self.git_client.get_files_by_metadata(items, self.batch_size):
+                self.stats.downloaded += len(batch)
+                await files_queue.put(batch)
+
+    async def _write(self, files_queue: asyncio.Queue) -> None:
+        """
+        Store files batches
+        :param files_queue: queue of files batches
+        """
+
+        while (batch := await files_queue.get()) is not _done:
+            result = await self.files_repo.batch_upsert(batch)
+
+            self.stats.written += len(result.inserted_ids) + len(result.updated_ids)
+            self.stats.unchanged += len(result.untouched_ids)
+            self.stats.created_ids.extend(result.inserted_ids)
+            self.stats.updated_ids.extend(result.updated_ids)
@@ -0,0 +1,160 @@
+import asyncio
+from typing import List, Optional
+
+import httpx
+
+from bases.orm_repositories import base_files_repository
+from config import integration_config
+from dto import repo_ingestion_dto
+from git_clients import github_client, http_cache, request_scheduler
+from pipelines import ingestion_pipeline
+from utils import const, file_policy
+
+integration_config_ = integration_config.IntegrationConfig()
+
+
+class MultiRepoIngestionScheduler:
+    """
+    Parallel ingestion of many repositories. All repositories share one pooled http client
+    and one request scheduler, so global concurrency and the token rate limit budget
+    are respected. Repository failures are isolated and reported in progress
+    """
+
+    def __init__(
+        self,
+        files_repo: base_files_repository.BaseFilesRepository,
+        token: str = integration_config_.token,
+        max_parallel_repos: int = integration_config_.max_parallel_repos,
+        max_connections: int = 100,
+        repo_timeout: Optional[float] = None,
+        scheduler: Optional[request_scheduler.AdaptiveRequestScheduler] = None,
+        cache: Optional[http_cache.HttpResponseCache] = None,
+        policy: Optional[file_policy.FilePolicy] = None,
+        batch_size: int = 50,
+        download_workers: int = 2,
+        write_workers: int = 1,
+        use_cache: bool = True,
+    ) -> None:
+        """
+        Init variables
+        :param files_repo: repository for files
+        :param token: github token shared by all repositories
+        :param max_parallel_repos: max repositories ingested at the same time
+        :param max_connections: http connections pool size
+        :param repo_timeout: max seconds for one repository, unlimited if not set
+        :param scheduler: shared requests scheduler
+        :param cache: shared responses and contents cache, opened from config if not set
+        :param policy: files ingestion policy
+        :param batch_size: files in one download chunk and DB write
+        :param download_workers: download workers per repository
+        :param write_workers: DB writers per repository
+        :param use_cache: cache responses and contents, requests are sent without cache if False
+        """
+
+        self.files_repo = files_repo
+        self.token = token
+        self.max_parallel_repos = max_parallel_repos
+        self.max_connections = max_connections
+        self.repo_timeout = repo_timeout
+        self.scheduler = scheduler or request_scheduler.AdaptiveRequestScheduler(
+            max_concurrency=max_connections,
+        )
+        self.use_cache = use_cache
+        self.cache = cache if use_cache else None
+        self._owns_cache = False
+
+        # one cache for all repositories, so the size limit is global and sqlite has one writer
+        if self.cache is None and use_cache and integration_config_.cache_path:
+            self.cache = http_cache.HttpResponseCache(
+                integration_config_.cache_path,
+                integration_config_.cache_max_bytes,
+            )
+            self._owns_cache = True
+
+        self.policy = policy
+        self.batch_size = batch_size
+        self.download_workers = download_workers
+        self.write_workers = write_workers
+
+        self.progress: List[repo_ingestion_dto.RepoIngestionProgress] = []
+
+    async def run(
+        self,
+        repos: Optional[List[repo_ingestion_dto.RepoSpec]] = None,
+    ) -> List[repo_ingestion_dto.RepoIngestionProgress]:
+        """
+        Ingest repositories
+        :param repos: repositories, taken from config if not set
+        :return: progress of every repository
+        """
+
+        if repos is None:
+            repos = [
+                repo_ingestion_dto.RepoSpec.parse(value)
+                for value in integration_config_.repositories
+            ]
+
+        self.progress = [repo_ingestion_dto.RepoIngestionProgress(repo=repo) for repo in repos]
+        semaphore = asyncio.Semaphore(self.max_parallel_repos)
+
+        try:
+            async with github_client.create_http_client(self.token, self.max_connections) as http_client:
+                await asyncio.gather(
+                    *[
+                        self._ingest(progress, http_client, semaphore)
+                        for progress in self.progress
+                    ]
+                )
+        finally:
+            # the cache reconnects if run again
+            if self._owns_cache:
+                self.cache.close()
+
+        return self.progress
+
+    async def _ingest(
+        self,
+        progress: repo_ingestion_dto.RepoIngestionProgress,
+        http_client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+    ) -> None:
+        """
+        Ingest one repository, errors are stored in progress
+        :param progress: repository progress
+        :param http_client: shared http client
+        :param semaphore: limit of repositories ingested at the same time
+        """
+
+        async with semaphore:
+            progress.status = const.IngestionStatus.RUNNING
+
+            client = github_client.GitHubClient(
+                repo=progress.repo.name,
+                repo_owner=progress.repo.owner,
+                token=self.token,
+                branch=progress.repo.branch,
+                scheduler=self.scheduler,
+                cache=self.cache,
+                policy=self.policy,
+                http_client=http_client,
+                use_cache=self.use_cache,
+            )
+            pipeline = ingestion_pipeline.IngestionPipeline(
+                client,
+                self.files_repo,
+                batch_size=self.batch_size,
+                download_workers=self.download_workers,
+                write_workers=self.write_workers,
+            )
+            progress.stats = pipeline.stats
+
+            try:
+                async with asyncio.timeout(self.repo_timeout):
+                    async with client():
+                        await pipeline.run()
+
+                progress.status = const.IngestionStatus.DONE
+            except Exception as e:
+                progress.status = const.IngestionStatus.FAILED
+                progress.error = f"{type(e).__name__}: {e}"
+                print(f"Error while ingesting {progress.repo.full_name}: {progress.error}")
@@ -0,0 +1,189 @@
+import asyncio
+import uuid
+from typing import Dict, List
+
+from langchain_postgres import PGVectorStore
+
+from bases.orm_repositories import base_files_repository, base_insights_repository
+from dto import search_hit_dto
+from utils import const
+
+
+class HybridSearcher:
+    """
+    Full-text and vector search over files, chunks and insights merged with weighted
+    reciprocal rank fusion. Both searches run concurrently, a search with zero weight is skipped,
+    so identifier-heavy queries can be answered by full-text search without embedding the query
+    """
+
+    def __init__(
+        self,
+        files_repo: base_files_repository.BaseFilesRepository,
+        insights_repo: base_insights_repository.BaseInsightsRepository,
+        files_vector_store: PGVectorStore,
+        insights_vector_store: PGVectorStore,
+        rrf_k: int = 60,
+        candidates_factor: int = 3,
+    ) -> None:
+        """
+        Init variables
+        :param files_repo: repository for files
+        :param insights_repo: repository for insights
+        :param files_vector_store: vector store with file chunks
+        :param insights_vector_store: vector store with insight chunks
+        :param rrf_k: rank fusion constant, higher values flatten the difference between top positions
+        :param candidates_factor: results taken from each search per requested result
+        """
+
+        self.files_repo = files_repo
+        self.insights_repo = insights_repo
+        self.files_vector_store = files_vector_store
+        self.insights_vector_store = insights_vector_store
+        self.rrf_k = rrf_k
+        self.candidates_factor = candidates_factor
+
+    async def search(
+        self,
+        query: str,
+        target: const.SearchTarget = const.SearchTarget.FILES,
+        limit: int = 10,
+        text_weight: float = 1.0,
+        vector_weight: float = 1.0,
+    ) -> List[search_hit_dto.SearchHit]:
+        """
+        Search files, chunks or insights
+        :param query: search query
+        :param target: entity to search
+        :param limit: number of results
+        :param text_weight: weight of full-text search, 0 to skip it
+        :param vector_weight: weight of vector search, 0 to skip it
+        :return: results ordered by fused score
+        """
+
+        if text_weight < 0 or vector_weight < 0:
+            raise ValueError("Search weights must be non-negative")
+
+        candidates = limit * self.candidates_factor
+
+        text_hits, vector_hits = await asyncio.gather(
+            self._text_search(query, target, candidates) if text_weight > 0 else self._no_hits(),
+            self._vector_search(query, target, candidates) if vector_weight > 0 else self._no_hits(),
+        )
+
+        return self._fuse(text_hits, vector_hits, text_weight, vector_weight)[:limit]
+
+    @staticmethod
+    async def _no_hits() -> List[search_hit_dto.SearchHit]:
+        """
+        Result of skipped search
+        :return: empty list
+        """
+
+        return []
+
+    async def _text_search(
+        self,
+        query: str,
+        target: const.SearchTarget,
+        limit: int,
+    ) -> List[search_hit_dto.SearchHit]:
+        """
+        Full-text search
+        :param query: search query
+        :param target: entity to search
+        :param limit: number of results
+        :return: results ordered by relevance
+        """
+
+        if target == const.SearchTarget.FILES:
+            return await self.files_repo.search(query, limit=limit)
+
+        if target == const.SearchTarget.CHUNKS:
+            return await self.files_repo.search_chunks(query, limit=limit)
+
+        return await self.insights_repo.search(query, limit=limit)
+
+    async def _vector_search(
+        self,
+        query: str,
+        target: const.SearchTarget,
+        limit: int,
+    ) -> List[search_hit_dto.SearchHit]:
+        """
+        Vector search, chunks are grouped to their files or insights by the best chunk
+        :param query: search query
+        :param target: entity to search
+        :param limit: number of results
+        :return: results ordered by similarity
+        """
+
+        if target == const.SearchTarget.INSIGHTS:
+            chunks = await self.insights_vector_store.asimilarity_search_with_score(
+                query,
+                k=limit,
+                filter={"insight_id": {"$exists": True}},
+            )
+            insight_ids = list(dict.fromkeys(
+                uuid.UUID(str(doc.metadata["insight_id"])) for doc, _ in chunks
+            ))
+            insights = await self.insights_repo.get_by_ids(insight_ids)
+
+            return [
+                search_hit_dto.SearchHit(id=insight_id, content=insights[insight_id].content)
+                for insight_id in insight_ids
+                if insight_id in insights
+            ]
+
+        chunks = await self.files_vector_store.asimilarity_search_with_score(
+            query,
+            k=limit,
+            filter={"blob_sha": {"$exists": True}},
+        )
+
+        if target == const.SearchTarget.CHUNKS:
+            return [
+                search_hit_dto.SearchHit(id=uuid.UUID(str(doc.id)), content=doc.page_content)
+                for doc, _ in chunks
+            ]
+
+        # one content may belong to several files, they share its position
+        shas = list(dict.fromkeys(doc.metadata["blob_sha"] for doc, _ in chunks))
+        files_by_sha = await self.files_repo.get_meta_by_shas(shas)
+
+        return [
+            search_hit_dto.SearchHit(id=file.id)
+            for sha in shas
+            for file in files_by_sha.get(sha, [])
+        ][:limit]
+
+    def _fuse(
+        self,
+        text_hits: List[search_hit_dto.SearchHit],
+        vector_hits: List[search_hit_dto.SearchHit],
+        text_weight: float,
+        vector_weight: float,
+    ) -> List[search_hit_dto.SearchHit]:
+        """
+        Merge results with weighted reciprocal rank fusion: score = sum of weight / (rrf_k + position)
+        :param text_hits: full-text results ordered by relevance
+        :param vector_hits: vector results ordered by similarity
+        :param text_weight: weight of full-text results
+        :param vector_weight: weight of vector results
+        :return: merged results ordered by fused score
+        """
+
+        fused: Dict[uuid.UUID, search_hit_dto.SearchHit] = {}
+
+        for hits, weight, rank_field in (
+            (text_hits, text_weight, "text_rank"),
+            (vector_hits, vector_weight, "vector_rank"),
+        ):
+            for position, hit in enumerate(hits, start=1):
+                fused_hit = fused.setdefault(hit.id, search_hit_dto.SearchHit(id=hit.id))
+                fused_hit.score += weight / (self.rrf_k + position)
+                setattr(fused_hit, rank_field, position)
+
+                if fused_hit.content is None:
+                    fused_hit.content = hit.content
+
+        return sorted(fused.values(), key=lambda hit: hit.score, reverse=True)
@@ -0,0 +1,78 @@
+from typing import List, Optional
+
+from bases import base_git_client
+from bases.orm_repositories import base_files_repository, base_dependency_graph_repository, base_insights_repository
+from dto import sync_result_dto
+from graph_builders import python_files_graph_builder
+
+
+async def sync_repository(
+    git_client: base_git_client.BaseGitClient,
+    files_repo: base_files_repository.BaseFilesRepository,
+    batch_size: int = 10,
+    python_deps_repo: Optional[base_dependency_graph_repository.BaseDependencyGraphRepository] = None,
+    insights_repo: Optional[base_insights_repository.BaseInsightsRepository] = None,
+) -> sync_result_dto.SyncResult:
+    """
+    Sync stored files with repository by blob hashes.
+    Only new and changed files are downloaded, files missing in repository are deleted.
+    Contents left unused are kept until the delete_orphan_blobs maintenance step.
+    Edges of deleted files are dropped with them, so a graph snapshot is only
+    refreshed when the python dependencies repository is passed. Insights of changed and deleted
+    files are removed when the insights repository is passed, so the insights agent run on
+    changed files doesn't leave outdated duplicates
+    :param git_client: initialized git client
+    :param files_repo: repository for files
+    :param batch_size: files to download by one iteration
+    :param python_deps_repo: repository for python dependencies graph, updated by changed and deleted files if set
+    :param insights_repo: repository for insights, insights of changed and deleted files are removed if set
+    :return: sync result with changed and deleted files
+    """
+
+    result = sync_result_dto.SyncResult()
+
+    remote_files = await git_client.list_files_metadata()
+    stored_files = await files_repo.get_refs(git_client.repo_name)
+
+    to_download: List[dict] = []
+
+    for file_info in remote_files:
+        stored = stored_files.get(file_info["path"])
+
+        if stored is not None and stored.sha == file_info["sha"]:
+            result.unchanged_count += 1
+        else:
+            to_download.append(file_info)
+
+    async for batch in git_client.get_files_by_metadata(to_download, batch_size):
+        upserted = await files_repo.batch_upsert(batch)
+
+        result.created_ids.extend(upserted.inserted_ids)
+        result.updated_ids.extend(upserted.updated_ids)
+        result.unchanged_count += len(upserted.untouched_ids)
+
+    remote_paths = {file_info["path"] for file_info in remote_files}
+    deleted = [
+        stored for path, stored in stored_files.items() if path not in remote_paths
+    ]
+
+    if deleted:
+        await files_repo.delete_by_ids([stored.id for stored in deleted])
+        result.deleted_ids = [stored.id for stored in deleted]
+        result.deleted_paths = [stored.path for stored in deleted]
+
+    changed_ids = result.changed_ids | set(result.deleted_ids)
+
+    if insights_repo is not None and changed_ids:
+        result.deleted_insights_count = await insights_repo.delete_by_file_ids(list(changed_ids))
+
+    # replacing dependencies also invalidates a graph snapshot holding edges of deleted files
+    if python_deps_repo is not None and changed_ids:
+        result.graph_diff = await python_files_graph_builder.update_python_dependencies(
+            files_repo,
+            python_deps_repo,
+            batch_size=batch_size,
+            file_ids=changed_ids,
+        )
+
+    return result
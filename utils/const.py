@@ -43,6 +43,68 @@ class InsightSeverity(enum.Enum):
     SUGGESTION = "suggestion"
 
 
+class ListingMode(enum.Enum):
+    """
+    Repository files listing mode
+    """
+
+    TREES = "trees"
+    CONTENTS = "contents"
+
+
+class SkipReason(enum.Enum):
+    """
+    Reason of skipping a repository file
+    """
+
+    TOO_LARGE = "too_large"
+    BINARY = "binary"
+    EXCLUDED = "excluded"
+
+
+class IngestionStatus(enum.Enum):
+    """
+    Repository ingestion status
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class PageOrder(enum.Enum):
+    """
+    Keyset pagination order
+    """
+
+    ID = "id"
+    PATH = "path"
+
+
+class SearchTarget(enum.Enum):
+    """
+    Entity of search results
+    """
+
+    FILES = "files"
+    CHUNKS = "chunks"
+    INSIGHTS = "insights"
+
+
+class GraphDirection(enum.Enum):
+    """
+    Direction of dependency graph traversal
+    """
+
+    DEPENDENCIES = "dependencies"
+    DEPENDENTS = "dependents"
+
+
 code_extensions = {
     ".py", ".go", ".cs", ".html", ".js", ".ts", ".sql"
-}
\ No newline at end of file
+}
+excluded_file_names = {
+    "poetry.lock", "Pipfile.lock", "uv.lock", "package-lock.json", "yarn.lock",
+    "pnpm-lock.yaml", "Cargo.lock", "go.sum", "composer.lock", "Gemfile.lock",
+}
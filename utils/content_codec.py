@@ -0,0 +1,89 @@
+from typing import Dict, List, Optional
+
+import zstandard
+
+
+class ContentCodec:
+    """
+    zstd compression of file contents with optional trained dictionaries.
+    Compressors are cached by dictionary id
+    """
+
+    def __init__(self, level: int = 3, dictionary_size: int = 64 * 1024) -> None:
+        """
+        Init variables
+        :param level: compression level
+        :param dictionary_size: max size of trained dictionary in bytes
+        """
+
+        self.level = level
+        self.dictionary_size = dictionary_size
+        self._dictionaries: Dict[int, zstandard.ZstdCompressionDict] = {}
+        self._compressors: Dict[Optional[int], zstandard.ZstdCompressor] = {}
+        self._decompressors: Dict[Optional[int], zstandard.ZstdDecompressor] = {}
+
+    def train(self, samples: List[str]) -> Optional[bytes]:
+        """
+        Train dictionary on contents
+        :param samples: contents
+        :return: dictionary, None if samples are not enough for training
+        """
+
+        try:
+            dictionary = zstandard.train_dictionary(
+                self.dictionary_size,
+                [sample.encode() for sample in samples if sample],
+            )
+        except zstandard.ZstdError:
+            return None
+
+        return dictionary.as_bytes()
+
+    def has_dictionary(self, dictionary_id: int) -> bool:
+        """
+        Check if dictionary is loaded
+        :param dictionary_id: dictionary id
+        :return: True if loaded
+        """
+
+        return dictionary_id in self._dictionaries
+
+    def add_dictionary(self, dictionary_id: int, data: bytes) -> None:
+        """
+        Load dictionary
+        :param dictionary_id: dictionary id
+        :param data: dictionary content
+        """
+
+        self._dictionaries[dictionary_id] = zstandard.ZstdCompressionDict(data)
+
+    def compress(self, content: str, dictionary_id: Optional[int] = None) -> bytes:
+        """
+        Compress content
+        :param content: content
+        :param dictionary_id: loaded dictionary id, no dictionary if not set
+        :return: compressed content
+        """
+
+        if dictionary_id not in self._compressors:
+            self._compressors[dictionary_id] = zstandard.ZstdCompressor(
+                level=self.level,
+                dict_data=self._dictionaries.get(dictionary_id),
+            )
+
+        return self._compressors[dictionary_id].compress(content.encode())
+
+    def decompress(self, data: bytes, dictionary_id: Optional[int] = None) -> str:
+        """
+        Decompress content
+        :param data: compressed content
+        :param dictionary_id: loaded dictionary id the content was compressed with
+        :return: content
+        """
+
+        if dictionary_id not in self._decompressors:
+            self._decompressors[dictionary_id] = zstandard.ZstdDecompressor(
+                dict_data=self._dictionaries.get(dictionary_id),
+            )
+
+        return self._decompressors[dictionary_id].decompress(data).decode()
@@ -0,0 +1,97 @@
+import uuid
+from array import array
+from itertools import accumulate
+from typing import Dict, List, Set
+
+from dto import graph_adjacency_dto
+
+
+class CSRGraph:
+    """
+    Immutable directed graph in compressed sparse row form. Nodes are numbered by sorted ids,
+    neighbours of node i are indices[offsets[i]:offsets[i + 1]] in ascending order.
+    Both directions are kept, so successors and predecessors are slices of flat arrays
+    """
+
+    def __init__(self, adjacency: graph_adjacency_dto.GraphAdjacency) -> None:
+        """
+        Build graph, conversions run in C so large graphs don't block the event loop for long
+        :param adjacency: nodes and edges in compressed sparse row form
+        """
+
+        self.node_ids: List[uuid.UUID] = adjacency.node_ids
+        self.node_index: Dict[uuid.UUID, int] = {node_id: i for i, node_id in enumerate(self.node_ids)}
+
+        self.forward_offsets = array("I", accumulate(adjacency.forward_degrees, initial=0))
+        self.forward_indices = array("I", adjacency.forward_indices)
+        self.reverse_offsets = array("I", accumulate(adjacency.reverse_degrees, initial=0))
+        self.reverse_indices = array("I", adjacency.reverse_indices)
+
+    @property
+    def edges_count(self) -> int:
+        """
+        Get number of edges
+        :return: edges count
+        """
+
+        return len(self.forward_indices)
+
+    def successors(self, node: int) -> array:
+        """
+        Get targets of node edges
+        :param node: node index
+        :return: ascending node indices
+        """
+
+        return self.forward_indices[self.forward_offsets[node]:self.forward_offsets[node + 1]]
+
+    def predecessors(self, node: int) -> array:
+        """
+        Get sources of edges to node
+        :param node: node index
+        :return: ascending node indices
+        """
+
+        return self.reverse_indices[self.reverse_offsets[node]:self.reverse_offsets[node + 1]]
+
+    def get_successor_ids(self, node_id: uuid.UUID) -> Set[uuid.UUID]:
+        """
+        Get targets of node edges by id
+        :param node_id: node id
+        :return: target ids, empty for unknown nodes
+        """
+
+        node = self.node_index.get(node_id)
+
+        if node is None:
+            return set()
+
+        return {self.node_ids[i] for i in self.successors(node)}
+
+    def get_predecessor_ids(self, node_id: uuid.UUID) -> Set[uuid.UUID]:
+        """
+        Get sources of edges to node by id
+        :param node_id: node id
+        :return: source ids, empty for unknown nodes
+        """
+
+        node = self.node_index.get(node_id)
+
+        if node is None:
+            return set()
+
+        return {self.node_ids[i] for i in self.predecessors(node)}
+
+    def get_adjacency(self) -> graph_adjacency_dto.GraphAdjacency:
+        """
+        Get graph in compressed sparse row form
+        :return: graph adjacency
+        """
+
+        return graph_adjacency_dto.GraphAdjacency(
+            node_ids=self.node_ids,
+            forward_degrees=[end - start for start, end in zip(self.forward_offsets, self.forward_offsets[1:])],
+            forward_indices=self.forward_indices.tolist(),
+            reverse_degrees=[end - start for start, end in zip(self.reverse_offsets, self.reverse_offsets[1:])],
+            reverse_indices=self.reverse_indices.tolist(),
+        )
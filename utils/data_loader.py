@@ -0,0 +1,102 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, List, Optional, Set, TypeVar
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class DataLoader(Generic[K, V]):
+    """
+    Coalesces single key loads requested within one event loop tick into one batch load.
+    Each key is loaded once per batch, concurrent loads of the same key share the result.
+    Results are not cached between batches
+    """
+
+    def __init__(
+        self,
+        batch_load: Callable[[List[K]], Awaitable[Dict[K, V]]],
+        default_factory: Callable[[], Optional[V]] = lambda: None,
+        max_batch_size: int = 1000,
+    ) -> None:
+        """
+        Init variables
+        :param batch_load: loads values of keys, missing keys get default value
+        :param default_factory: value of keys missing in batch load result
+        :param max_batch_size: max keys in one batch load
+        """
+
+        self.batch_load = batch_load
+        self.default_factory = default_factory
+        self.max_batch_size = max_batch_size
+
+        self._pending: Dict[K, asyncio.Future] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def load(self, key: K) -> Optional[V]:
+        """
+        Load value of key with other keys requested in the same tick
+        :param key: key
+        :return: value
+        """
+
+        future = self._pending.get(key)
+
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending[key] = future
+
+            # the batch is dispatched after all coroutines ready in this tick requested their keys
+            if len(self._pending) == 1:
+                loop.call_soon(self._dispatch)
+
+        # cancellation of one caller must not cancel the shared result
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: List[K]) -> List[Optional[V]]:
+        """
+        Load values of keys in one batch
+        :param keys: keys
+        :return: values in the order of keys
+        """
+
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def _dispatch(self) -> None:
+        """
+        Start batch loads of pending keys
+        """
+
+        pending, self._pending = self._pending, {}
+        keys = list(pending)
+
+        for start in range(0, len(keys), self.max_batch_size):
+            task = asyncio.ensure_future(
+                self._resolve({key: pending[key] for key in keys[start:start + self.max_batch_size]})
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _resolve(self, futures: Dict[K, asyncio.Future]) -> None:
+        """
+        Load batch and resolve futures of its keys
+        :param futures: futures by key
+        """
+
+        try:
+            values = await self.batch_load(list(futures))
+        except asyncio.CancelledError:
+            for future in futures.values():
+                future.cancel()
+
+            raise
+        except Exception as e:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+
+            return
+
+        for key, future in futures.items():
+            if not future.done():
+                future.set_result(values[key] if key in values else self.default_factory())
@@ -0,0 +1,72 @@
+from pathlib import PurePosixPath
+from typing import Optional
+
+from utils import const
+
+TEXT_CONTROL_BYTES = {0x08, 0x09, 0x0A, 0x0C, 0x0D, 0x1B}
+
+
+class FilePolicy:
+    """
+    Ingestion policy deciding which files are worth downloading and storing
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024 * 1024,
+        sniff_size: int = 8000,
+        max_control_ratio: float = 0.3,
+        excluded_names: Optional[set[str]] = None,
+    ) -> None:
+        """
+        Init variables
+        :param max_size: max file size in bytes
+        :param sniff_size: number of leading bytes used for binary detection
+        :param max_control_ratio: max share of control bytes in text files
+        :param excluded_names: file names to skip (lockfiles by default)
+        """
+
+        self.max_size = max_size
+        self.sniff_size = sniff_size
+        self.max_control_ratio = max_control_ratio
+        self.excluded_names = (
+            const.excluded_file_names if excluded_names is None else excluded_names
+        )
+
+    def check(self, path: str, size: Optional[float] = None) -> Optional[const.SkipReason]:
+        """
+        Check file by metadata before loading content
+        :param path: file path
+        :param size: file size in bytes if known
+        :return: skip reason, None if file should be loaded
+        """
+
+        if PurePosixPath(path).name in self.excluded_names:
+            return const.SkipReason.EXCLUDED
+
+        if size is not None and size > self.max_size:
+            return const.SkipReason.TOO_LARGE
+
+        return None
+
+    def check_head(self, head: bytes) -> Optional[const.SkipReason]:
+        """
+        Check leading bytes of file content
+        :param head: leading bytes
+        :return: skip reason, None if content looks like text
+        """
+
+        head = head[:self.sniff_size]
+
+        if not head:
+            return None
+
+        if b"\0" in head:
+            return const.SkipReason.BINARY
+
+        control = sum(1 for byte in head if byte < 0x20 and byte not in TEXT_CONTROL_BYTES)
+
+        if control / len(head) > self.max_control_ratio:
+            return const.SkipReason.BINARY
+
+        return None
@@ -0,0 +1,76 @@
+import hashlib
+import os
+from pathlib import Path
+
+from dto import git_file_dto
+from utils import const
+
+
+def detect_file_type(path: str) -> const.FileType:
+    """
+    Detect file type by its extension
+    :param path: file path
+    :return: file type
+    """
+
+    ext = Path(path).suffix.lower()
+
+    if not ext:
+        return const.FileType.UNKNOWN
+
+    return const.FileType.CODE if ext in const.code_extensions else const.FileType.DOC
+
+
+def git_blob_sha(data: bytes) -> str:
+    """
+    Calculate git blob hash of file content
+    :param data: file content
+    :return: blob hash as in git trees
+    """
+
+    header = f"blob {len(data)}\0".encode()
+
+    return hashlib.sha1(header + data).hexdigest()
+
+
+def git_file_blob_sha(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Calculate git blob hash of file reading it by chunks
+    :param path: file path
+    :param chunk_size: number of bytes read at once
+    :return: blob hash as in git trees
+    """
+
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        sha = hashlib.sha1(f"blob {size}\0".encode())
+        read = 0
+
+        while chunk := f.read(chunk_size):
+            sha.update(chunk)
+            read += len(chunk)
+
+    # file changed while being read, the header doesn't match content
+    if read != size:
+        return git_blob_sha(path.read_bytes())
+
+    return sha.hexdigest()
+
+
+def build_git_file(path: str, data: bytes, repo: str = "") -> git_file_dto.GitFile:
+    """
+    Build file from raw content
+    :param path: file path relative to repository root
+    :param data: file content
+    :param repo: repository full name
+    :return: file
+    """
+
+    return git_file_dto.GitFile(
+        repo=repo,
+        path=path,
+        sha=git_blob_sha(data),
+        size=len(data),
+        type=detect_file_type(path),
+        content=data.decode("utf-8", "replace"),
+    )